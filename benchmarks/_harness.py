@@ -0,0 +1,55 @@
+"""Small timing helpers shared by the benchmark scripts (no third-party deps)."""
+from __future__ import annotations
+import json, math, os, platform, statistics, subprocess, sys, time
+from pathlib import Path
+from typing import Callable, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(sorted_vals: list[float], q: float) -> float:
+    # Nearest-rank percentile on an already sorted list
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def measure(name: str, fn: Callable[[], object], repeat: int = 50, warmup: int = 3,
+            items: int = 1, **extra) -> dict:
+    """Time fn() `repeat` times; returns latency percentiles in ms and items/s throughput."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    mean = statistics.fmean(times)
+    return {"name": name, "unit": "ms", "repeat": repeat,
+            "p50": round(percentile(times, 50), 4), "p95": round(percentile(times, 95), 4),
+            "p99": round(percentile(times, 99), 4), "mean": round(mean, 4),
+            "min": round(times[0], 4), "items_per_sec": round(items * 1000 / mean, 2) if mean else 0.0,
+            **extra}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except Exception:
+        return None
+
+
+def write_results(results: list[dict], out: Optional[str | Path] = None, suite: str = "all") -> Path:
+    """Write {meta, results} JSON so runs from different commits can be compared."""
+    meta = {"suite": suite, "commit": _git_commit(), "python": sys.version.split()[0],
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"{suite}-{meta['commit'] or 'nogit'}-{int(time.time())}.json"
+    out = Path(out)
+    out.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+    return out
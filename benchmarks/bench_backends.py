@@ -0,0 +1,104 @@
+"""
+Backend benchmarks: latency, peak RSS and accuracy drift per inference backend.
+
+Each backend is measured in its own subprocess so peak RSS is not polluted by the
+others. Predictions on a fixed input set are compared against the plain torch
+backend (top-1 agreement and score deltas). Needs the real models downloaded;
+backends whose extras are missing (e.g. optimum/onnxruntime) are reported as skipped.
+
+    python -m benchmarks.bench_backends [--task sentiment|image|both] [--backends torch,onnxruntime]
+"""
+from __future__ import annotations
+import argparse, json, resource, subprocess, sys
+from tk_ai_gui.models.backends import BACKENDS, accuracy_delta
+from ._harness import write_results
+
+MODEL_IDS = {"sentiment": ("sentiment-analysis", "distilbert-base-uncased-finetuned-sst-2-english"),
+             "image": ("image-classification", "google/vit-base-patch16-224")}
+
+
+def _inputs(task: str, n: int = 32) -> list:
+    # Fixed, seeded inputs so every backend sees exactly the same data
+    if task == "sentiment":
+        base = ["The lectures were great but the exam was awful.", "I love this course.",
+                "Terrible pacing and no feedback.", "It was fine, nothing special.",
+                "Absolutely fantastic tutors!", "I would not recommend it to anyone."]
+        return [f"{base[i % len(base)]} ({i})" for i in range(n)]
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 256, (224, 224, 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def run_one(task: str, backend: str, repeat: int, batch_size: int) -> dict:
+    """Measure one task/backend in this process (called in the child)."""
+    from tk_ai_gui.models.backends import build_pipeline
+    from tk_ai_gui.models.base import _as_rows
+    from ._harness import measure
+    pipe_task, model_id = MODEL_IDS[task]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pipe = build_pipeline(pipe_task, model_id, backend=backend)
+    inputs = _inputs(task)
+    kw = {"top_k": 5} if task == "image" else {}
+    preds = [_as_rows(r) for r in pipe(inputs, batch_size=batch_size, **kw)]
+    single = measure(f"backend.{task}.{backend}.single", lambda: pipe(inputs[0], **kw), repeat=repeat)
+    batch = measure(f"backend.{task}.{backend}.bs{batch_size}", lambda: pipe(inputs[:batch_size], batch_size=batch_size, **kw),
+                    repeat=max(3, repeat // 5), items=batch_size, batch_size=batch_size)
+    # ru_maxrss is KiB on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for r in (single, batch):
+        r.update(task=task, backend=backend, peak_rss_mb=round(rss / 1024, 1),
+                 load_rss_mb=round((rss - rss_before) / 1024, 1))
+    return {"results": [single, batch], "predictions": preds}
+
+
+def run(tasks=("sentiment", "image"), backends=BACKENDS, repeat: int = 20, batch_size: int = 8) -> list[dict]:
+    results = []
+    for task in tasks:
+        reference = None
+        for backend in backends:
+            proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_backends", "--child",
+                                   task, backend, "--repeat", str(repeat), "--batch-size", str(batch_size)],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+                results.append({"name": f"backend.{task}.{backend}", "skipped": reason})
+                continue
+            out = json.loads(proc.stdout.strip().splitlines()[-1])
+            if backend == "torch":
+                reference = out["predictions"]
+            if reference is not None:
+                # Attach drift vs fp32 torch to every row of this backend
+                delta = accuracy_delta(reference, out["predictions"])
+                for r in out["results"]:
+                    r["accuracy"] = delta
+            results.extend(out["results"])
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--task", choices=("sentiment", "image", "both"), default="both")
+    ap.add_argument("--backends", default=",".join(BACKENDS), help="comma separated; torch first for drift")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--out", help="results JSON path (default: benchmarks/results/)")
+    ap.add_argument("--child", nargs=2, metavar=("TASK", "BACKEND"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        print(json.dumps(run_one(*args.child, args.repeat, args.batch_size)))
+        return
+    tasks = ("sentiment", "image") if args.task == "both" else (args.task,)
+    results = run(tasks, [b.strip() for b in args.backends.split(",") if b.strip()], args.repeat, args.batch_size)
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['name']:40s} skipped: {r['skipped']}")
+        else:
+            acc = r.get("accuracy", {})
+            print(f"{r['name']:40s} p50 {r['p50']:9.2f} ms  rss {r['peak_rss_mb']:7.1f} MB"
+                  f"  top1 {acc.get('top1_agreement', '-')}")
+    print(write_results(results, args.out, suite="backends"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Length-bucketed text batching on mixed short/long reviews.
+
+Always reports how much of each padded batch is padding when batches are cut
+in arrival order (pad to the longest item in a random batch) versus by length
+bucket. --real also times TextSentimentModel.run_batch against the plain
+pipeline loop on the same texts (needs the SST-2 weights downloaded).
+
+    python -m benchmarks.bench_bucketing [--n 512] [--real]
+"""
+from __future__ import annotations
+import argparse, random
+from tk_ai_gui.models.text_sentiment import bucket_by_length, padding_waste
+from ._harness import measure, write_results
+
+BATCH_SIZES = (8, 32)
+WORDS = ("the", "food", "was", "great", "service", "slow", "but", "staff", "friendly", "would", "not",
+         "come", "back", "again", "price", "fair", "terrible", "loved", "every", "minute", "of", "it")
+
+
+def reviews(n: int = 512, long_share: float = 0.2, seed: int = 0) -> list[str]:
+    # Mostly one-liners, with a fifth long write-ups (roughly what our review exports look like)
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        words = rng.randint(150, 400) if rng.random() < long_share else rng.randint(4, 30)
+        out.append(" ".join(rng.choice(WORDS) for _ in range(words)))
+    return out
+
+
+def run(n: int = 512, real: bool = False, repeat: int = 5) -> list[dict]:
+    texts = reviews(n)
+    # Token count proxy without a tokenizer: words + [CLS]/[SEP], capped at 512 like the model
+    lengths = [min(512, len(t.split()) + 2) for t in texts]
+    model = None
+    if real:
+        from tk_ai_gui.models.text_sentiment import TextSentimentModel
+        model = TextSentimentModel()
+        lengths = [len(ids) for ids in model.token_cache.encode(model.tokenizer, texts, model.max_length)]
+
+    results = []
+    for bs in BATCH_SIZES:
+        arrival = [list(range(i, min(i + bs, n))) for i in range(0, n, bs)]
+        for name, batches in (("arrival", arrival), ("bucketed", bucket_by_length(lengths, bs))):
+            results.append({"name": f"padding.{name}.bs{bs}", "unit": "share",
+                            "padding_waste": round(padding_waste(lengths, batches), 4), "batch_size": bs,
+                            "items": n})
+        if model is not None:
+            from tk_ai_gui.models.base import AIModelBase
+
+            def bucketed():
+                model.token_cache = type(model.token_cache)(model.token_cache.max_items)  # cold: tokenize too
+                model.run_batch(texts, batch_size=bs)
+
+            results.append(measure(f"sentiment.pipeline.bs{bs}",
+                                   lambda: AIModelBase.run_batch(model, texts, batch_size=bs),
+                                   repeat=repeat, warmup=1, items=n, batch_size=bs))
+            results.append(measure(f"sentiment.bucketed.bs{bs}", bucketed, repeat=repeat, warmup=1,
+                                   items=n, batch_size=bs))
+            results.append(measure(f"sentiment.bucketed_warm_tokens.bs{bs}",
+                                   lambda: model.run_batch(texts, batch_size=bs),
+                                   repeat=repeat, warmup=1, items=n, batch_size=bs))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=512, help="number of reviews")
+    ap.add_argument("--real", action="store_true", help="time the real SST-2 model as well")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    results = run(args.n, args.real, args.repeat)
+    for r in results:
+        if "padding_waste" in r:
+            print(f"{r['name']:36s} {r['padding_waste'] * 100:5.1f}% of padded tokens are padding")
+        else:
+            print(f"{r['name']:36s} p50 {r['p50']:9.1f} ms  {r['items_per_sec']:8.1f} texts/s")
+    print(write_results(results, args.out, suite="bucketing"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Cost of filling and scrolling the results widgets (ResultTable.load/scroll, OutputPanel.render),
+of scrolling a 10k-image folder in the gallery, and how often an idle window wakes up.
+Needs a display; prints a skip notice and writes nothing when Tk cannot start.
+
+    python -m benchmarks.bench_gui [--rows 10,1000,10000]
+"""
+from __future__ import annotations
+import argparse, sys
+import tkinter as tk
+from ._harness import measure, write_results
+
+ROW_COUNTS = (10, 1000, 10000, 100000)
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"label": f"label_{i}", "score": (i % 100) / 100} for i in range(n)]
+
+
+def run(row_counts=ROW_COUNTS, repeat: int = 10) -> list[dict]:
+    from tk_ai_gui.widgets.panels import OutputPanel, ResultTable
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        table = ResultTable(root)
+        panel = OutputPanel(root)
+        results = []
+        for n in row_counts:
+            rows = _rows(n)
+
+            def load():
+                table.load(rows)
+                root.update_idletasks()  # include Tk's own layout work
+
+            def render():
+                panel.render(rows)
+                root.update_idletasks()
+
+            results.append(measure(f"ResultTable.load.{n}", load, repeat=repeat, rows=n))
+            results.append(measure(f"OutputPanel.render.{n}", render, repeat=repeat, rows=n))
+
+            def scroll():
+                # a page down through the loaded rows (wraps around at the end)
+                table.scroll(table.visible)
+                if table.offset + table.visible >= n:
+                    table.offset = 0
+                root.update_idletasks()
+
+            results.append(measure(f"ResultTable.scroll.{n}", scroll, repeat=repeat * 5, rows=n))
+        results += _gallery(root, repeat)
+        results += _idle(root)
+        return results
+    finally:
+        root.destroy()
+
+
+def _gallery(root, repeat: int, n: int = 10000) -> list[dict]:
+    # Scrolling a 10k-image folder: only the visible cells are built and decoded
+    import tempfile
+    from pathlib import Path
+    from PIL import Image
+    from tk_ai_gui.widgets.gallery import GalleryPanel
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "photo.jpg")
+        Image.new("RGB", (1600, 1200), (90, 120, 150)).save(path, quality=90)
+        gallery = GalleryPanel(root, run_batch=lambda imgs: [], run_job=lambda *a: None)
+        gallery.frame.pack(fill="both", expand=True)
+        gallery.canvas.configure(width=900, height=600)
+        root.update()
+        try:
+            gallery.load([path] * n)
+
+            def scroll():
+                gallery.canvas.yview_scroll(1, "pages")
+                if gallery.canvas.yview()[1] >= 1.0:
+                    gallery.canvas.yview_moveto(0)
+                root.update()  # redraw + drain finished thumbnails
+
+            return [measure(f"GalleryPanel.scroll.{n}", scroll, repeat=repeat * 5, images=n)]
+        finally:
+            gallery.close()
+            gallery.frame.destroy()
+
+
+def _idle(root, seconds: float = 1.0) -> list[dict]:
+    # Main-thread wakeups per second while nothing happens: with the stall heartbeat
+    # always on (as it was) and with it stopped (Metrics tab hidden, the default now)
+    import time
+    from tk_ai_gui.utils.ui import StallMonitor
+
+    class Counting(StallMonitor):
+        beats = 0
+
+        def _beat(self):
+            Counting.beats += 1
+            super()._beat()
+
+    out = []
+    for name, on in (("idle.wakeups.stall_monitor_on", True), ("idle.wakeups.stall_monitor_off", False)):
+        Counting.beats = 0
+        monitor = Counting(root)
+        if on:
+            monitor.start()
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            root.update()
+            time.sleep(0.005)
+        monitor.stop()
+        out.append({"name": name, "wakeups_per_s": round(Counting.beats / seconds, 1)})
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default=",".join(map(str, ROW_COUNTS)))
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    try:
+        results = run(tuple(int(r) for r in args.rows.split(",")), args.repeat)
+    except tk.TclError as e:
+        print(f"skipped GUI benchmarks: {e}", file=sys.stderr)
+        return
+    print(write_results(results, args.out, suite="gui"))
+
+
+if __name__ == "__main__":
+    main()
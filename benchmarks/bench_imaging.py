@@ -0,0 +1,56 @@
+"""
+Image loading and preprocessing on several source sizes.
+
+    python -m benchmarks.bench_imaging [--out results.json]
+"""
+from __future__ import annotations
+import argparse, tempfile
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from tk_ai_gui.utils import imaging
+from ._harness import measure, write_results
+from . import bench_preprocess
+
+SIZES = {"vga": (480, 640), "fhd": (1080, 1920), "12mp": (3000, 4000)}
+
+
+def run(repeat: int = 10) -> list[dict]:
+    results = []
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for tag, (h, w) in SIZES.items():
+            arr = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+            path = str(Path(tmp) / f"{tag}.jpg")
+            Image.fromarray(arr).save(path, quality=90)
+            pil = Image.fromarray(arr)
+            extra = {"size": tag, "cv2": imaging._cv2() is not None}
+            results.append(measure(f"load_image.{tag}", lambda: imaging.load_image(path),
+                                   repeat=repeat, **extra))
+            results.append(measure(f"load_image.array_reduced.{tag}",
+                                   lambda: imaging.load_image(path, as_array=True, max_size=(224, 224)),
+                                   repeat=repeat, **extra))
+            results.append(measure(f"preprocess_image_cv2.pil.{tag}",
+                                   lambda: imaging.preprocess_image_cv2(pil, size=(224, 224)),
+                                   repeat=repeat, **extra))
+            results.append(measure(f"preprocess_image_cv2.array.{tag}",
+                                   lambda: imaging.preprocess_image_cv2(arr, size=(224, 224), as_array=True),
+                                   repeat=repeat, **extra))
+    # Batch vs per-image preprocessing (one entry per flag set)
+    for row in bench_preprocess.run(n=32, repeat=3):
+        flags = "+".join(row["flags"])
+        results.append({"name": f"preprocess_batch.{flags}", "unit": "ms",
+                        "p50": row["batch_ms"], "loop_ms": row["loop_ms"], "speedup": row["speedup"]})
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    print(write_results(run(args.repeat), args.out, suite="imaging"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Lexicon sentiment throughput (the CPU-only tier when the transformer is unavailable).
+
+Compares the old keyword fallback (six substring scans per line, one line at a
+time) with Lexicon.predict on the same lines, per call and as one big batch.
+
+    python -m benchmarks.bench_lexicon [--lines 200000]
+"""
+from __future__ import annotations
+import argparse, random
+from tk_ai_gui.models.lexicon import Lexicon
+from ._harness import measure, write_results
+
+_WORDS = ("the", "food", "was", "service", "staff", "and", "but", "not", "very", "good", "great", "bad",
+          "awful", "slow", "friendly", "really", "price", "fair", "would", "never", "come", "back", "again",
+          "loved", "it", "meh", "room", "clean", "noisy", "at", "night", "goodbye", "happy", "hour")
+
+
+def lines(n: int, seed: int = 0) -> list[str]:
+    # One-line reviews, 5-25 words each
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 25))) + rng.choice((".", "!", ""))
+            for _ in range(n)]
+
+
+def _old_rule(text: str):
+    # The keyword fallback this engine replaced, kept here as the baseline
+    t = (text or "").lower()
+    pos = any(w in t for w in ["good", "great", "love", "awesome", "fantastic", "happy"])
+    return [{"label": "POSITIVE" if pos else "NEGATIVE", "score": 0.75}]
+
+
+def run(n: int = 200_000, repeat: int = 3) -> list[dict]:
+    data = lines(n)
+    lex = Lexicon()
+    results = []
+    for name, fn in (("lexicon.old_rule.per_line", lambda: [_old_rule(t) for t in data]),
+                     ("lexicon.per_line", lambda: [lex.predict([t]) for t in data[:n // 20]])):
+        items = n if "old_rule" in name else n // 20
+        results.append(measure(name, fn, repeat=repeat, warmup=1, items=items))
+    results.append(measure("lexicon.batch", lambda: lex.predict(data), repeat=repeat, warmup=1, items=n))
+    results.append(measure("lexicon.batch_proba", lambda: lex.predict_proba(data), repeat=repeat, warmup=1,
+                           items=n))
+    for r in results:
+        r["lines_per_min"] = round(r["items_per_sec"] * 60)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    results = run(args.lines, args.repeat)
+    for r in results:
+        print(f"{r['name']:28s} {r['lines_per_min'] / 1e6:8.2f} M lines/min")
+    print(write_results(results, args.out, suite="lexicon"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+ModelManager benchmarks: construction, per-call latency and batch throughput.
+
+Runs offline against the rule-based fallbacks by default; --real uses the
+Hugging Face models (needs them downloaded).
+
+    python -m benchmarks.bench_models [--real] [--out results.json]
+"""
+from __future__ import annotations
+import argparse
+from PIL import Image
+from tk_ai_gui.controller import ModelManager, _FALLBACKS
+from ._harness import measure, write_results
+
+BATCH_SIZES = (1, 8, 32, 128)
+
+
+def offline_factories() -> dict:
+    # Same classes ModelManager falls back to, so no network or weights are needed
+    return dict(_FALLBACKS)
+
+
+def run(real: bool = False, repeat: int = 50) -> list[dict]:
+    factories = None if real else offline_factories()
+    results = [measure("manager.construct", lambda: ModelManager(factories=factories), repeat=repeat)]
+
+    # Caching would turn repeats into dictionary lookups, so measure the model itself
+    mm = ModelManager(factories=factories, cache=False)
+    text = "The lectures were great but the exam was awful."
+    img = Image.new("RGB", (224, 224), (120, 80, 40))
+    mm.get("sentiment"); mm.get("image")  # load outside the timed region
+    results.append(measure("run.sentiment", lambda: mm.run("sentiment", text), repeat=repeat))
+    results.append(measure("run.image", lambda: mm.run("image", img), repeat=repeat))
+
+    for bs in BATCH_SIZES:
+        texts = [f"{text} #{i}" for i in range(bs)]
+        imgs = [img] * bs
+        results.append(measure(f"run_batch.sentiment.bs{bs}",
+                               lambda: mm.run_batch("sentiment", texts, batch_size=bs),
+                               repeat=max(5, repeat // 5), items=bs, batch_size=bs))
+        results.append(measure(f"run_batch.image.bs{bs}",
+                               lambda: mm.run_batch("image", imgs, batch_size=bs),
+                               repeat=max(5, repeat // 5), items=bs, batch_size=bs))
+
+    # Warm cache path, for comparison with the uncached numbers above
+    cached = ModelManager(factories=factories)
+    cached.run("sentiment", text)
+    results.append(measure("run.sentiment.cached", lambda: cached.run("sentiment", text), repeat=repeat))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--real", action="store_true", help="use the real HF models instead of fallbacks")
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--out", help="results JSON path (default: benchmarks/results/)")
+    args = ap.parse_args()
+    print(write_results(run(args.real, args.repeat), args.out, suite="models"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare utils.imaging.preprocess_batch with the per-image loop it replaces
+(preprocess_image_cv2 + HF-style normalise + stack).
+
+    python -m benchmarks.bench_preprocess [--n 64] [--src 480x640] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse, json, time
+import numpy as np
+from ._harness import write_results
+from tk_ai_gui.utils.imaging import DEFAULT_MEAN, DEFAULT_STD, preprocess_batch, preprocess_image_cv2
+
+
+def per_image_loop(images, size, **flags):
+    mean = np.asarray(DEFAULT_MEAN, dtype=np.float32)
+    std = np.asarray(DEFAULT_STD, dtype=np.float32)
+    out = []
+    for im in images:
+        x = np.asarray(preprocess_image_cv2(im, size=size, **flags), dtype=np.float32) / 255.0
+        out.append(((x - mean) / std).transpose(2, 0, 1))
+    return np.stack(out)
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return min(times)
+
+
+def run(n=64, src=(480, 640), size=(224, 224), repeat=5) -> list[dict]:
+    rng = np.random.default_rng(0)
+    batch = rng.integers(0, 255, (n, src[0], src[1], 3), dtype=np.uint8)
+    results = []
+    for flags in ({}, {"gray": True}, {"blur": True}, {"edges": True}):
+        loop = best_ms(lambda: per_image_loop(batch, size, **flags), repeat)
+        vec = best_ms(lambda: preprocess_batch(batch, size=size, **flags), repeat)
+        results.append({"flags": flags or {"plain": True}, "n": n, "src": list(src),
+                        "loop_ms": round(loop, 2), "batch_ms": round(vec, 2),
+                        "speedup": round(loop / vec, 2)})
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=64)
+    ap.add_argument("--src", default="480x640", help="source HxW")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", help="also write a results JSON file")
+    args = ap.parse_args()
+    h, w = (int(v) for v in args.src.split("x"))
+    rows = run(args.n, (h, w), repeat=args.repeat)
+    for row in rows:
+        print(json.dumps(row))
+    if args.out:
+        write_results(rows, args.out, suite="preprocess")
+
+
+if __name__ == "__main__":
+    main()
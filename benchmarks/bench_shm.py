@@ -0,0 +1,57 @@
+"""
+Image transport benchmarks: pickling vs shared-memory ring slots for model workers.
+
+A worker process running the constant image fallback stands in for the model, so
+the timings are the cost of getting pixels across the process boundary (plus one
+pipe round trip), not inference.
+
+    python -m benchmarks.bench_shm [--size 3840x2160] [--batch 4] [--repeat 20]
+"""
+from __future__ import annotations
+import argparse
+import numpy as np
+from PIL import Image
+from tk_ai_gui.controller import _RuleImageFallback
+from tk_ai_gui.workers import ModelWorker
+from ._harness import measure, write_results
+
+
+def run(size=(3840, 2160), batch: int = 4, repeat: int = 20) -> list[dict]:
+    w, h = size
+    arr = np.random.default_rng(0).integers(0, 256, (h, w, 3), dtype=np.uint8)
+    img = Image.fromarray(arr)
+    mpix = round(w * h / 1e6, 1)
+    results = []
+    for transport in ("pickle", "shm"):
+        worker = ModelWorker("image", _RuleImageFallback, transport=transport, ring_slots=max(1, batch))
+        try:
+            for kind, item in (("pil", img), ("array", arr)):
+                results.append(measure(f"transport.{transport}.{kind}.single", lambda: worker.run(item),
+                                       repeat=repeat, transport=transport, input=kind, megapixels=mpix))
+                # Distinct objects: pickle would send a repeated object only once
+                items = [item.copy() for _ in range(batch)]
+                results.append(measure(f"transport.{transport}.{kind}.bs{batch}",
+                                       lambda: worker.run_batch(items, batch_size=batch),
+                                       repeat=max(3, repeat // 2), items=batch, batch_size=batch,
+                                       transport=transport, input=kind, megapixels=mpix))
+        finally:
+            worker.close()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", default="3840x2160", help="WIDTHxHEIGHT of the test image")
+    ap.add_argument("--batch", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--out", help="results JSON path (default: benchmarks/results/)")
+    args = ap.parse_args()
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    results = run((w, h), args.batch, args.repeat)
+    for r in results:
+        print(f"{r['name']:34s} p50 {r['p50']:9.2f} ms  {r['items_per_sec']:8.1f} img/s")
+    print(write_results(results, args.out, suite="shm"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Result table model on large result sets (no display needed): what a load, sort,
+filter, scroll step and first raw-JSON page cost with 100k rows, next to the
+old approach of formatting everything (json.dumps(indent=2) of the whole list).
+
+    python -m benchmarks.bench_table [--rows 1000,100000]
+"""
+from __future__ import annotations
+import argparse, json
+from tk_ai_gui.widgets.table_model import TableModel, diff
+from ._harness import measure, write_results
+
+ROW_COUNTS = (1000, 100000)
+VISIBLE = 30  # rows on screen in a maximised window
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"label": f"label_{i % 1000}", "score": (i * 7919 % 10000) / 10000} for i in range(n)]
+
+
+def run(row_counts=ROW_COUNTS, repeat: int = 10) -> list[dict]:
+    results = []
+    for n in row_counts:
+        rows = _rows(n)
+        model = TableModel(rows)
+
+        def load():
+            model.set_rows(rows)
+            model.window(0, VISIBLE)
+
+        def sort():
+            model.sort("score", descending=True)
+            model.window(0, VISIBLE)
+
+        def filter_():
+            model.set_filter("label_1", min_score=0.5)
+            model.window(0, VISIBLE)
+            model.set_filter()
+
+        def scroll():
+            # one wheel step: next window, diffed against the one on screen
+            diff(model.window(n // 2, VISIBLE), model.window(n // 2 + 1, VISIBLE))
+
+        def raw_first_page():
+            model.set_rows(rows)
+            model.raw_chunk(0, 200)
+
+        results.append(measure(f"table.load.{n}", load, repeat=repeat, rows=n))
+        results.append(measure(f"table.sort.{n}", sort, repeat=repeat, rows=n))
+        results.append(measure(f"table.filter.{n}", filter_, repeat=repeat, rows=n))
+        results.append(measure(f"table.scroll.{n}", scroll, repeat=repeat * 10, rows=n))
+        results.append(measure(f"table.raw_first_page.{n}", raw_first_page, repeat=repeat, rows=n))
+        results.append(measure(f"table.raw_full_dumps.{n}", lambda: json.dumps(rows, indent=2),
+                               repeat=max(2, repeat // 2), rows=n))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default=",".join(map(str, ROW_COUNTS)))
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    results = run(tuple(int(r) for r in args.rows.split(",")), args.repeat)
+    for r in results:
+        print(f"{r['name']:32s} p50 {r['p50']:9.3f} ms")
+    print(write_results(results, args.out, suite="table"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Thread-count benchmarks: inference throughput versus intra-op threads.
+
+Each point runs in a fresh subprocess with TK_AI_THREADS (and OMP/MKL) set before
+any numeric library starts its thread pool. --concurrency N issues N calls at once,
+the way the GUI's sentiment and image lanes do, to show oversubscription.
+
+Offline the workload is a float32 matmul (same BLAS pools the models use);
+--real runs the image model's run_batch instead.
+
+    python -m benchmarks.bench_threads [--threads 1,2,4,8] [--concurrency 1,2] [--real]
+"""
+from __future__ import annotations
+import argparse, json, os, subprocess, sys, time
+from ._harness import write_results
+
+
+def _default_threads() -> list[int]:
+    n, out = os.cpu_count() or 1, [1]
+    while out[-1] * 2 <= n:
+        out.append(out[-1] * 2)
+    return out
+
+
+def run_point(threads: int, concurrency: int, real: bool, seconds: float) -> dict:
+    """Throughput at one setting (called in the child, after the env is set)."""
+    from concurrent.futures import ThreadPoolExecutor
+    from tk_ai_gui.runtime import apply_threads
+    apply_threads(threads)
+    if real:
+        from PIL import Image
+        from tk_ai_gui.controller import ModelManager
+        mm = ModelManager(cache=False)
+        imgs = [Image.new("RGB", (224, 224), (120, 80, 40))] * 8
+        work, items = (lambda: mm.run_batch("image", imgs, batch_size=8)), 8
+    else:
+        import numpy as np
+        a = np.random.default_rng(0).random((384, 384), dtype=np.float32)
+        work, items = (lambda: a @ a), 1
+    work()  # warm up pools outside the timed region
+
+    def loop(deadline):
+        n = 0
+        while time.perf_counter() < deadline:
+            work()
+            n += items
+        return n
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        done = sum(pool.map(loop, [t0 + seconds] * concurrency))
+    elapsed = time.perf_counter() - t0
+    return {"name": f"threads.{'model' if real else 'gemm'}.t{threads}.c{concurrency}",
+            "threads": threads, "concurrency": concurrency, "items": done,
+            "items_per_sec": round(done / elapsed, 2), "cpus": os.cpu_count()}
+
+
+def run(threads=None, concurrency=(1, 2), real: bool = False, seconds: float = 2.0) -> list[dict]:
+    results = []
+    for c in concurrency:
+        for t in threads or _default_threads():
+            env = dict(os.environ, TK_AI_THREADS=str(t), OMP_NUM_THREADS=str(t),
+                       MKL_NUM_THREADS=str(t), OPENBLAS_NUM_THREADS=str(t))
+            cmd = [sys.executable, "-m", "benchmarks.bench_threads", "--child", str(t), str(c),
+                   "--seconds", str(seconds)] + (["--real"] if real else [])
+            proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            if proc.returncode != 0:
+                reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+                results.append({"name": f"threads.t{t}.c{c}", "skipped": reason})
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", help="comma separated thread counts (default: 1,2,4.. up to cpu count)")
+    ap.add_argument("--concurrency", default="1,2", help="simultaneous callers, comma separated")
+    ap.add_argument("--real", action="store_true", help="time the image model instead of a matmul")
+    ap.add_argument("--seconds", type=float, default=2.0, help="duration of each point")
+    ap.add_argument("--out", help="results JSON path (default: benchmarks/results/)")
+    ap.add_argument("--child", nargs=2, type=int, metavar=("THREADS", "CONCURRENCY"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        print(json.dumps(run_point(*args.child, args.real, args.seconds)))
+        return
+    threads = [int(t) for t in args.threads.split(",")] if args.threads else None
+    results = run(threads, [int(c) for c in args.concurrency.split(",")], args.real, args.seconds)
+    for r in results:
+        print(f"{r['name']:32s} " + (f"skipped: {r['skipped']}" if "skipped" in r else f"{r['items_per_sec']:10.1f} items/s"))
+    print(write_results(results, args.out, suite="threads"))
+
+
+if __name__ == "__main__":
+    main()
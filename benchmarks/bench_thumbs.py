@@ -0,0 +1,81 @@
+"""
+Preview cost on the Tk main thread, before and after the thumbnail cache.
+
+before     what OutputPreview used to do on the main thread: full decode, copy, thumbnail()
+cold       building the thumbnail with reduced-size decoding (now on the cache's pool)
+disk_hit   an image previewed in an earlier session: read the small JPEG back
+memory_hit the same image opened again in this session
+
+main_thread_ms is the part that still blocks the UI (0 for cold: only a submit).
+
+    python -m benchmarks.bench_thumbs [--size 4000x3000] [--repeat 10]
+"""
+from __future__ import annotations
+import argparse, shutil, tempfile
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from tk_ai_gui.utils.imaging import load_image
+from tk_ai_gui.utils.thumbs import ThumbnailCache, make_thumbnail
+from ._harness import measure, write_results
+
+PREVIEW = (420, 300)
+
+
+def run(size=(4000, 3000), repeat: int = 10) -> list[dict]:
+    tmp = Path(tempfile.mkdtemp(prefix="bench_thumbs_"))
+    try:
+        w, h = size
+        # Smooth gradient + noise: compresses like a photo, not like flat colour
+        yy, xx = np.mgrid[0:h, 0:w]
+        arr = np.stack([(xx * 255 // w), (yy * 255 // h), ((xx + yy) * 255 // (w + h))], axis=-1).astype(np.uint8)
+        arr += np.random.default_rng(0).integers(0, 16, arr.shape, dtype=np.uint8)
+        path = str(tmp / "photo.jpg")
+        Image.fromarray(arr).save(path, quality=90)
+        mpix = round(w * h / 1e6, 1)
+
+        def before():
+            img = load_image(path).copy()
+            img.thumbnail(PREVIEW)
+
+        results = [measure("preview.before", before, repeat=repeat, megapixels=mpix, main_thread=True)]
+        results.append(measure("preview.cold", lambda: make_thumbnail(path, PREVIEW), repeat=repeat,
+                               megapixels=mpix, main_thread=False))
+
+        cache = ThumbnailCache(tmp / "thumbs")
+        cache.get_or_build(path, PREVIEW)
+        cache.close()
+
+        def disk_hit():
+            c = ThumbnailCache(tmp / "thumbs")  # fresh memory tier, like a new session
+            c.get(path, PREVIEW)
+            c.close()
+
+        results.append(measure("preview.disk_hit", disk_hit, repeat=repeat, megapixels=mpix, main_thread=True))
+        warm = ThumbnailCache(tmp / "thumbs")
+        warm.get(path, PREVIEW)
+        results.append(measure("preview.memory_hit", lambda: warm.get(path, PREVIEW), repeat=repeat * 10,
+                               megapixels=mpix, main_thread=True))
+        warm.close()
+        for r in results:
+            r["main_thread_ms"] = r["p50"] if r.pop("main_thread") else 0.0
+        return results
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", default="4000x3000", help="WIDTHxHEIGHT of the test photo")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    results = run((w, h), args.repeat)
+    for r in results:
+        print(f"{r['name']:20s} p50 {r['p50']:9.2f} ms   main thread {r['main_thread_ms']:8.2f} ms")
+    print(write_results(results, args.out, suite="thumbs"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compare two results files from the benchmark scripts.
+
+    python -m benchmarks.compare OLD.json NEW.json [--threshold 10]
+
+Prints the p50 change per benchmark and exits 1 if any got slower by more
+than --threshold percent.
+"""
+from __future__ import annotations
+import argparse, json, sys
+
+
+def load(path: str) -> dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return {r["name"]: r for r in json.load(f)["results"]}
+
+
+def compare(old: dict[str, dict], new: dict[str, dict], threshold: float) -> tuple[list[str], bool]:
+    lines, regressed = [], False
+    for name in sorted(old.keys() & new.keys()):
+        a, b = old[name].get("p50"), new[name].get("p50")
+        if not a or b is None:
+            continue
+        change = (b - a) / a * 100
+        flag = ""
+        if change > threshold:
+            flag, regressed = "  REGRESSION", True
+        lines.append(f"{name:45s} {a:10.3f} -> {b:10.3f} ms  {change:+7.1f}%{flag}")
+    return lines, regressed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("old")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=10.0, help="allowed p50 slowdown in percent")
+    args = ap.parse_args()
+    lines, regressed = compare(load(args.old), load(args.new), args.threshold)
+    print("\n".join(lines))
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Run every benchmark suite and write one combined results file.
+
+    python -m benchmarks.run_all [--quick] [--out results.json]
+    python -m benchmarks.compare OLD.json NEW.json
+"""
+from __future__ import annotations
+import argparse, sys
+import tkinter as tk
+from . import bench_gui, bench_imaging, bench_models, bench_table, bench_thumbs
+from ._harness import write_results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quick", action="store_true", help="fewer repeats (smoke run)")
+    ap.add_argument("--real", action="store_true", help="use the real HF models instead of fallbacks")
+    ap.add_argument("--out")
+    args = ap.parse_args()
+    scale = 5 if args.quick else 1
+
+    results = bench_models.run(real=args.real, repeat=max(5, 50 // scale))
+    results += bench_imaging.run(repeat=max(2, 10 // scale))
+    results += bench_table.run(repeat=max(2, 10 // scale))
+    results += bench_thumbs.run(repeat=max(2, 10 // scale))
+    try:
+        results += bench_gui.run(repeat=max(2, 10 // scale))
+    except tk.TclError as e:
+        print(f"skipped GUI benchmarks: {e}", file=sys.stderr)
+    print(write_results(results, args.out, suite="all"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+import pytest
+from tk_ai_gui.controller import _identity
+from tk_ai_gui.models.backends import accuracy_delta, build_pipeline, default_backend
+
+# Backend selection must fail loudly on typos, and the drift check must measure what it claims.
+
+def test_default_backend_from_env(monkeypatch):
+    monkeypatch.delenv("TK_AI_BACKEND", raising=False)
+    assert default_backend() == "torch"
+    monkeypatch.setenv("TK_AI_BACKEND", "ONNXRuntime")
+    assert default_backend() == "onnxruntime"
+    monkeypatch.setenv("TK_AI_BACKEND", "tensorrt")
+    with pytest.raises(ValueError):
+        default_backend()
+    with pytest.raises(ValueError):
+        build_pipeline("image-classification", "any/model", backend="int4")
+
+
+def test_accuracy_delta():
+    ref = [[{"label": "cat", "score": 0.9}, {"label": "dog", "score": 0.1}],
+           [{"label": "POSITIVE", "score": 0.8}]]
+    same = accuracy_delta(ref, ref)
+    assert same == {"n": 2, "top1_agreement": 1.0, "mean_score_delta": 0.0, "max_score_delta": 0.0}
+    cand = [[{"label": "dog", "score": 0.6}, {"label": "cat", "score": 0.4}],
+            [{"label": "POSITIVE", "score": 0.75}]]
+    d = accuracy_delta(ref, cand)
+    assert d["top1_agreement"] == 0.5
+    assert d["max_score_delta"] == pytest.approx(0.5) and d["mean_score_delta"] == pytest.approx(0.275)
+
+
+def test_cache_identity_includes_non_default_backend():
+    class M:
+        model_id, backend = "org/model", "torch"
+    m = M()
+    assert _identity(m) == "org/model"
+    m.backend = "torch-dynamic-int8"
+    assert _identity(m) == "org/model@torch-dynamic-int8"
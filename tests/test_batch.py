@@ -0,0 +1,110 @@
+from __future__ import annotations
+import json
+from tk_ai_gui.batch import Checkpoint, read_texts, run_batch_job
+from tk_ai_gui.controller import ModelManager
+
+# The headless runner must keep input order, write the sample_*.json result schema
+# and pick up where an interrupted run stopped.
+
+class _Upper:
+    def __init__(self):
+        self.seen = []
+
+    def run(self, x):
+        return self.run_batch([x])[0]
+
+    def run_batch(self, xs, batch_size=8):
+        self.seen.extend(xs)
+        return [[{"label": x.upper(), "score": 1.0}] for x in xs]
+
+
+def _manager(model):
+    return ModelManager(factories={"sentiment": lambda: model}, cache=False)
+
+
+def test_jsonl_output_in_input_order(tmp_path):
+    out = tmp_path / "out.jsonl"
+    items = ["a", "b", "c", "d", "e"]
+    summary = run_batch_job(_manager(_Upper()), "sentiment", items, out, "src",
+                            batch_size=2, workers=3, progress=None)
+    rows = [json.loads(l) for l in out.read_text().splitlines()]
+    assert [r["source"] for r in rows] == items
+    assert rows[0]["result"] == [{"label": "A", "score": 1.0}]
+    assert summary["scored"] == 5 and not Checkpoint(out).path.exists()
+
+
+def test_resume_skips_done_items_and_partial_tail(tmp_path):
+    out = tmp_path / "out.jsonl"
+    done = "".join(json.dumps({"id": i, "source": s, "result": []}) + "\n" for i, s in enumerate("ab"))
+    out.write_text(done + '{"id": 2, "sou')  # crash mid-write
+    Checkpoint(out).save("src", "sentiment", 2, len(done.encode()))
+
+    model = _Upper()
+    run_batch_job(_manager(model), "sentiment", list("abcde"), out, "src",
+                  batch_size=2, resume=True, progress=None)
+    rows = [json.loads(l) for l in out.read_text().splitlines()]
+    assert [r["id"] for r in rows] == [0, 1, 2, 3, 4]
+    assert "a" not in model.seen and "c" in model.seen
+
+
+def test_resume_with_the_output_deleted_starts_over(tmp_path):
+    out = tmp_path / "out.jsonl"
+    Checkpoint(out).save("src", "sentiment", 3, 120)  # output file never written / deleted
+    model = _Upper()
+    summary = run_batch_job(_manager(model), "sentiment", list("abcde"), out, "src",
+                            batch_size=2, resume=True, progress=None)
+    rows = [json.loads(l) for l in out.read_text().splitlines()]
+    assert [r["source"] for r in rows] == list("abcde") and summary["skipped"] == 0
+    assert not out.read_bytes().startswith(b"\0")
+
+def test_read_texts_formats(tmp_path):
+    (tmp_path / "a.csv").write_text("id,text\n1,hello\n2,world\n")
+    (tmp_path / "b.jsonl").write_text('{"text": "x"}\n\n{"text": "y"}\n')
+    assert list(read_texts(str(tmp_path / "a.csv"))) == ["hello", "world"]
+    assert list(read_texts(str(tmp_path / "b.jsonl"))) == ["x", "y"]
+
+
+def test_image_pipeline_overlaps_and_keeps_order(tmp_path):
+    from PIL import Image
+    from tk_ai_gui.utils.imaging import StageTimer, classify_paths
+    paths = []
+    for i in range(7):
+        p = tmp_path / f"{i}.png"
+        Image.new("RGB", (64, 48), (i * 30, 0, 0)).save(p)
+        paths.append(str(p))
+
+    timer = StageTimer()
+    # The "model" reports each image's red channel so we can check ordering
+    batches = list(classify_paths(lambda imgs: [[{"label": str(im.getpixel((0, 0))[0]), "score": 1.0}]
+                                                for im in imgs],
+                                  paths, batch_size=3, workers=3, prefetch=4,
+                                  preprocess={"size": (32, 32)}, timer=timer))
+    assert [len(b) for b, _ in batches] == [3, 3, 1]
+    labels = [r[0]["label"] for _, res in batches for r in res]
+    assert labels == [str(i * 30) for i in range(7)]
+    stages = timer.summary()
+    assert {"decode", "preprocess", "inference", "wait"} <= set(stages)
+    assert stages["decode"]["items"] == 7
+
+
+def test_unreadable_image_is_recorded_and_the_run_continues(tmp_path):
+    from PIL import Image
+    from tk_ai_gui.batch import find_images
+
+    class _Size:
+        def run_batch(self, imgs, batch_size=8):
+            return [[{"label": f"{im.size[0]}", "score": 1.0}] for im in imgs]
+
+    folder = tmp_path / "imgs"; folder.mkdir()
+    for i in range(5):
+        Image.new("RGB", (10 + i, 10)).save(folder / f"{i}.png")
+    (folder / "2.png").write_bytes(b"not a png at all")
+    out = tmp_path / "out.jsonl"
+    mm = ModelManager(factories={"image": _Size}, cache=False)
+    summary = run_batch_job(mm, "image", find_images(str(folder)), out, str(folder),
+                            batch_size=2, workers=2, progress=None)
+    rows = [json.loads(l) for l in out.read_text().splitlines()]
+    assert [r["id"] for r in rows] == [0, 1, 2, 3, 4]
+    assert "error" in rows[2] and "result" not in rows[2] and rows[2]["source"].endswith("2.png")
+    assert [r["result"][0]["label"] for r in rows if "result" in r] == ["10", "11", "13", "14"]
+    assert summary["scored"] == 5 and summary["errors"] == 1 and not Checkpoint(out).path.exists()
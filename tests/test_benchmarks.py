@@ -0,0 +1,24 @@
+from __future__ import annotations
+from benchmarks._harness import measure, percentile
+from benchmarks.compare import compare
+
+# The benchmark helpers feed regression checks between commits, so their maths must be right.
+
+def test_percentiles_nearest_rank():
+    vals = sorted(float(v) for v in range(1, 101))
+    assert percentile(vals, 50) == 50.0
+    assert percentile(vals, 95) == 95.0
+    assert percentile(vals, 99) == 99.0
+
+
+def test_measure_reports_latency_and_throughput():
+    r = measure("noop", lambda: None, repeat=5, warmup=0, items=4, batch_size=4)
+    assert r["name"] == "noop" and r["batch_size"] == 4
+    assert r["p50"] <= r["p95"] <= r["p99"] and r["items_per_sec"] > 0
+
+
+def test_compare_flags_slowdowns_over_threshold():
+    old = {"a": {"p50": 10.0}, "b": {"p50": 10.0}}
+    new = {"a": {"p50": 10.5}, "b": {"p50": 13.0}}
+    lines, regressed = compare(old, new, threshold=10)
+    assert regressed and "REGRESSION" in lines[1] and "REGRESSION" not in lines[0]
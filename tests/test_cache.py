@@ -0,0 +1,77 @@
+from __future__ import annotations
+from PIL import Image
+from tk_ai_gui.cache import PredictionCache
+from tk_ai_gui.controller import ModelManager
+
+# The cache must answer repeated inputs without touching the model,
+# stay bounded, survive restarts on disk and forget a model once it is replaced.
+
+class _Counting:
+    def __init__(self, model_id="m1"):
+        self.model_id = model_id
+        self.task = "text-classification"
+        self.calls = 0
+
+    def run(self, x):
+        self.calls += 1
+        return [{"label": self.model_id, "score": 0.9}]
+
+    def run_batch(self, xs, batch_size=8):
+        return [self.run(x) for x in xs]
+
+
+def test_repeated_inputs_hit_the_cache():
+    model = _Counting()
+    mm = ModelManager(factories={"sentiment": lambda: model})
+    a = mm.run("sentiment", "same text")
+    calls = model.calls  # includes the warm-up run done at load time
+    b = mm.run("sentiment", "  same text ")  # normalised whitespace → same key
+    assert a == b and model.calls == calls
+    assert mm.cache.stats()["hits"] == 1
+
+    # Batches only send misses to the model
+    mm.run_batch("sentiment", ["same text", "new one"])
+    assert model.calls == calls + 1
+
+
+def test_lru_bound_and_evictions():
+    c = PredictionCache(max_items=2)
+    for i in range(3):
+        c.put(("m", "t", str(i)), [{"label": "x", "score": 1.0}])
+    assert c.get(("m", "t", "0")) is None
+    assert c.stats()["evictions"] == 1 and c.stats()["size"] == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    key = PredictionCache.make_key("m", "image-classification", Image.new("RGB", (4, 4), (9, 9, 9)))
+    c1 = PredictionCache(cache_dir=tmp_path)
+    c1.put(key, [{"label": "cat", "score": 0.8}])
+    c1.close()
+    c2 = PredictionCache(cache_dir=tmp_path)
+    assert c2.get(key) == [{"label": "cat", "score": 0.8}]
+
+
+def test_image_key_depends_on_pixels_and_flags():
+    a = Image.new("RGB", (4, 4), (0, 0, 0))
+    b = Image.new("RGB", (4, 4), (1, 0, 0))
+    k = PredictionCache.make_key
+    assert k("m", "image", a) != k("m", "image", b)
+    assert k("m", "image", a) != k("m", "image", a, flags={"gray": True})
+
+
+def test_image_keys_hash_the_raw_pixels_in_pieces():
+    import hashlib
+    import numpy as np
+    pixels = np.random.default_rng(0).integers(0, 256, (700, 900, 3), dtype=np.uint8)
+    for img in (Image.fromarray(pixels), Image.fromarray(pixels).convert("1")):
+        # streamed into the hash block by block, but the same key tobytes() would give
+        h = hashlib.blake2b(f"pil:{img.mode}:{img.size}".encode() + img.tobytes(), digest_size=16)
+        assert PredictionCache.make_key("m", "image", img)[2] == h.hexdigest()
+
+
+def test_replacing_model_invalidates_its_entries():
+    mm = ModelManager(factories={"sentiment": lambda: _Counting("m1")})
+    mm.run("sentiment", "hello")
+    mm.set_model("sentiment", lambda: _Counting("m2"))
+    assert mm.run("sentiment", "hello")[0]["label"] == "m2"
+    assert mm.cache.stats()["size"] == 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import json, threading, time
+import pytest
+from tk_ai_gui.controller import ModelManager
+from tk_ai_gui.models.ensemble import EnsembleModel, ShadowModel, merge
+from tk_ai_gui.registry import ModelRegistry
+
+# Ensembles must merge members consistently and run them side by side; shadow mode must
+# never add the challenger's latency to the caller's.
+
+
+class Fixed:
+    def __init__(self, rows, delay=0.0):
+        self.rows, self.delay, self.model_id = rows, delay, f"fixed:{rows[0]['label']}"
+
+    def run(self, _x):
+        time.sleep(self.delay)
+        return self.rows
+
+    def run_batch(self, xs, batch_size=8):
+        return [self.run(x) for x in xs]
+
+
+def test_merge_strategies():
+    rows = {"a": [{"label": "cat", "score": 0.6}, {"label": "dog", "score": 0.4}],
+            "b": [{"label": "dog", "score": 0.9}, {"label": "cat", "score": 0.1}],
+            "c": [{"label": "dog", "score": 0.5}]}
+    assert merge(rows, "vote")[0] == {"label": "dog", "score": pytest.approx(2 / 3, abs=1e-6)}
+    assert merge(rows, "mean")[0]["label"] == "dog" and merge(rows, "mean")[0]["score"] == pytest.approx(0.6)
+    assert merge(rows, "weighted", weights={"a": 10})[0]["label"] == "cat"
+    with pytest.raises(ValueError):
+        merge(rows, "median")
+
+
+def test_members_run_concurrently_and_report_latency():
+    slow = {"a": Fixed([{"label": "x", "score": 1.0}], 0.2), "b": Fixed([{"label": "y", "score": 1.0}], 0.2)}
+    ens = EnsembleModel(slow, strategy="vote", weights={"a": 2})
+    t0 = time.perf_counter()
+    out = ens.run("in")
+    assert time.perf_counter() - t0 < 0.35  # side by side, not 0.4 s back to back
+    assert out[0]["label"] == "x" and set(ens.last_latency_ms) == {"a", "b"}
+    assert len(ens.run_batch(["1", "2", "3"])) == 3
+    ens.close()
+
+
+def test_shadow_returns_primary_and_logs_disagreements(tmp_path):
+    log = tmp_path / "shadow.jsonl"
+    gate = threading.Event()
+
+    class Blocked(Fixed):
+        def run(self, x):
+            gate.wait(5)
+            return super().run(x)
+
+    shadow = ShadowModel(Fixed([{"label": "POSITIVE", "score": 0.9}]),
+                         Blocked([{"label": "NEGATIVE", "score": 0.7}]), log_path=log)
+    # The challenger is stuck, yet the primary's answer comes straight back
+    assert shadow.run("great course")[0]["label"] == "POSITIVE"
+    gate.set()
+    assert shadow.wait()
+    rec = json.loads(log.read_text().splitlines()[0])
+    assert rec["input"] == "great course" and rec["challenger"][0]["label"] == "NEGATIVE"
+    assert shadow.stats()["disagreements"] == 1 and shadow.stats()["agreement"] == 0.0
+    shadow.close()
+
+
+def test_registry_builds_ensembles_from_member_keys(tmp_path):
+    reg = ModelRegistry.from_factories({"sentiment": lambda: Fixed([{"label": "POSITIVE", "score": 0.8}]),
+                                        "sentiment:v2": lambda: Fixed([{"label": "POSITIVE", "score": 0.6}])})
+    reg.register_ensemble("sentiment:ab", ["sentiment", "sentiment:v2"], strategy="mean")
+    reg.register_shadow("sentiment:shadow", "sentiment", "sentiment:v2", log_path=str(tmp_path / "s.jsonl"))
+    mm = ModelManager(registry=reg, cache=False)
+    assert mm.run("sentiment:ab", "hi") == [{"label": "POSITIVE", "score": pytest.approx(0.7)}]
+    assert mm.run("sentiment:shadow", "hi")[0]["score"] == 0.8
+    mm.close()
+
+
+def test_shadow_warmup_is_not_logged(tmp_path):
+    log = tmp_path / "s.jsonl"
+    reg = ModelRegistry.from_factories({"sentiment": lambda: Fixed([{"label": "POSITIVE", "score": 0.8}]),
+                                        "sentiment:v2": lambda: Fixed([{"label": "NEGATIVE", "score": 0.6}])})
+    reg.register_shadow("sentiment:shadow", "sentiment", "sentiment:v2", log_path=str(log))
+    mm = ModelManager(registry=reg, cache=False)
+    shadow = mm.get("sentiment:shadow")  # loading runs the "ok" warm-up
+    assert shadow.wait() and not log.exists() and shadow.stats()["compared"] == 0
+    mm.run("sentiment:shadow", "real input")
+    assert shadow.wait() and [json.loads(l)["input"] for l in log.read_text().splitlines()] == ["real input"]
+    mm.close()
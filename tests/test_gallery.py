@@ -0,0 +1,65 @@
+from __future__ import annotations
+import numpy as np
+from PIL import Image
+from tk_ai_gui.widgets.gallery import caption, cell_origin, classify_progressively, decode_thumb, visible_range
+
+# The gallery only draws and decodes what is on screen, so the grid maths must
+# pick exactly the visible cells, and folder classification must report
+# results batch by batch, in order, and stop when cancelled.
+
+
+def test_visible_range_covers_only_cells_on_screen():
+    # 10k images, 5 columns, 170 px rows, a 600 px tall view scrolled to row 100
+    r = visible_range(top=100 * 170, height=600, n=10_000, columns=5, cell_h=170)
+    assert r.start == 99 * 5 and r.stop == (100 + 3 + 1 + 1) * 5  # one margin row each side
+    assert visible_range(0, 600, 7, 5, 170) == range(0, 7)
+    assert visible_range(0, 600, 0, 5, 170) == range(0)
+    assert cell_origin(7, 5, 136, 170) == (2 * 136, 170)
+
+
+def test_caption_shows_top_label_and_score():
+    assert caption([{"label": "tabby, tabby cat", "score": 0.934}, {"label": "x", "score": 0.1}]) == \
+        "tabby, tabby cat  0.93"
+    assert caption([{"label": "a" * 40, "score": 1}]).startswith("a" * 17 + "…")
+    assert caption(None) == ""
+
+
+def test_classify_progressively_in_order_and_cancellable(tmp_path):
+    paths = []
+    for i in range(10):
+        p = tmp_path / f"{i}.png"
+        Image.fromarray(np.full((300, 200, 3), i * 20, np.uint8)).save(p)
+        paths.append(str(p))
+    assert decode_thumb(paths[0], size=64).size == (43, 64)
+
+    def run_batch(imgs):
+        return [[{"label": "gray", "score": float(np.asarray(im).mean()) / 255}] for im in imgs]
+
+    got = []
+    n = classify_progressively(run_batch, paths, on_batch=lambda start, rows: got.append((start, rows)), batch_size=4)
+    assert n == 10 and [s for s, _ in got] == [0, 4, 8]
+    scores = [rows[0]["score"] for _, batch in got for rows in batch]
+    assert scores == sorted(scores)
+
+    got.clear()
+    n = classify_progressively(run_batch, paths, on_batch=lambda s, r: got.append(s), cancelled=lambda: True,
+                               batch_size=4)
+    assert n == 4 and got == [0]
+
+
+def test_classify_progressively_skips_unreadable_files(tmp_path):
+    paths = []
+    for i in range(6):
+        p = tmp_path / f"{i}.png"
+        Image.fromarray(np.full((20, 20, 3), i * 40, np.uint8)).save(p)
+        paths.append(str(p))
+    (tmp_path / "3.png").write_bytes(b"garbage")
+
+    def run_batch(imgs):
+        return [[{"label": "gray", "score": float(np.asarray(im).mean())}] for im in imgs]
+
+    got = {}
+    n = classify_progressively(run_batch, paths, on_batch=lambda start, rows: got.update(enumerate(rows, start)),
+                               batch_size=2)
+    assert n == 6 and got[3] is None
+    assert [got[i][0]["score"] for i in (0, 1, 2, 4, 5)] == [0.0, 40.0, 80.0, 160.0, 200.0]
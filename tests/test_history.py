@@ -0,0 +1,114 @@
+from __future__ import annotations
+import csv, json
+from tk_ai_gui.controller import ModelManager
+from tk_ai_gui.history import HistoryStore
+
+# Every prediction lands in the history (written off-thread), pages come back
+# newest first with filters applied, and exports stream the same rows.
+
+
+class _Echo:
+    model_id = "echo-1"
+    task = "text-classification"
+
+    def run(self, x):
+        return [{"label": "LONG" if len(x) > 5 else "SHORT", "score": 0.75}]
+
+    def run_batch(self, xs, batch_size=8):
+        return [self.run(x) for x in xs]
+
+
+def test_record_query_and_filters(tmp_path):
+    store = HistoryStore(tmp_path / "h.sqlite", flush_ms=20)
+    try:
+        for i in range(25):
+            store.record("sentiment" if i % 2 else "image", f"input {i}",
+                         [{"label": "A" if i < 10 else "B", "score": i / 100}], latency_ms=i, ts=1000.0 + i)
+        assert store.flush()
+        assert store.count() == 25 and store.written == 25
+        page = store.query(offset=0, limit=10)
+        assert [r["input_preview"] for r in page[:2]] == ["input 24", "input 23"]
+        assert store.query(offset=20, limit=10)[-1]["input_preview"] == "input 0"
+        assert store.count(key="sentiment") == 12
+        assert store.count(label="A") == 10 and store.labels() == ["A", "B"]
+        assert [r["input_preview"] for r in store.query(text="input 1")][-1] == "input 1"
+        assert store.count(since=1020.0) == 5
+        assert page[0]["output"] == [{"label": "B", "score": 0.24}] and page[0]["input_hash"]
+    finally:
+        store.close()
+
+
+def test_export_jsonl_and_csv(tmp_path):
+    store = HistoryStore(tmp_path / "h.sqlite")
+    try:
+        for i in range(3):
+            store.record("sentiment", f"text {i}", [{"label": "POSITIVE", "score": 0.9}])
+        store.flush()
+        assert store.export(tmp_path / "out.jsonl") == 3
+        rows = [json.loads(line) for line in open(tmp_path / "out.jsonl", encoding="utf-8")]
+        assert rows[0]["input_preview"] == "text 0" and rows[0]["output"][0]["label"] == "POSITIVE"
+        assert store.export(tmp_path / "out.csv", key="sentiment") == 3
+        with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+            table = list(csv.DictReader(f))
+        assert len(table) == 3 and table[2]["top_label"] == "POSITIVE"
+    finally:
+        store.close()
+
+
+def test_model_manager_records_runs(tmp_path):
+    store = HistoryStore(tmp_path / "h.sqlite")
+    mm = ModelManager(factories={"sentiment": _Echo}, history=store)
+    try:
+        mm.run("sentiment", "hello there")
+        mm.run("sentiment", "hello there")  # answered from the cache
+        mm.run_batch("sentiment", ["hi", "hello there"])
+        mm.run_batch("sentiment", ["live", "typing"], record=False)  # e.g. live scoring
+        store.flush()
+        rows = store.query()
+        assert len(rows) == 4 and {r["model_id"] for r in rows} == {"echo-1"}
+        assert [bool(r["cached"]) for r in reversed(rows)] == [False, True, False, True]
+        assert rows[1]["top_label"] == "SHORT" and all(r["latency_ms"] >= 0 for r in rows)
+    finally:
+        mm.close()
+        store.close()
+    # Records after close are counted, not written
+    store.record("sentiment", "late", [])
+    assert store.dropped == 1
+
+
+def test_recording_never_reloads_an_evicted_model(tmp_path):
+    import contextlib
+    store = HistoryStore(tmp_path / "h.sqlite")
+    builds = []
+    mm = ModelManager(factories={"sentiment": lambda: builds.append(1) or _Echo()}, history=store, cache=False)
+    use = mm._use
+
+    @contextlib.contextmanager
+    def use_then_evict(key):
+        # the model is unloaded the moment the call releases it (as the residency cap may do)
+        with use(key) as model:
+            yield model
+        mm.unload(key)
+
+    mm._use = use_then_evict
+    try:
+        mm.run("sentiment", "hello there")
+        mm.run_batch("sentiment", ["a", "b"])
+        store.flush()
+        assert len(builds) == 2 and {r["model_id"] for r in store.query()} == {"echo-1"}
+    finally:
+        mm.close()
+        store.close()
+
+
+def test_bad_row_does_not_stop_the_writer(tmp_path):
+    store = HistoryStore(tmp_path / "h.sqlite", flush_ms=20)
+    try:
+        store.record("sentiment", "odd", [{"label": "X", "score": "not a number"}])
+        store.record("sentiment", "fine", [{"label": "POSITIVE", "score": 0.9}])
+        assert store.flush(timeout=5)
+        store.record("sentiment", "later", [{"label": "NEGATIVE", "score": 0.8}])
+        assert store.flush(timeout=5)
+        assert store.count() == 2 and store.dropped == 1
+    finally:
+        store.close()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import sys, tracemalloc
+import numpy as np
+import pytest
+from PIL import Image
+from tk_ai_gui.utils import imaging
+
+# The ndarray path must not make redundant full-resolution copies. numpy (and cv2,
+# which allocates through numpy) report to tracemalloc, so peak traced memory divided
+# by the size of one full image counts the full-size buffers a call creates.
+
+def _full_copies(fn, full_nbytes):
+    tracemalloc.start()
+    try:
+        out = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / full_nbytes, out
+
+
+@pytest.fixture(params=[True, False], ids=["cv2", "pillow"])
+def backend(request, monkeypatch):
+    if request.param and imaging._cv2() is None:
+        pytest.skip("cv2 not installed")
+    monkeypatch.setattr(imaging, "_CV2", imaging._cv2() if request.param else False)
+    return request.param
+
+
+def _big(tmp_path, ext):
+    arr = np.random.default_rng(0).integers(0, 255, (1500, 2000, 3), dtype=np.uint8)
+    path = tmp_path / f"big.{ext}"
+    Image.fromarray(arr).save(path)
+    return str(path), arr.nbytes
+
+
+def test_load_image_as_array_is_a_single_buffer(tmp_path, backend):
+    path, nbytes = _big(tmp_path, "png")
+    copies, arr = _full_copies(lambda: imaging.load_image(path, as_array=True), nbytes)
+    assert arr.shape == (1500, 2000, 3) and arr.dtype == np.uint8
+    # cv2: the decoded pixels themselves, colour-converted in place.
+    # Pillow: its tobytes() export briefly holds the chunks and the joined buffer.
+    assert copies < (1.2 if backend else 2.2)
+
+
+def test_reduced_decode_skips_full_resolution(tmp_path, backend):
+    path, nbytes = _big(tmp_path, "jpg")
+    copies, arr = _full_copies(lambda: imaging.load_image(path, as_array=True, max_size=(224, 224)), nbytes)
+    # Still at least the requested size, but decoded at a fraction of full resolution
+    assert arr.shape[0] >= 224 and arr.shape[1] >= 224
+    assert arr.shape[1] < 2000 and copies < 0.3
+
+
+def test_preprocess_array_makes_no_full_copy(backend):
+    arr = np.zeros((1500, 2000, 3), dtype=np.uint8)
+    copies, out = _full_copies(
+        lambda: imaging.preprocess_image_cv2(arr, size=(224, 224), gray=True, blur=True, as_array=True),
+        arr.nbytes)
+    assert out.shape == (224, 224, 3)
+    assert copies < 0.1
+
+
+def test_preprocess_still_returns_pil_by_default():
+    out = imaging.preprocess_image_cv2(Image.new("RGB", (50, 40)), size=(20, 10))
+    assert isinstance(out, Image.Image) and out.size == (20, 10) and out.mode == "RGB"
+
+
+def test_preprocess_batch_matches_per_image_path(backend):
+    rng = np.random.default_rng(0)
+    imgs = rng.integers(0, 255, (3, 48, 64, 3), dtype=np.uint8)
+    out = imaging.preprocess_batch(imgs, size=(32, 24))
+    assert out.shape == (3, 3, 24, 32) and out.dtype == np.float32 and out.flags.c_contiguous
+
+    # Same tensor as the per-image path followed by (x/255 - 0.5) / 0.5
+    ref = np.stack([(np.asarray(imaging.preprocess_image_cv2(im, size=(32, 24), as_array=True),
+                                dtype=np.float32) / 255 - 0.5) / 0.5 for im in imgs]).transpose(0, 3, 1, 2)
+    assert np.allclose(out, ref, atol=1e-5)
+
+    # Flags run on the whole batch and keep values in the normalised range
+    flagged = imaging.preprocess_batch(imgs, size=(32, 24), gray=True, blur=True, edges=True)
+    assert flagged.shape == out.shape and flagged.min() >= -1.0 and flagged.max() <= 1.0
+
+
+def test_preprocess_batch_skips_resize_for_model_sized_input():
+    imgs = np.full((2, 24, 32, 3), 255, dtype=np.uint8)
+    out = imaging.preprocess_batch(imgs, size=(32, 24), channels_first=False)
+    assert out.shape == (2, 24, 32, 3) and np.allclose(out, 1.0)
+
+
+def test_broken_cv2_falls_back_to_pillow(tmp_path, monkeypatch):
+    # cv2 installed but unloadable (e.g. no libGL on a headless node): Pillow takes over
+    stub = tmp_path / "stub"; stub.mkdir()
+    (stub / "cv2.py").write_text("raise ImportError('libGL.so.1: cannot open shared object file')\n")
+    monkeypatch.syspath_prepend(str(stub))
+    monkeypatch.delitem(sys.modules, "cv2", raising=False)
+    monkeypatch.setattr(imaging, "_CV2", None)
+    path = tmp_path / "small.png"
+    Image.fromarray(np.full((20, 30, 3), 9, np.uint8)).save(path)
+    assert imaging.load_image(str(path), as_array=True).shape == (20, 30, 3)
+    assert imaging.preprocess_image_cv2(Image.open(path), size=(8, 8)).size == (8, 8)
+    assert imaging._cv2() is None
+
+
+def test_preprocess_batch_never_writes_into_the_input(backend):
+    images = np.random.default_rng(2).integers(0, 255, (3, 32, 32, 3), dtype=np.uint8)
+    before = images.copy()
+    images.flags.writeable = False  # would raise if blur worked in place on the caller's array
+    for opts in ({"blur": True}, {"blur": True, "gray": True}, {"edges": True}):
+        out = imaging.preprocess_batch(images, size=(32, 32), **opts)
+        assert np.array_equal(images, before)
+        assert np.allclose(out, imaging.preprocess_batch(before.copy(), size=(32, 32), **opts))
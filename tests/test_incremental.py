@@ -0,0 +1,41 @@
+from __future__ import annotations
+from tk_ai_gui.incremental import IncrementalScorer, combine, split_sentences
+
+# Live mode only stays cheap if edits re-run just the sentences that changed.
+
+class _Model:
+    def __init__(self):
+        self.seen = []
+
+    def run_batch(self, sents):
+        self.seen.append(list(sents))
+        return [[{"label": "NEGATIVE" if "bad" in s else "POSITIVE", "score": 0.9}] for s in sents]
+
+
+def test_split_sentences():
+    assert split_sentences("Great day! Bad lunch.\nOk then") == ["Great day!", "Bad lunch.", "Ok then"]
+    assert split_sentences("   ") == []
+
+
+def test_only_changed_sentences_are_rescored():
+    m = _Model()
+    s = IncrementalScorer(m.run_batch)
+    first = s.score("Great day. Nice food.")
+    assert first["rescored"] == 2 and first["document"][0]["label"] == "POSITIVE"
+
+    second = s.score("Great day. Nice food. Really bad service.")
+    assert m.seen[-1] == ["Really bad service."] and second["rescored"] == 1
+    assert [r["label"] for r in second["sentences"]] == ["POSITIVE", "POSITIVE", "NEGATIVE"]
+
+
+def test_cancelled_before_model_call_returns_none():
+    m = _Model()
+    assert IncrementalScorer(m.run_batch).score("Fresh text.", cancelled=lambda: True) is None
+    assert m.seen == []
+
+
+def test_combine_is_length_weighted():
+    sents = ["a" * 30, "b" * 10]
+    rows = [[{"label": "POSITIVE", "score": 0.9}], [{"label": "NEGATIVE", "score": 0.9}]]
+    doc = combine(sents, rows)[0]
+    assert doc["label"] == "POSITIVE" and abs(doc["score"] - 0.7) < 1e-6
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import threading, time
+from tk_ai_gui.jobs import BATCH, INTERACTIVE, JobScheduler
+
+# The scheduler replaces the single _busy flag: lanes run in parallel, newer tagged jobs
+# supersede older ones and interactive work jumps ahead of batch work.
+
+def _wait(sched, n, timeout=5):
+    done, end = [], time.time() + timeout
+    while len(done) < n and time.time() < end:
+        done += sched.drain()
+        time.sleep(0.01)
+    return done
+
+
+def test_lanes_run_concurrently():
+    both_running = threading.Barrier(2, timeout=5)
+    sched = JobScheduler({"sentiment": 1, "image": 1})
+    results = []
+    for lane in ("sentiment", "image"):
+        sched.submit(lane, both_running.wait, on_done=lambda _r, lane=lane: results.append(lane))
+    _wait(sched, 2)
+    assert sorted(results) == ["image", "sentiment"]  # neither blocked the other
+
+
+def test_new_tagged_job_supersedes_pending_one():
+    gate = threading.Event()
+    sched = JobScheduler({"sentiment": 1})
+    got = []
+    sched.submit("sentiment", gate.wait)  # occupies the only worker
+    old = sched.submit("sentiment", lambda: "old", on_done=got.append, tag="live")
+    new = sched.submit("sentiment", lambda: "new", on_done=got.append, tag="live")
+    gate.set()
+    _wait(sched, 2)
+    assert old.status == "cancelled" and new.status == "done" and got == ["new"]
+
+
+def test_interactive_runs_before_batch():
+    gate = threading.Event()
+    order = []
+    sched = JobScheduler({"image": 1})
+    sched.submit("image", gate.wait)
+    sched.submit("image", lambda: order.append("batch"), priority=BATCH)
+    sched.submit("image", lambda: order.append("click"), priority=INTERACTIVE)
+    gate.set()
+    _wait(sched, 3)
+    assert order == ["click", "batch"]
+
+
+def test_errors_and_notify():
+    wakeups = []
+    sched = JobScheduler({"x": 1}, notify=lambda: wakeups.append(1))
+    errs = []
+    job = sched.submit("x", lambda: 1 / 0, on_error=errs.append)
+    _wait(sched, 1)
+    assert job.status == "error" and isinstance(errs[0], ZeroDivisionError)
+    assert len(wakeups) >= 3  # submitted, started, finished
+    assert sched.active() == 0
@@ -0,0 +1,71 @@
+from __future__ import annotations
+from tk_ai_gui.controller import ModelManager, _FALLBACKS
+from tk_ai_gui.models.lexicon import Lexicon, tokenize
+
+# The CPU-only sentiment tier: whole words only, negation, intensifiers and
+# contrast must move the score the right way, and the batch path must agree
+# with scoring lines one at a time.
+
+LEX = Lexicon()
+
+
+def label(text):
+    return LEX.predict([text])[0][0]["label"]
+
+
+def score(text):
+    return float(LEX.raw_scores([text])[0][0])
+
+
+def test_word_boundaries():
+    assert tokenize("Goodbye, good-ish... DON'T!") == ["goodbye", ",", "good", "ish", ".", ".", ".", "don't", "!"]
+    assert label("goodbye everyone") == "NEUTRAL" and label("") == "NEUTRAL"
+    assert label("the room was clean") == "POSITIVE" and label("the room was filthy") == "NEGATIVE"
+
+
+def test_negation_intensifiers_and_contrast():
+    assert label("this is not good") == "NEGATIVE" and label("not bad at all") == "POSITIVE"
+    assert label("never again, terrible") == "NEGATIVE"  # the comma ends the negation's scope
+    assert score("very good") > score("good") > score("slightly good") > 0
+    assert label("the food was great but the service was awful") == "NEGATIVE"
+    assert label("the food was awful but the service was great") == "POSITIVE"
+
+
+def test_batch_matches_single_lines():
+    texts = ["I love it", "meh", "not great, not terrible", "", "utterly disappointing", "ok\nawful", None]
+    assert LEX.predict(texts) == [LEX.predict([t])[0] for t in texts]
+    assert LEX.predict(["a \x1f b", "good"])[1][0]["label"] == "POSITIVE"  # separator inside a line
+
+
+def test_calibration_and_lexicon_file(tmp_path):
+    lex = Lexicon()
+    texts = ["good", "great stuff", "really nice", "bad", "awful", "not good"] * 5
+    fit = lex.calibrate(texts, ["POSITIVE", "POSITIVE", "POSITIVE", "NEGATIVE", "NEGATIVE", "NEGATIVE"] * 5)
+    assert fit["accuracy"] == 1.0 and fit["a"] > 0
+    p, _ = lex.predict_proba(["good", "bad"])
+    assert p[0] > 0.5 > p[1]
+
+    path = tmp_path / "extra.tsv"
+    path.write_text("# word\tweight\nyummy\t2.5\nmeh\t-9\n", encoding="utf-8")
+    extra = Lexicon.from_file(path)
+    assert extra.weights["yummy"] == 2.5 and extra.weights["meh"] == -3.0 and "good" in extra.weights
+    assert extra.predict(["yummy"])[0][0]["label"] == "POSITIVE"
+
+
+def test_fallback_uses_lexicon():
+    mm = ModelManager(factories=dict(_FALLBACKS), cache=False)
+    assert mm.run("sentiment", "goodbye")[0]["label"] == "NEUTRAL"
+    assert [r[0]["label"] for r in mm.run_batch("sentiment", ["not happy", "so happy"])] == ["NEGATIVE", "POSITIVE"]
+    assert "Fallback" in mm.get("sentiment").info() and mm.is_fallback("sentiment")
+
+
+def test_model_id_follows_weights_and_calibration(tmp_path):
+    from tk_ai_gui.models.lexicon import LexiconSentiment
+    base = LexiconSentiment(Lexicon())
+    assert base.model_id == LexiconSentiment(Lexicon()).model_id and base.model_id.startswith("lexicon:")
+    path = tmp_path / "extra.tsv"
+    path.write_text("yummy\t2\n", encoding="utf-8")
+    assert LexiconSentiment(Lexicon.from_file(path)).model_id != base.model_id
+    tuned = LexiconSentiment(Lexicon())
+    tuned.lexicon.calibrate(["good", "bad"], ["POSITIVE", "NEGATIVE"])
+    assert tuned.model_id != base.model_id
@@ -0,0 +1,47 @@
+from __future__ import annotations
+import io
+import pytest
+from tk_ai_gui.controller import ModelManager, _FALLBACKS
+from tk_ai_gui.models.long_text import aggregate, iter_chunks, score_long_text
+
+# Long documents are chunked with overlap, scored in batches and aggregated.
+
+def test_chunks_overlap_and_cover_everything():
+    words = [f"w{i}" for i in range(25)]
+    chunks = list(iter_chunks(" ".join(words), max_tokens=10, overlap=3, read_size=16))
+    assert [c["tokens"] for c in chunks] == [10, 10, 10, 4]
+    assert chunks[0]["text"].split()[-3:] == chunks[1]["text"].split()[:3]  # 3-token overlap
+    covered = set(w for c in chunks for w in c["text"].split())
+    assert covered == set(words)
+
+
+def test_streams_from_file_objects():
+    text = "good " * 5000
+    chunks = list(iter_chunks(io.StringIO(text), max_tokens=100, overlap=0, read_size=1024))
+    assert sum(c["tokens"] for c in chunks) == 5000
+    assert chunks[-1]["end"] == len(text.rstrip())
+
+
+def test_batches_and_aggregation_strategies():
+    calls = []
+
+    def run_batch(texts):
+        calls.append(len(texts))
+        return [[{"label": "NEGATIVE" if "bad" in t else "POSITIVE", "score": 0.9}] for t in texts]
+
+    text = "good " * 40 + "bad " * 10
+    out = score_long_text(run_batch, text, max_tokens=10, overlap=0, batch_size=2)
+    assert len(out[0]["chunks"]) == 5 and calls == [2, 2, 1]
+    assert out[0]["label"] == "POSITIVE" and "text" not in out[0]["chunks"][0]
+
+    chunks = [{"label": "NEGATIVE", "score": 0.99, "tokens": 1}, {"label": "POSITIVE", "score": 0.6, "tokens": 9}]
+    assert aggregate(chunks, "max_confidence")["label"] == "NEGATIVE"
+    assert aggregate(chunks, "length_weighted")["label"] == "POSITIVE"
+    with pytest.raises(ValueError):
+        aggregate(chunks, "median")
+
+
+def test_manager_run_long_with_fallback():
+    mm = ModelManager(factories=dict(_FALLBACKS), cache=False)
+    out = mm.run_long("sentiment", "I love this. " * 500, max_tokens=64, workers=2)
+    assert {"label", "score", "chunks"} <= set(out[0]) and len(out[0]["chunks"]) > 1
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import json, logging
+import pytest
+from tk_ai_gui.utils.decorators import log_call, logger, time_call
+from tk_ai_gui.utils.metrics import REGISTRY, Histogram
+
+# The decorators feed the metrics registry; log_call must cost nothing when INFO is off.
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def test_time_call_records_calls_errors_and_latency():
+    @time_call
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 1
+
+    work(); work()
+    with pytest.raises(ValueError):
+        work(fail=True)
+    s = REGISTRY.snapshot()[work.__qualname__]
+    assert s["calls"] == 3 and s["errors"] == 1 and s["in_flight"] == 0
+    assert sum(s["bucket_counts"]) == 3
+
+
+def test_log_call_is_lazy_when_info_is_off(monkeypatch):
+    class Loud:
+        def __str__(self):
+            raise AssertionError("str() must not run when INFO is disabled")
+
+    monkeypatch.setattr(logger, "level", logging.WARNING)
+    assert isinstance(log_call(lambda: Loud())(), Loud)
+
+
+def test_log_call_sampling(caplog):
+    f = log_call(sample=0.25)(lambda x: x)
+    with caplog.at_level(logging.INFO, logger="tk_ai_gui"):
+        for i in range(8):
+            f(i)
+    assert sum("->" in r.getMessage() for r in caplog.records) == 2
+
+
+def test_exports():
+    @time_call
+    def fast():
+        return None
+
+    fast()
+    prom = REGISTRY.to_prometheus()
+    name = fast.__qualname__
+    assert f'tk_ai_call_latency_ms_bucket{{func="{name}",le="+Inf"}} 1' in prom
+    assert f'tk_ai_calls_total{{func="{name}"}} 1' in prom
+    assert json.loads(REGISTRY.to_json())[name]["calls"] == 1
+
+
+def test_histogram_quantile_interpolates():
+    h = Histogram(buckets=(10, 20))
+    for v in (5, 15, 15, 15):
+        h.observe(v)
+    assert 10 <= h.quantile(0.5) <= 20 and h.quantile(0.0) <= 10
@@ -42,3 +42,56 @@ def test_offline_fallback_survives():
     assert isinstance(out1, list) and isinstance(out2, list)
     assert {"label", "score"}.issubset(out1[0].keys())
     assert {"label", "score"}.issubset(out2[0].keys())
+
+
+def test_run_batch_keeps_order_and_shape():
+    mm = ModelManager()
+    texts = ["I love it", "meh", "great stuff", "awful"]
+    out = mm.run_batch("sentiment", texts, batch_size=3)
+
+    # One prediction list per input, same schema as run()
+    assert len(out) == len(texts)
+    for rows in out:
+        assert isinstance(rows, list) and {"label", "score"}.issubset(rows[0].keys())
+
+    # Batched results must line up with the single-item path
+    assert [r[0]["label"] for r in out] == [mm.run("sentiment", t)[0]["label"] for t in texts]
+
+    imgs = [Image.new("RGB", (32, 32)) for _ in range(3)]
+    out2 = mm.run_batch("image", imgs, batch_size=2)
+    assert len(out2) == 3 and {"label", "score"}.issubset(out2[0][0].keys())
+
+
+def test_models_load_lazily_per_key():
+    calls = []
+
+    def broken_image():
+        calls.append("image")
+        raise RuntimeError("no weights offline")
+
+    mm = ModelManager(factories={"sentiment": lambda: calls.append("sentiment") or _Echo(),
+                                 "image": broken_image})
+    # Construction must not build any model
+    assert calls == [] and not mm.is_loaded("sentiment")
+
+    # First use builds only that key's model
+    assert mm.run("sentiment", "hi")[0]["label"] == "ECHO"
+    assert calls == ["sentiment"] and not mm.is_loaded("image")
+
+    # A failing model falls back on its own without touching the other key
+    out = mm.run("image", Image.new("RGB", (8, 8)))
+    assert {"label", "score"}.issubset(out[0].keys())
+    assert mm.is_fallback("image") and not mm.is_fallback("sentiment")
+
+
+def test_preload_runs_in_background():
+    done = []
+    mm = ModelManager(factories={"sentiment": _Echo, "image": _Echo})
+    mm.preload(["image"], on_done=done.append).join(timeout=5)
+    assert done == ["image"] and mm.is_loaded("image") and not mm.is_loaded("sentiment")
+
+
+class _Echo:
+    # Tiny stand-in model so the loading tests don't depend on real weights
+    def run(self, _x):
+        return [{"label": "ECHO", "score": 1.0}]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import json
+import pytest
+from tk_ai_gui.controller import ModelManager
+from tk_ai_gui.models.base import AIModelBase
+from tk_ai_gui.registry import ClassFactory, ModelRegistry, builtin_registry
+
+# The registry decides which models exist; ModelManager keeps only as many loaded as the cap allows.
+
+
+class Sized(AIModelBase):
+    # Fake model reporting a fixed weight size, so residency can be tested without torch
+    def __init__(self, model_id: str = "fake/a", nbytes: int = 100) -> None:
+        super().__init__(model_id=model_id, task="text-classification")
+        self.nbytes = nbytes
+
+    def run(self, input_data):
+        return [{"label": self.model_id, "score": 1.0}]
+
+    def param_bytes(self) -> int:
+        return self.nbytes
+
+
+def test_register_from_config_and_validate(tmp_path):
+    cfg = tmp_path / "models.json"
+    cfg.write_text(json.dumps({"models": [{"key": "image:resnet", "class": "tk_ai_gui.models.image_classifier:ImageClassifierModel",
+                                           "model_id": "microsoft/resnet-50", "kind": "image", "label": "ResNet-50"}]}))
+    reg = builtin_registry()
+    assert reg.load_config(cfg) == 1
+    assert reg.keys("image") == ["image", "image:resnet"] and reg.keys("text") == ["sentiment"]
+    spec = reg.by_label("ResNet-50")
+    assert isinstance(spec.factory, ClassFactory) and spec.factory.model_id == "microsoft/resnet-50"
+    with pytest.raises(TypeError):
+        reg.register("bad", dict)
+    with pytest.raises(ValueError):
+        reg.register("bad", Sized, kind="audio")
+
+
+def test_lru_residency_cap_unloads_cold_models():
+    reg = ModelRegistry()
+    for name in "abc":
+        reg.register(name, Sized, model_id=f"fake/{name}", fallback=False)
+    mm = ModelManager(registry=reg, cache=False, max_resident_bytes=250)
+    mm.run("a", "x"); mm.run("b", "x")
+    assert list(mm.resident()) == ["a", "b"]
+    mm.run("a", "x")       # a is now the most recently used
+    mm.run("c", "x")       # 300 bytes > cap: the coldest (b) goes
+    assert list(mm.resident()) == ["a", "c"] and not mm.is_loaded("b")
+    assert mm.run("b", "x")[0]["label"] == "fake/b"  # reloads on demand
+    assert list(mm.resident()) == ["c", "b"]
+
+
+def test_bad_config_entries_are_skipped(tmp_path, monkeypatch):
+    cls = "tk_ai_gui.models.image_classifier:ImageClassifierModel"
+    cfg = tmp_path / "models.json"
+    cfg.write_text(json.dumps({"models": [
+        {"key": "x", "task": "text-classification", "model_id": "m"},   # no "class"
+        {"class": cls, "kind": "image"},                                  # no "key"
+        {"key": "mix", "ensemble": ["image", "missing"]},                 # unknown member
+        {"key": "audio", "class": cls, "kind": "audio"},                  # invalid kind
+        "not an object",
+        {"key": "image:ok", "class": cls, "kind": "image"},
+    ]}))
+    reg = builtin_registry()
+    assert reg.load_config(cfg) == 1 and reg.keys() == ["sentiment", "image", "image:ok"]
+
+    # The same file through the environment must not stop ModelManager() from starting
+    monkeypatch.setenv("TK_AI_MODELS_CONFIG", str(cfg))
+    mm = ModelManager(cache=False)
+    try:
+        assert "image:ok" in mm.keys() and "x" not in mm.keys()
+    finally:
+        mm.close()
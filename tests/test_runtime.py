@@ -0,0 +1,63 @@
+from __future__ import annotations
+from tk_ai_gui.controller import ModelManager, _FALLBACKS
+from tk_ai_gui.runtime import RuntimeConfig, parse_cores, split_cores
+
+# Thread/process topology: config parsing must be predictable, and a model in a
+# worker process must behave exactly like the in-process one.
+
+def test_parse_and_split_cores():
+    assert parse_cores("0-3, 6") == [0, 1, 2, 3, 6]
+    assert parse_cores("") == []
+    assert split_cores(["sentiment", "image"], list(range(8))) == {"sentiment": [0, 1, 2, 3], "image": [4, 5, 6, 7]}
+    assert split_cores(["a", "b", "c"], [0]) == {"a": [0], "b": [0], "c": [0]}
+
+
+def test_env_overrides_file(tmp_path):
+    path = tmp_path / "runtime.json"
+    RuntimeConfig(threads={"image": 2}, cores={"image": [0, 1]}).save(path)
+    env = {"TK_AI_THREADS": "4", "TK_AI_INTEROP_THREADS_SENTIMENT": "1", "TK_AI_PROCESS_MODE": "yes"}
+    cfg = RuntimeConfig.load(path, env=env)
+    assert cfg.for_key("image") == {"threads": 2, "interop": None, "cores": [0, 1], "transport": "shm"}
+    assert cfg.for_key("sentiment") == {"threads": 4, "interop": 1, "cores": None, "transport": "shm"}
+    assert cfg.process_mode and not RuntimeConfig.load(tmp_path / "missing.json", env={}).process_mode
+
+
+def test_process_mode_runs_models_in_workers():
+    cfg = RuntimeConfig(threads={"*": 1}, cores={"sentiment": [0]}, process_mode=True)
+    mm = ModelManager(factories=dict(_FALLBACKS), cache=False, runtime=cfg)
+    try:
+        assert mm.run("sentiment", "I love it")[0]["label"] == "POSITIVE"
+        assert len(mm.run_batch("image", ["a", "b"])) == 2
+        assert mm.is_fallback("sentiment") and "Fallback" in mm.get("sentiment").info()
+        worker = mm.get("sentiment")
+    finally:
+        mm.close()
+    assert not worker.alive()
+
+
+def test_process_mode_splits_cores_unless_configured(tmp_path):
+    cfg = RuntimeConfig(process_mode=True)
+    split = cfg.auto_split(["sentiment", "image"])
+    assert set(split) == {"sentiment", "image"}
+    assert cfg.for_key("image")["cores"] == split["image"]
+    assert cfg.for_key("image")["threads"] == len(split["image"])
+    assert cfg.to_dict()["cores"] == {} and cfg.to_dict()["threads"] == {}  # automatic choices are not saved
+    assert RuntimeConfig(threads={"*": 2}, process_mode=True).auto_split(["a"]) == {}
+    assert RuntimeConfig().auto_split(["a"]) == {}  # thread mode: nothing to split
+
+
+def test_malformed_values_are_ignored(tmp_path):
+    path = tmp_path / "runtime.json"
+    path.write_text('{"threads": {"image": "lots", "sentiment": 2}, "cores": {"image": "x-y"}}')
+    env = {"TK_AI_THREADS": "four", "TK_AI_CORES_SENTIMENT": "0-1", "TK_AI_INTEROP_THREADS": "2"}
+    cfg = RuntimeConfig.load(path, env=env)
+    assert cfg.threads == {"sentiment": 2} and cfg.cores == {"sentiment": [0, 1]} and cfg.interop == {"*": 2}
+
+
+def test_unknown_transport_keeps_shm(tmp_path, caplog):
+    path = tmp_path / "runtime.json"
+    path.write_text('{"transport": "carrier-pigeon"}')
+    assert RuntimeConfig.load(path, env={}).transport == "shm"
+    assert RuntimeConfig.load(path, env={"TK_AI_TRANSPORT": "bogus"}).transport == "shm"
+    assert RuntimeConfig.load(path, env={"TK_AI_TRANSPORT": " Pickle "}).transport == "pickle"
+    assert "carrier-pigeon" in caplog.text and "TK_AI_TRANSPORT='bogus'" in caplog.text
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import base64, io, json, socket, threading, time, urllib.error, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from PIL import Image
+from tk_ai_gui.controller import ModelManager, _FALLBACKS
+from tk_ai_gui.registry import ModelRegistry, ModelSpec
+from tk_ai_gui.server import InferenceServer
+
+# The server is exercised end-to-end on localhost against the rule-based fallbacks.
+
+def _post(port, path, payload):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=json.dumps(payload).encode(),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as r:
+        return r.status, json.loads(r.read())
+
+
+@pytest.fixture
+def server():
+    srv = InferenceServer(ModelManager(factories=dict(_FALLBACKS), cache=False), port=0,
+                          max_batch=8, max_wait_ms=50)
+    port = srv.start_in_thread()
+    yield srv, port
+    srv.stop()
+
+
+def test_endpoints_and_health(server):
+    srv, port = server
+    status, body = _post(port, "/sentiment", {"text": "I love this"})
+    assert status == 200 and body["result"][0]["label"] == "POSITIVE"
+
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 16)).save(buf, format="PNG")
+    status, body = _post(port, "/image", {"image_b64": base64.b64encode(buf.getvalue()).decode()})
+    assert status == 200 and {"label", "score"} <= set(body["result"][0])
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=10) as r:
+        health = json.loads(r.read())
+    assert health["models"]["sentiment"]["fallback"] and health["models"]["sentiment"]["loaded"]
+
+
+def test_concurrent_requests_share_batches(server):
+    srv, port = server
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: _post(port, "/sentiment", {"text": f"great {i}"}), range(16)))
+    assert all(status == 200 for status, _ in results)
+    b = srv.batchers["sentiment"]
+    assert b.items == 16 and b.batches < 16  # several requests went through one model call
+
+
+def test_full_queue_answers_429():
+    release = threading.Event()
+
+    class Slow:
+        def run(self, x):
+            return [{"label": "X", "score": 1.0}]
+
+        def run_batch(self, xs, batch_size=8):
+            release.wait(5)
+            return [self.run(x) for x in xs]
+
+    srv = InferenceServer(ModelManager(factories={"sentiment": Slow, "image": Slow}, cache=False),
+                          port=0, max_batch=1, max_wait_ms=0, max_queue=1)
+    port = srv.start_in_thread()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futs = [pool.submit(_post, port, "/sentiment", {"text": str(i)}) for i in range(4)]
+            time.sleep(0.5)
+            release.set()
+            codes = []
+            for f in futs:
+                try:
+                    codes.append(f.result()[0])
+                except urllib.error.HTTPError as e:
+                    codes.append(e.code)
+        assert 429 in codes and 200 in codes
+    finally:
+        srv.stop()
+
+
+def test_bad_images_are_400_and_a_busy_port_raises(server, tmp_path):
+    srv, port = server
+    for payload in ({"image_b64": base64.b64encode(b"not an image").decode()},
+                    {"path": str(tmp_path / "missing.png")}):
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _post(port, "/image", payload)
+        assert e.value.code == 400
+
+    clash = InferenceServer(ModelManager(factories=dict(_FALLBACKS), cache=False), host="127.0.0.1", port=port)
+    with pytest.raises(OSError):
+        clash.start_in_thread(timeout=10)
+
+
+def test_list_requests_are_admitted_whole_and_bad_lengths_are_400():
+    seen = []
+
+    class Counting:
+        def run(self, x):
+            return [{"label": "X", "score": 1.0}]
+
+        def run_batch(self, xs, batch_size=8):
+            seen.extend(xs)
+            return [self.run(x) for x in xs]
+
+    srv = InferenceServer(ModelManager(factories={"sentiment": Counting, "image": Counting}, cache=False),
+                          port=0, max_batch=8, max_wait_ms=0, max_queue=2)
+    port = srv.start_in_thread()
+    try:
+        with pytest.raises(urllib.error.HTTPError) as e:
+            _post(port, "/sentiment", {"texts": [str(i) for i in range(5)]})
+        assert e.value.code == 429
+        time.sleep(0.2)
+        assert seen == []  # nothing from the rejected list reached the model
+
+        with socket.create_connection(("127.0.0.1", port), timeout=10) as s:
+            s.sendall(b"POST /sentiment HTTP/1.1\r\nHost: x\r\nContent-Length: abc\r\n\r\n")
+            assert s.recv(1024).split(b"\r\n")[0].split()[1] == b"400"
+    finally:
+        srv.stop()
+
+
+def test_every_registered_model_is_served():
+    class Shout:
+        def run(self, x):
+            return [{"label": x.upper(), "score": 1.0}]
+
+        def run_batch(self, xs, batch_size=8):
+            return [self.run(x) for x in xs]
+
+    reg = ModelRegistry.from_factories(dict(_FALLBACKS))
+    reg.add(ModelSpec("text:shout", Shout, kind="text"))
+    srv = InferenceServer(ModelManager(registry=reg, cache=False), port=0, max_wait_ms=0)
+    port = srv.start_in_thread()
+    try:
+        assert set(srv.batchers) == {"sentiment", "image", "text:shout"}
+        assert _post(port, "/predict/text:shout", {"texts": ["a", "b"]})[1]["results"][1][0]["label"] == "B"
+        assert _post(port, "/sentiment", {"text": "hi", "model": "text:shout"})[1]["result"][0]["label"] == "HI"
+        assert _post(port, "/sentiment", {"text": "I love this"})[1]["result"][0]["label"] == "POSITIVE"
+        for path, payload in (("/predict/nope", {"text": "x"}), ("/image", {"path": "x", "model": "text:shout"})):
+            with pytest.raises(urllib.error.HTTPError) as e:
+                _post(port, path, payload)
+            assert e.value.code == 404
+    finally:
+        srv.stop()
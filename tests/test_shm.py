@@ -0,0 +1,100 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+from PIL import Image
+from tk_ai_gui.shm import SharedImageRing, ShmReader
+from tk_ai_gui.workers import ModelWorker
+
+# Images handed to a worker process through shared memory must arrive intact,
+# and their slots must come back to the ring once the result is in.
+
+
+class ShapeEcho:
+    # Stand-in model (importable by the spawned worker) reporting what it received
+    def run(self, x):
+        score = 0.0 if isinstance(x, str) else float(np.asarray(x).mean())
+        return [{"label": f"{type(x).__name__}{getattr(x, 'shape', '')}", "score": score}]
+
+    def run_batch(self, xs, batch_size=8):
+        return [self.run(x) for x in xs]
+
+
+def test_ring_roundtrip_and_recycling():
+    ring = SharedImageRing(slots=2, slot_bytes=64 * 64 * 3)
+    reader = ShmReader()
+    try:
+        img = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        a, b = ring.acquire(), ring.acquire()
+        ref = ring.write(a, img)
+        assert np.array_equal(reader.view(ref), img) and ring.free() == 0
+        with pytest.raises(TimeoutError):
+            ring.acquire(timeout=0.01)
+        with pytest.raises(ValueError):
+            ring.write(b, np.zeros((65, 64, 3), np.uint8))
+        ring.release(a); ring.release(b)
+        assert ring.free() == 2
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_worker_shm_transport_matches_pickle():
+    img = Image.fromarray(np.full((40, 30, 3), 7, np.uint8))
+    arrays = [np.full((8, 8, 3), i, np.uint8) for i in range(5)]
+    results = {}
+    for transport in ("pickle", "shm"):
+        w = ModelWorker("image", ShapeEcho, transport=transport, ring_slots=2)
+        try:
+            results[transport] = (w.run(img), w.run_batch(arrays + ["path.jpg"]))
+            if transport == "shm":
+                assert w._ring.free() == w._ring.slots == 5  # grown to the 5 images, every slot recycled
+        finally:
+            w.close()
+    # The shm path delivers arrays (not PIL objects), with the same pixels
+    single, batch = results["shm"]
+    assert single[0]["label"] == "ndarray(40, 30, 3)" and single[0]["score"] == 7.0
+    assert [r[0]["score"] for r in batch[:5]] == [r[0]["score"] for r in results["pickle"][1][:5]]
+    assert batch[5][0]["label"] == "str"
+
+
+def test_concurrent_batches_share_the_ring_without_deadlock():
+    import threading
+    ring = SharedImageRing(slots=3, slot_bytes=16)
+    try:
+        held = ring.acquire_many(2)
+        with pytest.raises(TimeoutError):
+            ring.acquire_many(2, timeout=0.01)  # only one left: takes none rather than part
+        assert len(held) == 2 and ring.free() == 1
+    finally:
+        ring.close()
+
+    arrays = [np.full((8, 8, 3), i, np.uint8) for i in range(7)]
+    w = ModelWorker("image", ShapeEcho, transport="shm", ring_slots=3, slot_timeout=30)
+    try:
+        assert w._ring is None and w.run("text only")[0]["label"] == "str"
+        assert w._ring is None  # no pixels, no shared memory
+        out: list = []
+        threads = [threading.Thread(target=lambda: out.append(w.run_batch(arrays))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=60)
+        assert len(out) == 4 and all([r[0]["score"] for r in res] == list(range(7)) for res in out)
+        assert w._ring.free() == w._ring.slots == 7
+    finally:
+        w.close()
+
+
+class PieceSize(ShapeEcho):
+    def run_batch(self, xs, batch_size=8):
+        return [[{"label": "piece", "score": float(len(xs))}] for _ in xs]
+
+
+def test_ring_grows_so_a_full_batch_is_one_call():
+    arrays = [np.zeros((8, 8, 3), np.uint8) for _ in range(40)]
+    w = ModelWorker("image", PieceSize, transport="shm", ring_slots=8)
+    try:
+        sizes = [r[0]["score"] for r in w.run_batch(arrays, batch_size=16)]
+        assert sizes == [16.0] * 32 + [8.0] * 8 and w._ring.slots == 16
+    finally:
+        w.close()
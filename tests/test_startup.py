@@ -0,0 +1,50 @@
+from __future__ import annotations
+import json, os, subprocess, sys
+from pathlib import Path
+
+# Start-up budget: importing the GUI must not pull in the heavy libraries (they load
+# on first use), and `python -X importtime` must stay under a time budget.
+# TK_AI_IMPORT_BUDGET_MS raises the budget on slow machines.
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("numpy", "PIL", "cv2", "transformers", "torch", "onnxruntime", "ttkbootstrap")
+BUDGET_MS = float(os.environ.get("TK_AI_IMPORT_BUDGET_MS", 400))
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, HF_HUB_OFFLINE="1")
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+
+
+def _import_times(stderr: str) -> dict[str, float]:
+    # "import time: self [us] | cumulative | imported package" -> {module: cumulative ms}
+    out = {}
+    for line in stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            out[parts[2].strip()] = int(parts[1]) / 1000
+    return out
+
+
+def test_gui_import_defers_heavy_modules():
+    code = ("import json, sys, tk_ai_gui.main, tk_ai_gui.app\n"
+            "from tk_ai_gui.controller import ModelManager\n"
+            "ModelManager()\n"
+            f"print(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))")
+    proc = _python("-c", code)
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+
+def test_main_shows_splash_before_importing_the_app():
+    proc = _python("-c", "import sys, tk_ai_gui.main; print('tk_ai_gui.app' in sys.modules)")
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "False"
+
+
+def test_import_time_budget():
+    _python("-c", "import tk_ai_gui.app")  # warm the bytecode cache
+    times = _import_times(_python("-X", "importtime", "-c", "import tk_ai_gui.app").stderr)
+    assert "tk_ai_gui.app" in times
+    assert not [m for m in times if m.split(".")[0] in HEAVY]
+    assert times["tk_ai_gui.app"] < BUDGET_MS, sorted(times.items(), key=lambda kv: -kv[1])[:10]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import json
+from tk_ai_gui.widgets.table_model import TableModel, diff, format_row
+
+# The virtualized table only formats what is on screen, so the model's view,
+# windows and JSON chunks must agree exactly with the full, eager versions.
+
+
+def _rows(n):
+    return [{"label": f"label_{i % 7}", "score": (i * 37 % 100) / 100, "text": f"row {i}"} for i in range(n)]
+
+
+def test_window_sort_and_filter():
+    rows = _rows(1000)
+    m = TableModel(rows)
+    assert len(m) == 1000 and m.window(0, 3) == [format_row(r) for r in rows[:3]]
+    assert m.window(998, 10) == [format_row(r) for r in rows[998:]]
+
+    m.sort("score")  # score sorts high to low first
+    scores = [float(r[1]) for r in m.window(0, 1000)]
+    assert scores == sorted(scores, reverse=True)
+    m.sort("score")  # again: flips
+    assert float(m.window(0, 1)[0][1]) == min(r["score"] for r in rows)
+
+    m.set_filter("label_3", min_score=0.5)
+    expected = [r for r in rows if r["label"] == "label_3" and r["score"] >= 0.5]
+    assert len(m) == len(expected) and all(m.row(i)["label"] == "label_3" for i in range(len(m)))
+    m.set_filter("ROW 99")  # case-insensitive, matches the text column too
+    assert {m.row(i)["text"] for i in range(len(m))} == {"row 99", "row 990", "row 991", "row 992", "row 993",
+                                                         "row 994", "row 995", "row 996", "row 997", "row 998",
+                                                         "row 999"}
+
+
+def test_diff_reports_only_changed_positions():
+    old = [("a", "0.10", ""), ("b", "0.20", ""), ("c", "0.30", "")]
+    assert diff(old, old) == []
+    assert diff(old, [("a", "0.10", ""), ("B", "0.20", ""), ("c", "0.30", "")]) == [1]
+    assert diff(old, old[:1]) == [1, 2]
+    assert diff(old[:1], old) == [1, 2]
+
+
+def test_raw_chunks_match_full_json():
+    rows = _rows(45)
+    m = TableModel(rows)
+    text = "".join(m.raw_chunk(i, i + 10) for i in range(0, 45, 10))
+    assert text == json.dumps(rows, indent=2) == m.raw_json()
+    assert json.loads(text) == rows
+    assert TableModel([]).raw_chunk(0, 10) == "[]"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import numpy as np
+from tk_ai_gui.models.base import AIModelBase
+from tk_ai_gui.models.text_sentiment import TextSentimentModel, TokenCache, bucket_by_length, padding_waste
+
+# Length-bucketed batching must cut padding without changing any result, keep
+# input order, and tokenize each distinct text only once.
+
+
+class _WordTokenizer:
+    # Fast-tokenizer stand-in: [CLS] one id per word [SEP]; counts calls
+    model_max_length = 16
+    pad_token_id = 0
+    is_fast = True
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, truncation=True, max_length=16):
+        self.calls.append(list(texts))
+        ids = [[101] + [len(w) + 1 for w in t.split()][:max_length - 2] + [102] for t in texts]
+        return {"input_ids": ids}
+
+
+class _Pipe:
+    def __init__(self):
+        self.tokenizer = _WordTokenizer()
+        self.model = None
+
+
+class _FakeSentiment(TextSentimentModel):
+    # Skips loading weights; logits depend only on the unpadded tokens, so padding must not matter
+    def __init__(self):
+        AIModelBase.__init__(self, model_id="fake/sst2", task="text-classification")
+        self._set_pipeline(_Pipe())
+        self.token_cache = TokenCache(8)
+        self.widths = []
+
+    def _logits(self, input_ids, attention_mask):
+        self.widths.append(input_ids.shape[1])
+        pos = ((input_ids % 2 == 0) * attention_mask).sum(axis=1)
+        neg = ((input_ids % 2 == 1) * attention_mask).sum(axis=1)
+        return np.stack([neg, pos], axis=1).astype(np.float32)
+
+    def _id2label(self):
+        return {0: "NEGATIVE", 1: "POSITIVE"}
+
+
+def test_buckets_group_similar_lengths():
+    lengths = [3, 50, 4, 48, 5, 51, 2, 49]
+    batches = bucket_by_length(lengths, 4)
+    assert [sorted(lengths[i] for i in b) for b in batches] == [[48, 49, 50, 51], [2, 3, 4, 5]]
+    assert sorted(i for b in batches for i in b) == list(range(8))
+    naive = [list(range(i, i + 4)) for i in range(0, 8, 4)]
+    assert padding_waste(lengths, batches) < 0.1 < 0.4 < padding_waste(lengths, naive)
+
+
+def test_run_batch_matches_single_runs_in_input_order():
+    model = _FakeSentiment()
+    texts = ["a bb ccc", "this is a much longer review with many words in it", "ok", "a bb ccc", "no",
+             "another fairly long review text here too"]
+    out = model.run_batch(texts, batch_size=2)
+    assert len(out) == len(texts)
+    assert out == [model.run(t) for t in texts]
+    assert out[0] == out[3] and {r[0]["label"] for r in out} <= {"POSITIVE", "NEGATIVE"}
+    assert all(0.5 <= r[0]["score"] <= 1.0 for r in out)
+
+
+def test_padding_only_to_each_buckets_longest():
+    model = _FakeSentiment()
+    texts = ["x " * 12, "y", "z " * 13, "w w"]
+    model.run_batch(texts, batch_size=2)
+    assert model.widths == [15, 4]  # long pair, then short pair (not 15 and 15)
+
+
+def test_token_cache_tokenizes_each_text_once():
+    model = _FakeSentiment()
+    tok = model.tokenizer
+    model.run_batch(["one", "two", "one"])
+    model.run_batch(["two", "three"])
+    assert tok.calls == [["one", "two"], ["three"]]
+    assert model.token_cache.hits == 1 and model.token_cache.misses == 3
+    for i in range(10):  # bounded LRU
+        model.run(f"text {i}")
+    assert len(model.token_cache) == 8
+    # Keys are fixed-size digests: a long document is not kept around as a key
+    model.run("long " * 100_000)
+    assert all(isinstance(k, bytes) and len(k) == 16 for k in model.token_cache._ids)
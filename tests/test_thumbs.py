@@ -0,0 +1,84 @@
+from __future__ import annotations
+import os, time
+import numpy as np
+from PIL import Image
+from tk_ai_gui.utils.thumbs import ThumbnailCache
+
+# Previews must come back from the cache (memory, then disk) without decoding the
+# original again, go stale when the file changes, and the disk tier must stay bounded.
+
+
+def _photo(path, value=128, size=(800, 600)):
+    rng = np.random.default_rng(value)
+    Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)).save(path, quality=90)
+    return str(path)
+
+
+def test_build_then_hit_memory_and_disk(tmp_path):
+    src = _photo(tmp_path / "a.jpg")
+    cache = ThumbnailCache(tmp_path / "thumbs")
+    try:
+        assert cache.get(src, (200, 150)) is None
+        thumb = cache.request(src, (200, 150)).result(timeout=10)
+        assert thumb.size == (200, 150)
+        assert cache.get(src, (200, 150)) is thumb and cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1  # the GUI's get() then request() is one miss, not two
+    finally:
+        cache.close()
+    # A new cache (next start-up) finds it on disk
+    again = ThumbnailCache(tmp_path / "thumbs")
+    try:
+        hit = again.get(src, (200, 150))
+        assert hit is not None and hit.size == (200, 150) and again.stats()["disk_hits"] == 1
+        # Another thumbnail size is a different entry
+        assert again.get(src, (100, 75)) is None
+    finally:
+        again.close()
+
+
+def test_changed_file_is_a_miss(tmp_path):
+    src = _photo(tmp_path / "a.jpg")
+    cache = ThumbnailCache(tmp_path / "thumbs")
+    try:
+        cache.get_or_build(src, (64, 64))
+        _photo(src, value=7, size=(640, 640))
+        st = os.stat(src)
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert cache.get(src, (64, 64)) is None
+        assert cache.get_or_build(src, (64, 64)).size == (64, 64)
+    finally:
+        cache.close()
+
+
+def test_disk_tier_is_bounded_lru(tmp_path):
+    paths = [_photo(tmp_path / f"{i}.jpg", value=i) for i in range(6)]
+    cache = ThumbnailCache(tmp_path / "thumbs", memory_items=1)
+    try:
+        cache.get_or_build(paths[0], (160, 120))
+        cache.max_bytes = int(cache.stats()["disk_bytes"] * 3.5)  # room for three
+        for p in paths[1:3]:
+            cache.get_or_build(p, (160, 120))
+        cache.get(paths[0], (160, 120))  # paths[0] is now the most recently used
+        cache.get_or_build(paths[3], (160, 120))
+        assert cache.key(paths[0], (160, 120)) in cache._disk
+        assert cache.key(paths[1], (160, 120)) not in cache._disk  # least recently used goes first
+        for p in paths[4:]:
+            cache.get_or_build(p, (160, 120))
+        s = cache.stats()
+        assert s["disk_bytes"] <= cache.max_bytes and s["evictions"] == 3
+        assert len(list((tmp_path / "thumbs").glob("*.jpg"))) == s["disk_items"] == 3
+    finally:
+        cache.close()
+
+
+def test_callback_and_missing_file(tmp_path):
+    cache = ThumbnailCache(tmp_path / "thumbs")
+    got = []
+    try:
+        fut = cache.request(str(tmp_path / "missing.jpg"), (64, 64), lambda p, img: got.append((p, img)))
+        deadline = time.time() + 5
+        while not got and time.time() < deadline:
+            time.sleep(0.01)
+        assert fut.exception() is not None and got[0][1] is None
+    finally:
+        cache.close()
@@ -1,44 +1,67 @@
 from __future__ import annotations
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading, queue
+import os, queue
 from .controller import ModelManager
-from .widgets.panels import InputPanel, OutputPanel, InfoPanel, ImageState, OutputPreview
-from .utils.ui import ThemeManager, ToolTip
+from .history import HistoryStore
+from .incremental import IncrementalScorer
+from .jobs import BATCH, INTERACTIVE, JobScheduler
+from .widgets.gallery import GalleryPanel
+from .widgets.panels import InputPanel, OutputPanel, InfoPanel, MetricsPanel, JobsPanel, HistoryPanel, SettingsDialog, ImageState, OutputPreview
+from .utils.ui import StallMonitor, ThemeManager, ToolTip
 from .utils.decorators import error_handler
-from .utils.imaging import preprocess_image_cv2
+from .utils.imaging import load_image, preprocess_image_cv2
+from .utils.thumbs import ThumbnailCache
 
 class MainWindow:
-    def __init__(self, root):
+    LIVE_DEBOUNCE_MS = 300  # quiet time after the last keystroke before live scoring
+    LONG_TEXT_CHARS = 2000  # longer inputs are scored in overlapping chunks
+
+    def __init__(self, root, preload=("sentiment",)):
         # create the main window for the app
         self.root = root
         self.root.title("AI Studio — Tkinter + Transformers + OpenCV (Final)")
         self.root.geometry("1140x740")
 
-        # model manager will load and run ML models
-        self.mm = ModelManager()
+        # every prediction is recorded in the run history (batched writes on a background thread)
+        self.history = HistoryStore()
+
+        # image previews come from an on-disk thumbnail cache, built off the main thread
+        self.thumbs = ThumbnailCache()
+
+        # model manager will load and run ML models (lazily, on first use)
+        self.mm = ModelManager(history=self.history)
 
         # theme manager lets the user change color themes
         self.theme = ThemeManager(self.root)
 
-        # background job queue for running models without freezing UI
-        self._job_q: queue.Queue = queue.Queue()
+        # background jobs: one lane per model key so sentiment and image runs can overlap.
+        # Workers wake the UI with a Tk event instead of the UI polling a queue.
         self._last_result = None
-        self._busy = False
-        self.root.after(75, self._poll_job_queue)  # check job queue every 100ms
+        self._ui_q: queue.Queue = queue.Queue()  # other background messages (model loaded)
+        # (lanes are per model kind: one text model and one image model can run at once)
+        self.jobs = JobScheduler({"text": 1, "image": 1}, notify=self._wake)
+        self.mm.on_loading_change = lambda _key: self._wake()
+        self.root.bind("<<JobsChanged>>", self._on_jobs_changed)
+
+        # live sentiment: debounce keystrokes, then re-score only the sentences that changed
+        # (the scorer itself is made once the task selector exists)
+        self._live_after = None
 
         # ----- top bar with title, task selector, theme selector, and status -----
         top = ttk.Frame(self.root); top.pack(fill=tk.X, padx=10, pady=(10,6))
         ttk.Label(top, text="AI Model Studio", style="Title.TLabel").pack(side=tk.LEFT)
 
-        # task dropdown (choose between text sentiment and image classification)
+        # task dropdown: every model in the registry (built-ins, plugins, models.json)
         ttk.Label(top, text="Task:", padding=(12,0)).pack(side=tk.LEFT)
-        self.task_var = tk.StringVar(value="Text Sentiment")
+        labels = [spec.label for spec in self.mm.registry]
+        self.task_var = tk.StringVar(value=labels[0] if labels else "")
         self.task_combo = ttk.Combobox(top, state="readonly",
-            values=["Text Sentiment","Image Classification"],
-            textvariable=self.task_var, width=20)
+            values=labels,
+            textvariable=self.task_var, width=24)
         self.task_combo.pack(side=tk.LEFT)
         self.task_combo.bind("<<ComboboxSelected>>", self._on_task_change)
+        self.live = self._make_live_scorer()
 
         # theme dropdown (light, dark etc.)
         ttk.Label(top, text="Theme:", padding=(12,0)).pack(side=tk.LEFT)
@@ -55,6 +78,10 @@ class MainWindow:
         self.status = ttk.Label(top, text="Ready.")
         self.status.pack(side=tk.RIGHT, padx=(0,10))
 
+        # model load indicator: shows which models are still loading in the background
+        self.model_status = ttk.Label(top, text="")
+        self.model_status.pack(side=tk.RIGHT, padx=(0,10))
+
         # ----- split window: input panel on left, output/info tabs on right -----
         paned = ttk.Panedwindow(self.root, orient="horizontal")
         paned.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0,10))
@@ -63,26 +90,45 @@ class MainWindow:
         paned.add(left, weight=0); paned.add(right, weight=1)
 
         # input area (text box + buttons + browse image)
-        self.input_panel = InputPanel(left, self.on_run1, self.on_run2, self.on_clear, self.on_browse)
+        self.input_panel = InputPanel(left, self.on_run1, self.on_run2, self.on_clear, self.on_browse,
+                                      on_text_change=self._on_text_change)
         self.input_panel.frame.pack(fill=tk.BOTH, expand=True)
 
         # preview area (shows small version of chosen image)
         self.preview = OutputPreview(left)
         self.preview.frame.pack(fill=tk.X, expand=False, pady=(8,0))
 
-        # output area on the right: two tabs (results and model info)
+        # output area on the right: tabs for results, model info and live metrics
         self.nb = ttk.Notebook(right); self.nb.pack(fill=tk.BOTH, expand=True)
         self.output_panel = OutputPanel(self.nb)
         self.info_panel = InfoPanel(self.nb)
+        self.metrics_panel = MetricsPanel(self.nb)
+        self.jobs_panel = JobsPanel(self.nb, on_cancel=self.jobs.cancel)
+        self.history_panel = HistoryPanel(self.nb, self.history, self.mm.keys(),
+            run_async=lambda func, done: self.run_async(func, done, lane="image", priority=BATCH, name="export history"))
+        # folder gallery: thumbnails decode as they scroll into view, classification runs as a batch job
+        self.gallery = GalleryPanel(self.nb,
+            run_batch=lambda imgs: self.mm.run_batch(self._key_for("image"), imgs, batch_size=16),
+            run_job=lambda func, done, name: self.run_async(func, done, lane="image", tag="gallery",
+                                                            priority=BATCH, name=name),
+            on_open=self._open_image, thumbs=self.thumbs)
         self.nb.add(self.output_panel.frame, text="Results")
+        self.nb.add(self.gallery.frame, text="Gallery")
         self.nb.add(self.info_panel.frame, text="Info")
+        self.nb.add(self.metrics_panel.frame, text="Metrics")
+        self.nb.add(self.jobs_panel.frame, text="Jobs")
+        self.nb.add(self.history_panel.frame, text="History")
+        # metrics only refresh while their tab is showing
+        self.nb.bind("<<NotebookTabChanged>>", self._on_tab_change)
 
         # ----- menu bar (File + Help) -----
         menubar = tk.Menu(self.root)
         filemenu = tk.Menu(menubar, tearoff=0)
+        filemenu.add_command(label="Open Folder…", command=self._open_folder)
         filemenu.add_command(label="Save Result", command=self._save_result)
+        filemenu.add_command(label="Runtime Settings…", command=self._open_settings)
         filemenu.add_separator()
-        filemenu.add_command(label="Exit", command=self.root.destroy)
+        filemenu.add_command(label="Exit", command=self._on_exit)
         menubar.add_cascade(label="File", menu=filemenu)
 
         helpmenu = tk.Menu(menubar, tearoff=0)
@@ -90,62 +136,138 @@ class MainWindow:
             command=lambda: messagebox.showinfo("About", "HIT137 A3 — Tkinter + Hugging Face + OpenCV"))
         menubar.add_cascade(label="Help", menu=helpmenu)
         self.root.config(menu=menubar)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_exit)
 
         # keep track of selected image state
         self.image_state = ImageState()
 
-        # show model info for sentiment by default
-        self._refresh_info("sentiment")
+        # show model info for the selected model by default
+        self._refresh_info(self._current_key())
 
         # allow Ctrl+Enter as shortcut for running text analysis
         self.root.bind("<Control-Return>", lambda _: self.on_run1())
 
+        # how long the main thread is busy between events (Metrics tab: ui.stall).
+        # The heartbeat wakes Tk every 50 ms, so it only runs while the Metrics tab is
+        # showing, unless TK_AI_STALL_MONITOR=1 asks for it all the time
+        self.stalls = StallMonitor(self.root)
+        self._stalls_always = os.environ.get("TK_AI_STALL_MONITOR", "").strip().lower() in ("1", "true", "yes", "on")
+        if self._stalls_always:
+            self.stalls.start()
+
+        # start loading the default model(s) once the first frame is drawn
+        if preload:
+            self.root.after_idle(lambda: self._preload(preload))
+
     # ----- event handlers -----
 
+    def _current_key(self) -> str:
+        return self.mm.registry.by_label(self.task_var.get()).key
+
+    def _key_for(self, kind: str) -> str:
+        # the selected model if it takes this kind of input, else the first registered one that does
+        spec = self.mm.registry.by_label(self.task_var.get())
+        if spec.kind == kind:
+            return spec.key
+        keys = self.mm.keys(kind)
+        if not keys:
+            raise ValueError(f"No {kind} model is registered.")
+        return keys[0]
+
+    def _make_live_scorer(self):
+        key = self._key_for("text")
+        # live runs fire on every pause in typing, so they stay out of the history
+        scorer = IncrementalScorer(lambda sents: self.mm.run_batch(key, sents, record=False))
+        scorer.key = key
+        return scorer
+
     def _on_task_change(self, _):
         # switch model info panel when user changes task
-        key = "sentiment" if self.task_var.get().startswith("Text") else "image"
-        self._refresh_info(key)
+        self._refresh_info(self._current_key())
+        # live results are cached per sentence, so a different text model needs a fresh scorer
+        if self._key_for("text") != self.live.key:
+            self.live = self._make_live_scorer()
+
+    def _preload(self, keys):
+        # load models on a background thread; a UI message tells us when each is ready
+        def loaded(key):
+            self._ui_q.put(("model", key))
+            self._wake()
+        self.mm.preload(keys, on_done=loaded)
+
+    def _on_tab_change(self, _):
+        if self.nb.select() == str(self.history_panel.frame):
+            # let queued writes land so the newest runs show up
+            self.history.flush(timeout=0.5)
+            self.history_panel.refresh()
+        if self.nb.select() == str(self.metrics_panel.frame):
+            self.metrics_panel.start_auto_refresh()
+            if not self.stalls.running:
+                self.stalls.start()
+        else:
+            self.metrics_panel.stop_auto_refresh()
+            if not self._stalls_always:
+                self.stalls.stop()
 
     def _on_theme_change(self, _):
         # update theme when user picks another one
         self.theme.set_theme(self.theme_var.get())
 
-    # run a task in background thread and send result to queue
-    def run_async(self, func, on_done):
-        if self._busy:
-            self._set_status("Busy…")
-            return
-        self._busy = True
-        self.spin.start()
-        self._set_status("Running…")
+    # run a task on the job scheduler; on_done gets the result on the Tk main thread.
+    # Jobs with the same tag supersede each other (a newer run cancels the pending one).
+    def run_async(self, func, on_done, lane="text", tag=None, priority=INTERACTIVE, name=""):
+        def done(res):
+            if on_done: on_done(res)
+            self._set_status("Done.")
 
-        def worker():
-            try:
-                res = func()
-                self._job_q.put(("ok", res, on_done))
-            except Exception as e:
-                self._job_q.put(("err", e, None))
+        def failed(e):
+            messagebox.showerror("Error", str(e))
+            self._set_status("Error.")
 
-        threading.Thread(target=worker, daemon=True).start()
+        job = self.jobs.submit(lane, func, on_done=done, on_error=failed,
+                               priority=priority, tag=tag, name=name)
+        self._set_status(f"Queued job #{job.id}…")
+        return job
 
-    # check job queue regularly for finished tasks
-    def _poll_job_queue(self):
+    def _wake(self):
+        # called from any thread: schedule _on_jobs_changed on the Tk main thread
         try:
-            while True:
-                status, payload, cb = self._job_q.get_nowait()
-                if status == "ok":
-                    self._last_result = payload
-                    if cb: cb(payload)
-                    self._set_status("Done.")
+            self.root.event_generate("<<JobsChanged>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # window already closed
+
+    def _on_jobs_changed(self, _=None):
+        # finished jobs run their callbacks here, on the main thread
+        self.jobs.drain()
+        while True:
+            try:
+                kind, payload = self._ui_q.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "model" and payload == self._current_key():
+                # a background model load finished; refresh info if it is on screen
+                self._refresh_info(payload)
+            elif kind == "thumb" and payload[0] == self.image_state.path:
+                # a preview finished building; ignore it if another image was opened since
+                if payload[1] is None:
+                    self.preview.show_message("(could not open image)")
                 else:
-                    messagebox.showerror("Error", str(payload))
-                    self._set_status("Error.")
-                self.spin.stop()
-                self._busy = False
-        except queue.Empty:
-            pass
-        self.root.after(100, self._poll_job_queue)
+                    self.preview.show_thumbnail(payload[1])
+        active = self.jobs.active()
+        if active:
+            self.spin.start()
+            self._set_status(f"Running {active} job{'s' if active > 1 else ''}…")
+        else:
+            self.spin.stop()
+        self.jobs_panel.refresh(self.jobs.jobs())
+        self._update_model_status()
+
+    def _update_model_status(self):
+        # show which models are loading right now (empty when nothing is)
+        loading = sorted(self.mm.loading())
+        text = f"Loading {', '.join(loading)} model…" if loading else ""
+        if self.model_status.cget("text") != text:
+            self.model_status.configure(text=text)
 
     def _set_status(self, text: str):
         # update the status text shown on top bar
@@ -153,10 +275,20 @@ class MainWindow:
 
     def _refresh_info(self, key: str):
         # update info tab with current model details
-        model = self.mm.get(key)
+        if self.mm.is_loaded(key):
+            text = self.mm.get(key).info()
+            resident = self.mm.resident()
+            if len(resident) > 1 or self.mm.max_resident_bytes:
+                # which models are in memory, coldest first (unloaded past the cap)
+                text += "\n\nResident: " + ", ".join(f"{k} ({b / 2**20:.0f} MB)" for k, b in resident.items())
+        elif key in self.mm.loading():
+            text = f"The {key} model is loading in the background…"
+        else:
+            # never block the UI on a model load; it is built on first run instead
+            text = f"The {key} model is not loaded yet. It loads on first run."
         self.info_panel.model_info.config(state="normal")
         self.info_panel.model_info.delete("1.0", tk.END)
-        self.info_panel.model_info.insert("1.0", model.info())
+        self.info_panel.model_info.insert("1.0", text)
         self.info_panel.model_info.config(state="disabled")
 
     @error_handler
@@ -165,12 +297,28 @@ class MainWindow:
         path = filedialog.askopenfilename(
             filetypes=[('Image files','*.png;*.jpg;*.jpeg;*.bmp;*.gif')])
         if not path: return
-        from .utils.imaging import load_image
+        self._open_image(path)
+
+    def _open_image(self, path):
+        # make `path` the current image (Browse Image, or a double-click in the gallery).
+        # Nothing is decoded here: the preview comes from the thumbnail cache (or is built
+        # on its pool), and the full image is decoded by the classification job.
+        self.input_panel.input_var.set("Image")
         self.image_state.path = path
-        self.image_state.image = load_image(path)
-        self.preview.show_image(self.image_state.image)
+        self.image_state.image = None
+        thumb = self.thumbs.get(path, self.preview.SIZE)
+        if thumb is not None:
+            self.preview.show_thumbnail(thumb)
+        else:
+            self.preview.show_message("Loading preview…")
+            self.thumbs.request(path, self.preview.SIZE,
+                                lambda p, img: (self._ui_q.put(("thumb", (p, img))), self._wake()))
         self.nb.select(self.output_panel.frame)
 
+    def _open_folder(self):
+        self.nb.select(self.gallery.frame)
+        self.gallery.open_folder()
+
     @error_handler
     def on_run1(self):
         # run text sentiment analysis
@@ -179,14 +327,62 @@ class MainWindow:
         txt = self.input_panel.text_area.get("1.0", tk.END).strip()
         if not txt:
             raise ValueError("Please enter some text first.")
-        self._refresh_info("sentiment")
+        key = self._key_for("text")
+        self._refresh_info(key)
         # temporary placeholder until model finishes
         self.output_panel.render([{"label":"...", "score":0.0}])
-        self.run_async(lambda: self.mm.run("sentiment", txt), self._on_sentiment_done)
+        if len(txt) > self.LONG_TEXT_CHARS:
+            # long documents go through chunked scoring instead of one truncated call
+            self.run_async(lambda: self.mm.run_long(key, txt), self._on_long_done,
+                           lane="text", tag="run:text", name=f"{key} (long)")
+            return
+        self.run_async(lambda: self.mm.run(key, txt), self._on_sentiment_done,
+                       lane="text", tag="run:text", name=key)
+
+    def _on_text_change(self):
+        # restart the debounce timer on every keystroke; nothing heavy happens here
+        if self._live_after:
+            self.root.after_cancel(self._live_after)
+        self._live_after = self.root.after(self.LIVE_DEBOUNCE_MS, self._run_live)
+
+    def _run_live(self):
+        self._live_after = None
+        if self.input_panel.input_var.get() != "Text":
+            return
+        txt = self.input_panel.text_area.get("1.0", tk.END)
+        holder = {}
+
+        def work():
+            # give up before touching the model if a newer edit already superseded us
+            return self.live.score(txt, cancelled=lambda: "job" in holder and holder["job"].cancelled)
+
+        # tag "live": each new run cancels the stale one still waiting in the lane
+        holder["job"] = self.run_async(work, self._on_live_done, lane="text", tag="live", name="live")
+
+    def _on_live_done(self, res):
+        if res is None:
+            return
+        # document score first, then one row per sentence
+        doc = dict(res["document"][0], text="(whole text)")
+        self.output_panel.render([doc] + res["sentences"])
+
+    def _on_long_done(self, rows):
+        self._last_result = rows
+        # overall result first, then one row per chunk
+        overall = rows[0]
+        chunk_rows = [{"label": c["label"], "score": c["score"],
+                       "text": f"chunk {c['index'] + 1} (chars {c['start']}–{c['end']})"}
+                      for c in overall["chunks"]]
+        head = {"label": overall["label"], "score": overall["score"],
+                "text": f"(whole text, {overall['strategy']})"}
+        self.output_panel.render([head] + chunk_rows)
+        self._refresh_info(self._key_for("text"))
 
     def _on_sentiment_done(self, rows):
+        self._last_result = rows
         # update output panel once text analysis is ready
         self.output_panel.render(rows)
+        self._refresh_info(self._key_for("text"))
         self.nb.select(self.output_panel.frame)
 
     @error_handler
@@ -194,30 +390,59 @@ class MainWindow:
         # run image classification
         if self.input_panel.input_var.get() != "Image":
             raise ValueError("Input Type is not Image. Choose Image to run classifier.")
-        if self.image_state.image is None:
+        if self.image_state.path is None:
             raise ValueError("Please choose an image first (Browse Image).")
-        img = self.image_state.image
-        # optional preprocessing using OpenCV
-        if getattr(self.input_panel, "use_cv2", None) and self.input_panel.use_cv2.get():
-            img = preprocess_image_cv2(img, size=(224, 224), blur=False, edges=False, gray=False)
-        self._refresh_info("image")
+        path, state = self.image_state.path, self.image_state
+        use_cv2 = bool(getattr(self.input_panel, "use_cv2", None) and self.input_panel.use_cv2.get())
+        key = self._key_for("image")
+        self._refresh_info(key)
         self.output_panel.render([{"label":"...", "score":0.0}])
-        self.run_async(lambda: self.mm.run("image", img), self._on_image_done)
+
+        def work():
+            # decode (once per opened image) and preprocess on the job thread, not the Tk thread
+            img = state.image if state.path == path and state.image is not None else load_image(path)
+            if state.path == path:
+                state.image = img
+            # optional preprocessing using OpenCV
+            if use_cv2:
+                img = preprocess_image_cv2(img, size=(224, 224), blur=False, edges=False, gray=False)
+            return self.mm.run(key, img)
+
+        self.run_async(work, self._on_image_done, lane="image", tag="run:image", name=key)
 
     def _on_image_done(self, rows):
+        self._last_result = rows
         # update output once classification results are ready
         self.output_panel.render(rows)
+        self._refresh_info(self._key_for("image"))
         self.nb.select(self.output_panel.frame)
 
     def on_clear(self):
         # clear all inputs and outputs, reset state
         self.input_panel.text_area.delete("1.0", tk.END)
-        self.output_panel.output_text.delete("1.0", tk.END)
-        self.output_panel.table.load([])
-        self.preview.label.configure(image="", text="(no image)")
+        self.output_panel.clear()
+        self.preview.show_message("(no image)")
+        self.image_state.path = self.image_state.image = None
         self._last_result = None
         self._set_status("Cleared.")
 
+    def _open_settings(self):
+        SettingsDialog(self.root, self.mm.runtime, self.mm.keys(), on_save=self._save_settings)
+
+    @error_handler
+    def _save_settings(self, config):
+        path = config.save()
+        self.status.config(text=f"Runtime settings saved to {path}; restart to apply.")
+
+    def _on_exit(self):
+        self.gallery.close()
+        self.thumbs.close()
+        self.stalls.stop()
+        self.jobs.shutdown()
+        self.mm.close()
+        self.history.close()
+        self.root.destroy()
+
     def _save_result(self):
         # save last model output to JSON file
         if not self._last_result:
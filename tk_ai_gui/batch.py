@@ -0,0 +1,218 @@
+"""
+Headless batch runner: python -m tk_ai_gui.batch SOURCE -o results.jsonl
+
+SOURCE can be a folder or glob of images, or a .jsonl/.csv/.txt file of sentences.
+Each output line is {"id", "source", "result"} where result has the same
+[{"label", "score"}] schema as outputs/sample_*.json; an image that cannot be
+decoded gets {"id", "source", "error"} instead. No Tk display is needed.
+"""
+from __future__ import annotations
+import argparse, csv, glob, json, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+from .controller import ModelManager
+from .utils.imaging import StageTimer, classify_paths
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff"}
+TEXT_EXTS = {".jsonl", ".csv", ".txt"}
+
+
+def find_images(source: str) -> list[str]:
+    # A folder means every image inside it; anything else is treated as a glob pattern
+    if os.path.isdir(source):
+        paths = (str(p) for p in Path(source).rglob("*"))
+    else:
+        paths = glob.glob(source, recursive=True)
+    # Sorted so that checkpoints can refer to a stable position
+    return sorted(p for p in paths if Path(p).suffix.lower() in IMAGE_EXTS)
+
+
+def read_texts(path: str, field: str = "text") -> Iterator[str]:
+    suffix = Path(path).suffix.lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    yield obj[field] if isinstance(obj, dict) else str(obj)
+        elif suffix == ".csv":
+            reader = csv.reader(f)
+            header = next(reader, None)
+            # Use the named column when the header has it, else the first column
+            col = header.index(field) if header and field in header else 0
+            if header and field not in header:
+                yield header[col]
+            for row in reader:
+                if row:
+                    yield row[col]
+        else:
+            for line in f:
+                if line.strip():
+                    yield line.rstrip("\r\n")
+
+
+def detect_task(source: str) -> str:
+    if Path(source).suffix.lower() in TEXT_EXTS and os.path.isfile(source):
+        return "sentiment"
+    return "image"
+
+
+class Checkpoint:
+    """Remembers how many items (and output bytes) are safely written, next to the output file."""
+
+    def __init__(self, out_path: Path) -> None:
+        self.path = out_path.with_name(out_path.name + ".ckpt")
+
+    def load(self, source: str, task: str) -> tuple[int, int]:
+        if not self.path.exists():
+            return 0, 0
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("source") != source or data.get("task") != task:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different run; remove it or drop --resume.")
+        return int(data["done"]), int(data["offset"])
+
+    def save(self, source: str, task: str, done: int, offset: int) -> None:
+        # Write then rename, so a crash never leaves a half-written checkpoint
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"source": source, "task": task, "done": done, "offset": offset}),
+                       encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+def _chunks(items: list, size: int) -> Iterator[tuple[int, list]]:
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def _scored_batches(mm: ModelManager, task: str, todo: list[str], batch_size: int, workers: int,
+                    timer) -> Iterator[tuple[list[str], list]]:
+    """Yield (items, results) per batch, in input order."""
+    if mm.registry.get(task).kind == "image":
+        # Images stream through the decode pool while earlier batches are in inference
+        yield from classify_paths(lambda imgs: mm.run_batch(task, imgs, batch_size=batch_size),
+                                  todo, batch_size=batch_size, workers=workers,
+                                  prefetch=max(2 * batch_size, workers), timer=timer, skip_errors=True)
+        return
+
+    # Text: keep a bounded window of batches in flight and hand them back in order
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        chunks = _chunks(todo, max(1, batch_size))
+        pending: list = []
+
+        def submit_next() -> bool:
+            nxt = next(chunks, None)
+            if nxt is None:
+                return False
+            pending.append((nxt[1], pool.submit(_timed, timer, mm.run_batch, task, nxt[1], batch_size)))
+            return True
+
+        for _ in range(max(1, workers) * 2):
+            if not submit_next():
+                break
+        while pending:
+            batch, fut = pending.pop(0)
+            results = fut.result()
+            submit_next()
+            yield batch, results
+
+
+def _timed(timer, run_batch, task, batch, batch_size):
+    t0 = time.perf_counter()
+    res = run_batch(task, batch, batch_size=batch_size)
+    timer.add("inference", time.perf_counter() - t0, len(batch))
+    return res
+
+
+def run_batch_job(mm: ModelManager, task: str, items: list[str], out_path: Path, source: str,
+                  batch_size: int = 16, workers: int = 4, resume: bool = False,
+                  progress=sys.stderr) -> dict:
+    """Score items in batches, appending JSONL rows to out_path. Returns a summary dict."""
+    ckpt = Checkpoint(out_path)
+    done, offset = ckpt.load(source, task) if resume else (0, 0)
+    size = out_path.stat().st_size if out_path.exists() else -1
+    if offset and size < offset:
+        # The rows the checkpoint counts are gone (output deleted or cut short): start over
+        # rather than zero-filling up to the old offset
+        print(f"[batch] {out_path} is missing or shorter than its checkpoint; starting from the beginning",
+              file=sys.stderr)
+        done, offset = 0, 0
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    todo = items[done:]
+    timer = StageTimer()
+    start_t = time.perf_counter()
+    scored = 0
+    errors = 0
+    # Open for append from the last checkpointed byte, dropping any partial tail
+    with open(out_path, "r+b" if resume and out_path.exists() else "wb") as f:
+        f.seek(offset)
+        f.truncate()
+        for batch, results in _scored_batches(mm, task, todo, batch_size, workers, timer):
+            for item, rows in zip(batch, results):
+                if isinstance(rows, Exception):
+                    # unreadable file: record it and keep going, so --resume never trips on it again
+                    rec = {"id": done + scored, "source": item, "error": f"{type(rows).__name__}: {rows}"}
+                    errors += 1
+                else:
+                    rec = {"id": done + scored, "source": item, "result": rows}
+                f.write((json.dumps(rec) + "\n").encode("utf-8"))
+                scored += 1
+            f.flush()
+            ckpt.save(source, task, done + scored, f.tell())
+            if progress:
+                rate = scored / max(time.perf_counter() - start_t, 1e-9)
+                print(f"\r[batch] {done + scored}/{len(items)} items ({rate:.1f}/s)",
+                      end="", file=progress, flush=True)
+
+    elapsed = time.perf_counter() - start_t
+    ckpt.clear()  # finished cleanly, nothing left to resume
+    return {"task": task, "total": len(items), "skipped": done, "scored": scored, "errors": errors,
+            "seconds": round(elapsed, 3), "items_per_sec": round(scored / elapsed, 2) if elapsed else 0.0,
+            "out": str(out_path), "stages": timer.summary()}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m tk_ai_gui.batch",
+                                description="Run the sentiment or image model over many inputs without a GUI.")
+    p.add_argument("source", help="image folder or glob, or a .jsonl/.csv/.txt file of sentences")
+    p.add_argument("-o", "--out", default="outputs/batch_results.jsonl", help="output JSONL file")
+    p.add_argument("--task", help="registered model key, e.g. sentiment or image (default: guessed from SOURCE)")
+    p.add_argument("--field", default="text", help="text column/key for .csv and .jsonl inputs")
+    p.add_argument("--batch-size", type=int, default=16, help="items per model call")
+    p.add_argument("--workers", type=int, default=4,
+                   help="image decode threads, or text batches scored concurrently")
+    p.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    p.add_argument("--quiet", action="store_true", help="no progress line")
+    return p
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    mm = ModelManager()
+    task = args.task or detect_task(args.source)
+    if task not in mm.registry:
+        print(f"Unknown task {task!r}; registered: {', '.join(mm.keys())}", file=sys.stderr)
+        return 2
+    image = mm.registry.get(task).kind == "image"
+    items = find_images(args.source) if image else list(read_texts(args.source, args.field))
+    if not items:
+        print(f"No inputs found in {args.source}", file=sys.stderr)
+        return 1
+
+    summary = run_batch_job(mm, task, items, Path(args.out), args.source,
+                            batch_size=args.batch_size, workers=args.workers, resume=args.resume,
+                            progress=None if args.quiet else sys.stderr)
+    if not args.quiet:
+        print(file=sys.stderr)
+    # Final throughput summary, machine-readable
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import hashlib, json, os, sqlite3, threading, unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+# A cache key is (model_id, task, digest of the normalised input)
+CacheKey = tuple[str, str, str]
+
+
+def _digest_input(task: str, data: Any, flags: Optional[dict] = None) -> str:
+    """Hash the input the way the model would see it, plus any preprocessing flags."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, str) and task.startswith("image"):
+        # An image path: identify the file by its location, size and mtime
+        st = os.stat(data)
+        h.update(f"path:{os.path.abspath(data)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    elif isinstance(data, str):
+        # Text: normalise unicode and outer whitespace so trivial edits still hit
+        h.update(b"text:" + unicodedata.normalize("NFC", data.strip()).encode("utf-8"))
+    elif hasattr(data, "tobytes") and hasattr(data, "mode"):
+        # PIL image: hash the decoded pixels, not the file they came from
+        h.update(f"pil:{data.mode}:{data.size}".encode())
+        _hash_pil_pixels(h, data)
+    elif hasattr(data, "shape") and hasattr(data, "dtype"):
+        # NumPy array: shape/dtype plus the raw buffer (no copy when contiguous)
+        import numpy as np
+        arr = np.ascontiguousarray(data)
+        h.update(f"nd:{arr.dtype}:{arr.shape}".encode())
+        h.update(memoryview(arr).cast("B"))
+    else:
+        h.update(repr(data).encode("utf-8"))
+    if flags:
+        h.update(json.dumps(flags, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _hash_pil_pixels(h, img) -> None:
+    # Same bytes as img.tobytes() (so keys are unchanged), fed to the hash one encoder
+    # block at a time instead of joined into a second full-size copy of the image.
+    # np.asarray(img) would not help: Pillow builds the array from tobytes() too.
+    from PIL import Image, ImageFile
+    getencoder = getattr(Image, "_getencoder", None)
+    img.load()
+    if getencoder is None or not (img.width and img.height):
+        h.update(img.tobytes())
+        return
+    enc = getencoder(img.mode, "raw", img.mode)
+    enc.setimage(img.im, (0, 0) + img.size)
+    bufsize = max(ImageFile.MAXBLOCK, img.width * 4)
+    while True:
+        _, err, chunk = enc.encode(bufsize)
+        h.update(chunk)
+        if err:
+            break
+    if err < 0:
+        raise RuntimeError(f"encoder error {err} while hashing image")
+
+
+class PredictionCache:
+    """
+    Two-tier cache of model predictions.
+
+    Memory tier: an LRU of at most max_items entries.
+    Disk tier (optional): a sqlite file in cache_dir that survives restarts.
+    """
+
+    def __init__(self, max_items: int = 1024, cache_dir: Optional[str | Path] = None) -> None:
+        self.max_items = max_items
+        self._mem: OrderedDict[CacheKey, list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Counters for stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            path = Path(cache_dir)
+            path.mkdir(parents=True, exist_ok=True)
+            # One connection shared by all threads; every access goes through self._lock
+            self._db = sqlite3.connect(str(path / "predictions.sqlite"), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " model_id TEXT, task TEXT, digest TEXT, value TEXT,"
+                " PRIMARY KEY (model_id, task, digest))")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model_id: str, task: str, data: Any, flags: Optional[dict] = None) -> CacheKey:
+        return (model_id, task, _digest_input(task, data, flags))
+
+    def get(self, key: CacheKey) -> Optional[list[dict]]:
+        with self._lock:
+            rows = self._mem.get(key)
+            if rows is not None:
+                self._mem.move_to_end(key)  # mark as most recently used
+            elif self._db is not None:
+                hit = self._db.execute(
+                    "SELECT value FROM predictions WHERE model_id=? AND task=? AND digest=?",
+                    key).fetchone()
+                if hit:
+                    rows = json.loads(hit[0])
+                    self._remember(key, rows)  # promote to the memory tier
+            if rows is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Hand out copies so callers can't mutate what is cached
+            return [dict(r) for r in rows]
+
+    def put(self, key: CacheKey, rows: list[dict]) -> None:
+        rows = [dict(r) for r in rows]
+        with self._lock:
+            self._remember(key, rows)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                                 (*key, json.dumps(rows)))
+                self._db.commit()
+
+    def _remember(self, key: CacheKey, rows: list[dict]) -> None:
+        # Caller holds self._lock
+        self._mem[key] = rows
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)  # drop the least recently used entry
+            self.evictions += 1
+
+    def invalidate(self, model_id: Optional[str] = None) -> None:
+        """Drop entries for one model_id, or everything when model_id is None."""
+        with self._lock:
+            if model_id is None:
+                self._mem.clear()
+            else:
+                for k in [k for k in self._mem if k[0] == model_id]:
+                    del self._mem[k]
+            if self._db is not None:
+                if model_id is None:
+                    self._db.execute("DELETE FROM predictions")
+                else:
+                    self._db.execute("DELETE FROM predictions WHERE model_id=?", (model_id,))
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._mem), "max_items": self.max_items,
+                    "disk": self._db is not None}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,25 +1,18 @@
 from __future__ import annotations
-from .models.text_sentiment import TextSentimentModel
-from .models.image_classifier import ImageClassifierModel
+import contextlib, functools, gc, logging, os, threading, time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+from .cache import PredictionCache
+from .models.lexicon import LexiconSentiment
+from .registry import ModelRegistry, ModelSpec, default_registry
+from .runtime import RuntimeConfig
+from .utils.decorators import time_call
 
-# This is just a simple rule-based fallback for sentiment
-# If the actual ML model isn't available, we'll use this
-class _RuleSentimentFallback:
-    def info(self) -> str: 
-        return "Fallback Sentiment (rule-based)"
-
-    def run(self, text: str):
-        # In tis line we convert text to lowercase so we can match keywords easily
-        t = (text or "").lower()
-
-        # Here we Check if the text contains any "positive" words
-        pos = any(w in t for w in ["good","great","love","awesome","fantastic","happy"])
-
-        # If we find one, label it as POSITIVE, otherwise NEGATIVE
-        lab = "POSITIVE" if pos else "NEGATIVE"
-
-        # Just return a hardcoded confidence score for now
-        return [{"label": lab, "score": 0.75}]
+# CPU-only sentiment used when the transformer can't be loaded: a weighted lexicon
+# with negation and intensifiers, scored a whole batch at a time (models/lexicon.py)
+class _RuleSentimentFallback(LexiconSentiment):
+    def info(self) -> str:
+        return f"Fallback Sentiment (lexicon, {len(self.lexicon)} terms)"
 
 
 # Same idea here but for images, 
@@ -31,31 +24,369 @@ class _RuleImageFallback:
     def run(self, _img): 
         return [{"label":"object","score":0.50}]
 
+    def run_batch(self, imgs: list, batch_size: int = 8):
+        return [self.run(im) for im in imgs]
+
+    def preprocess_config(self) -> dict:
+        return {"size": (224, 224), "mean": (0.5, 0.5, 0.5), "std": (0.5, 0.5, 0.5)}
+
+    def run_pixels(self, pixel_values, top_k: int = 5):
+        # One constant prediction per image in the (N,3,H,W) batch
+        return [self.run(None) for _ in range(len(pixel_values))]
+
+
+def _identity(model) -> str:
+    model_id = getattr(model, "model_id", None)
+    if not model_id:
+        return f"fallback:{type(model).__name__}"
+    backend = getattr(model, "backend", "torch")
+    return model_id if backend == "torch" else f"{model_id}@{backend}"
+
+
+_FALLBACKS: dict[str, Callable] = {"sentiment": _RuleSentimentFallback, "image": _RuleImageFallback}
+# Rule-based stand-in per model kind (see registry.KINDS)
+_KIND_FALLBACKS: dict[str, Callable] = {"text": _RuleSentimentFallback, "image": _RuleImageFallback}
+
+# Quick smoke-test input per kind, run once right after loading
+_WARMUP = {"text": "ok"}
+
+
+def _rss_bytes() -> int:
+    # Current resident set size (Linux); 0 where /proc is not available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
 
 class ModelManager:
-    def __init__(self) -> None:
-        try:
-            # Here we try loading the actual ML models first
-            self._models = {
-                "sentiment": TextSentimentModel(), 
-                "image": ImageClassifierModel()
-            }
+    def __init__(self, factories: Optional[dict[str, Callable]] = None, preload: bool = False,
+                 cache: PredictionCache | bool = True, runtime: Optional[RuntimeConfig] = None,
+                 registry: Optional[ModelRegistry] = None, max_resident_bytes: Optional[int] = None,
+                 history=None) -> None:
+        # Which models exist: the registry (built-ins + entry points + models.json),
+        # or a plain {key: factory} dict for scripts and tests
+        if registry is None:
+            registry = ModelRegistry.from_factories(factories) if factories else default_registry()
+        self.registry = registry
+        # Nothing is loaded here; each model is built on first get()/run() for its key
+        self._factories = registry.factories()
+        # Loaded models in least- to most-recently-used order
+        self._models: OrderedDict = OrderedDict()
+
+        # Residency cap: when loaded models add up to more than this many bytes
+        # (parameters, or RSS growth during load), the coldest ones are unloaded.
+        # None = keep everything (default, or set TK_AI_MAX_RESIDENT_MB)
+        if max_resident_bytes is None and os.environ.get("TK_AI_MAX_RESIDENT_MB"):
+            max_resident_bytes = int(float(os.environ["TK_AI_MAX_RESIDENT_MB"]) * 1024 * 1024)
+        self.max_resident_bytes = max_resident_bytes
+        self._sizes: dict[str, int] = {}
+        self._in_use: dict[str, int] = {}
+        self._res_lock = threading.Lock()
+
+        # Prediction cache: True = in-memory LRU (plus a disk tier if TK_AI_CACHE_DIR is set),
+        # False = no caching, or pass your own PredictionCache
+        if cache is True:
+            cache = PredictionCache(cache_dir=os.environ.get("TK_AI_CACHE_DIR") or None)
+        self.cache: Optional[PredictionCache] = cache or None
+        # Optional HistoryStore: every prediction is queued there (written off-thread)
+        self.history = history
+        self._fallback: set[str] = set()
+        self._loading: set[str] = set()
+        # Optional callback(key) fired when a key starts or finishes loading (any thread)
+        self.on_loading_change: Optional[Callable[[str], None]] = None
+        # One lock per key so two threads never build the same model twice,
+        # while different keys can still load at the same time
+        self._locks = {k: threading.Lock() for k in self._factories}
 
-            # Quick test run to make sure the sentiment model works
-            _ = self._models["sentiment"].run("ok")
+        # Thread/process topology: settings file + TK_AI_* env vars unless given.
+        # Process mode wraps each factory so the model is built inside its own worker.
+        self.runtime = runtime if runtime is not None else RuntimeConfig.load()
+        if self.runtime.process_mode:
+            from .workers import ModelWorker
+            # Nothing configured: split the cores between the workers instead of oversubscribing
+            self.runtime.auto_split(list(self._factories))
+            for k, f in self._factories.items():
+                self._factories[k] = functools.partial(ModelWorker, k, f, **self.runtime.for_key(k))
+        elif not self.runtime.is_default():
+            self.runtime.apply_in_process(list(self._factories))
 
+        if preload:
+            self.preload()
+
+    def _load(self, key: str):
+        spec = self.registry.get(key)
+        self._loading.add(key)
+        self._loading_changed(key)
+        rss_before = _rss_bytes()
+        try:
+            # Here we try loading the actual ML model first
+            model = self._factories[key]()
+            if spec.kind in _WARMUP:
+                # Quick test run to make sure the model works; models whose run() has side
+                # effects (e.g. shadow logging) provide warmup() instead
+                warm = getattr(model, "warmup", None) or model.run
+                warm(_WARMUP[spec.kind])
+        except Exception as e:
+            # If this model fails (like not being available offline), fall back
+            # to the rule-based version for this key only
+            if not spec.fallback:
+                raise
+            logging.warning(f"Could not load '{key}' model, using fallback: {e}")
+            self._fallback.add(key)
+            model = _KIND_FALLBACKS[spec.kind]()
+        finally:
+            self._loading.discard(key)
+            self._loading_changed(key)
+        self._sizes[key] = self._measure(model, _rss_bytes() - rss_before)
+        return model
+
+    @staticmethod
+    def _measure(model, rss_delta: int) -> int:
+        # Parameter bytes when the model can report them, else how much RSS grew while loading
+        try:
+            size = int(model.param_bytes()) if hasattr(model, "param_bytes") else 0
         except Exception:
-            # If something fails (like models not being available),
-            # fall back to the simple rule-based versions
-            self._models = {
-                "sentiment": _RuleSentimentFallback(), 
-                "image": _RuleImageFallback()
-            }
-
-    # Get the model by its key ("sentiment" or "image")
+            size = 0
+        return size or max(0, rss_delta)
+
+    def _loading_changed(self, key: str) -> None:
+        if self.on_loading_change:
+            self.on_loading_change(key)
+
+    # Get the model by its registry key (e.g. "sentiment" or "image"), loading it if needed
     def get(self, key: str): 
-        return self._models[key]
+        model = self._models.get(key)
+        if model is not None:
+            self._touch(key)
+            return model
+        with self._locks.setdefault(key, threading.Lock()):
+            # Another thread may have finished loading while we waited
+            if key not in self._models:
+                model = self._load(key)
+                with self._res_lock:
+                    self._models[key] = model
+                self._evict(keep=key)
+            return self._models[key]
+
+    def _touch(self, key: str) -> None:
+        with self._res_lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+
+    @contextlib.contextmanager
+    def _use(self, key: str):
+        # Marks the model busy for the call so eviction never pulls it out mid-inference
+        with self._res_lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            yield self.get(key)
+        finally:
+            with self._res_lock:
+                self._in_use[key] -= 1
+
+    def _evict(self, keep: str) -> None:
+        # Unload least-recently-used idle models until the resident total fits the cap
+        if self.max_resident_bytes is None:
+            return
+        evicted = []
+        with self._res_lock:
+            while sum(self._sizes.get(k, 0) for k in self._models) > self.max_resident_bytes:
+                cold = next((k for k in self._models if k != keep and not self._in_use.get(k)), None)
+                if cold is None:
+                    break  # everything else is busy; go over the cap rather than fail
+                evicted.append((cold, self._models.pop(cold)))
+                self._sizes.pop(cold, None)
+                self._fallback.discard(cold)
+        for key, model in evicted:
+            logging.info(f"Unloaded cold model '{key}' to stay under the residency cap")
+            if hasattr(type(model), "close"):
+                model.close()
+        if evicted:
+            del model
+            gc.collect()
+
+    def unload(self, key: str) -> bool:
+        """Drop a loaded model (it is rebuilt on next use); False if it was not loaded or is busy."""
+        with self._res_lock:
+            if key not in self._models or self._in_use.get(key):
+                return False
+            model = self._models.pop(key)
+            self._sizes.pop(key, None)
+            self._fallback.discard(key)
+        if hasattr(type(model), "close"):
+            model.close()
+        return True
+
+    def resident(self) -> dict[str, int]:
+        """Loaded keys (least recently used first) and their estimated size in bytes."""
+        with self._res_lock:
+            return {k: self._sizes.get(k, 0) for k in self._models}
+
+    def keys(self, kind: Optional[str] = None) -> list[str]:
+        return self.registry.keys(kind)
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def is_fallback(self, key: str) -> bool:
+        # True when a load failed over, or the factory itself builds a rule-based model
+        model = self._models.get(key)
+        return (key in self._fallback or isinstance(model, tuple(_FALLBACKS.values()))
+                or getattr(model, "is_fallback", False))
+
+    def model_id(self, key: str) -> str:
+        # Identity used in cache keys; fallbacks have no model_id so use their class name.
+        # Non-default backends score slightly differently, so they get their own entries.
+        return _identity(self.get(key))
+
+    def set_model(self, key: str, factory: Callable) -> None:
+        """Swap the factory for a key; the old model and its cached predictions are dropped."""
+        with self._locks.setdefault(key, threading.Lock()):
+            with self._res_lock:
+                old = self._models.pop(key, None)
+                self._sizes.pop(key, None)
+            if key in self.registry:
+                self.registry.get(key).factory = factory
+            else:
+                self.registry.add(ModelSpec(key, factory, kind="image" if key == "image" else "text"))
+            if self.runtime.process_mode:
+                from .workers import ModelWorker
+                factory = functools.partial(ModelWorker, key, factory, **self.runtime.for_key(key))
+            self._factories[key] = factory
+            self._fallback.discard(key)
+        if old is not None and self.cache is not None:
+            self.cache.invalidate(_identity(old))
+        if old is not None and hasattr(type(old), "close"):
+            old.close()
+
+    def close(self) -> None:
+        """Stop model worker processes (process mode); in-process models just get dropped."""
+        with self._res_lock:
+            models = list(self._models.values())
+            self._models.clear()
+            self._sizes.clear()
+        for model in models:
+            if hasattr(type(model), "close"):
+                model.close()
+
+    def loading(self) -> set[str]:
+        # Keys whose models are being built right now (used for the status indicator)
+        return set(self._loading)
+
+    def preload(self, keys: Optional[Iterable[str]] = None,
+                on_done: Optional[Callable[[str], None]] = None) -> threading.Thread:
+        """Load models in a background thread; on_done(key) is called from that thread."""
+        todo = list(keys) if keys is not None else list(self._factories)
+
+        def worker():
+            for key in todo:
+                self.get(key)
+                if on_done: on_done(key)
+
+        t = threading.Thread(target=worker, daemon=True)
+        t.start()
+        return t
+
+    @staticmethod
+    def _describe(key: str, model) -> tuple[str, str]:
+        # (model identity, task) for cache keys and history rows, taken from a model we hold
+        return _identity(model), getattr(model, "task", None) or key
+
+    def _cache_keys(self, key: str, inputs: list, flags: Optional[dict]) -> tuple[list[str], tuple[str, str]]:
+        ident = self._describe(key, self.get(key))
+        return [self.cache.make_key(ident[0], ident[1], x, flags) for x in inputs], ident
+
+    # Run the model on given input data (served from the cache when seen before).
+    # flags: optional preprocessing flags that should be part of the cache key
+    @time_call
+    def run(self, key: str, input_data, flags: Optional[dict] = None): 
+        t0 = time.perf_counter()
+        if self.cache is None:
+            with self._use(key) as model:
+                out = model.run(input_data)
+                ident = self._describe(key, model)
+            self._record(key, ident, [input_data], [out], t0)
+            return out
+        (ck,), ident = self._cache_keys(key, [input_data], flags)
+        hit = self.cache.get(ck)
+        if hit is not None:
+            self._record(key, ident, [input_data], [hit], t0, cached=[True])
+            return hit
+        with self._use(key) as model:
+            out = model.run(input_data)
+            ident = self._describe(key, model)
+        self.cache.put(ck, out)
+        self._record(key, ident, [input_data], [out], t0)
+        return out
+
+    def _record(self, key: str, ident: tuple[str, str], inputs: list, outputs: list, t0: float,
+                cached: Optional[list[bool]] = None) -> None:
+        # Hand results to the history store (a queue put per item; hashing and I/O happen on its thread).
+        # ident comes from the model while it was held, so recording never reloads an evicted model.
+        if self.history is None:
+            return
+        per_item = (time.perf_counter() - t0) * 1000 / max(1, len(inputs))
+        model_id, task = ident
+        for i, (x, rows) in enumerate(zip(inputs, outputs)):
+            self.history.record(key, x, rows, model_id=model_id, task=task, latency_ms=per_item,
+                                cached=bool(cached and cached[i]))
+
+    # Score a document of any length (str or open text file) in overlapping chunks.
+    # Returns [{"label", "score", "strategy", "chunks": [...]}] with per-chunk results.
+    @time_call
+    def run_long(self, key: str, text, strategy: str = "length_weighted", max_tokens: Optional[int] = None,
+                 overlap: int = 32, batch_size: int = 8, workers: int = 1):
+        t0 = time.perf_counter()
+        with self._use(key) as model:
+            if hasattr(model, "run_long"):
+                out = model.run_long(text, strategy=strategy, max_tokens=max_tokens, overlap=overlap,
+                                     batch_size=batch_size, workers=workers)
+            else:
+                # Rule-based models have no tokenizer: chunk on words instead
+                from .models.long_text import score_long_text
+                out = score_long_text(lambda chunk: model.run_batch(chunk, batch_size=batch_size), text,
+                                      max_tokens=max_tokens or 256, overlap=overlap, batch_size=batch_size,
+                                      workers=workers, strategy=strategy)
+            ident = self._describe(key, model)
+        if isinstance(text, str):
+            # History keeps the overall result; the per-chunk detail can be large
+            self._record(key, ident, [text], [[{k: v for k, v in out[0].items() if k != "chunks"}]], t0)
+        return out
+
+    # Run the image model on a normalised (N,3,H,W) batch from utils.imaging.preprocess_batch
+    def run_pixels(self, key: str, pixel_values, top_k: int = 5):
+        with self._use(key) as model:
+            return model.run_pixels(pixel_values, top_k=top_k)
 
-    # Run the model on given input data
-    def run(self, key: str, input_data): 
-        return self._models[key].run(input_data)
+    # Run the model on a list of inputs, batch_size items per forward pass.
+    # Returns one [{"label", "score"}] list per input, in input order.
+    # Cached inputs are answered directly; only the misses reach the model.
+    # record=False keeps the run out of the history (e.g. live scoring while typing).
+    @time_call
+    def run_batch(self, key: str, inputs, batch_size: int = 8, flags: Optional[dict] = None,
+                  record: bool = True):
+        inputs = list(inputs)
+        t0 = time.perf_counter()
+        if self.cache is None:
+            with self._use(key) as model:
+                out = model.run_batch(inputs, batch_size=batch_size)
+                ident = self._describe(key, model)
+            if record:
+                self._record(key, ident, inputs, out, t0)
+            return out
+        keys, ident = self._cache_keys(key, inputs, flags)
+        out: list = [self.cache.get(k) for k in keys]
+        todo = [i for i, rows in enumerate(out) if rows is None]
+        cached = [rows is not None for rows in out]
+        if todo:
+            with self._use(key) as model:
+                fresh = model.run_batch([inputs[i] for i in todo], batch_size=batch_size)
+                ident = self._describe(key, model)
+            for i, rows in zip(todo, fresh):
+                self.cache.put(keys[i], rows)
+                out[i] = rows
+        if record:
+            self._record(key, ident, inputs, out, t0, cached=cached)
+        return out
@@ -0,0 +1,220 @@
+from __future__ import annotations
+import csv, json, logging, os, queue, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from .cache import _digest_input
+
+# Default location; override with TK_AI_HISTORY (a file path) or pass path=
+DEFAULT_PATH = Path.home() / ".tk_ai_gui" / "history.sqlite"
+
+COLUMNS = ("id", "ts", "key", "model_id", "task", "input_hash", "input_preview",
+           "top_label", "top_score", "latency_ms", "cached", "output")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL, key TEXT, model_id TEXT, task TEXT,
+    input_hash TEXT, input_preview TEXT,
+    top_label TEXT, top_score REAL, latency_ms REAL, cached INTEGER,
+    output TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_ts ON runs (ts);
+CREATE INDEX IF NOT EXISTS runs_key_ts ON runs (key, ts);
+CREATE INDEX IF NOT EXISTS runs_label ON runs (top_label);
+"""
+
+
+def preview_input(x) -> str:
+    # Short human-readable stand-in for an input: the text itself, or an image/path summary
+    if isinstance(x, str):
+        return x if len(x) <= 200 else x[:200] + "…"
+    size = getattr(x, "size", None) if hasattr(x, "mode") else getattr(x, "shape", None)
+    return f"<{type(x).__name__} {tuple(size) if size is not None else ''}>"
+
+
+class HistoryStore:
+    """
+    Append-only run history in sqlite (WAL mode).
+
+    record() only puts a dict on a queue, so the inference path never waits on
+    disk. A writer thread hashes inputs, then inserts whatever has queued up in one
+    transaction every flush_ms (or once max_batch rows are waiting). Reads use their
+    own connection and, thanks to WAL, never block the writer.
+    """
+
+    def __init__(self, path: Optional[str | Path] = None, flush_ms: float = 200.0, max_batch: int = 500) -> None:
+        self.path = Path(path or os.environ.get("TK_AI_HISTORY") or DEFAULT_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_s = flush_ms / 1000.0
+        self.max_batch = max_batch
+        self.dropped = 0
+        self.written = 0
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+
+        db = self._connect()
+        db.executescript(_SCHEMA)
+        db.commit()
+        db.close()
+        # Reader connection for the GUI thread; the writer opens its own
+        self._reader = self._connect()
+        self._read_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a crash can lose the last few batches, never corrupt the file
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # ----- writing -----
+
+    def record(self, key: str, input_data: Any, output: list, model_id: str = "", task: str = "",
+               latency_ms: float = 0.0, cached: bool = False, ts: Optional[float] = None) -> None:
+        """Queue one prediction; returns immediately."""
+        if self._closed:
+            self.dropped += 1
+            return
+        self._q.put((ts or time.time(), key, model_id, task, input_data, output, latency_ms, cached))
+
+    def _row(self, item) -> tuple:
+        ts, key, model_id, task, data, output, latency_ms, cached = item
+        try:
+            digest = _digest_input(task or ("image" if not isinstance(data, str) else "text"), data)
+        except OSError:  # an image path that has since disappeared
+            digest = None
+        top = output[0] if output and isinstance(output[0], dict) else {}
+        return (ts, key, model_id, task, digest, preview_input(data), top.get("label"),
+                float(top["score"]) if "score" in top else None, round(latency_ms, 3), int(cached),
+                json.dumps(output, default=str))
+
+    def _writer(self) -> None:
+        db = self._connect()
+        while True:
+            try:
+                item = self._q.get(timeout=self.flush_s)
+            except queue.Empty:
+                continue
+            batch, waiters, stop = [], [], False
+            # Collect everything queued so far (up to max_batch) into one transaction
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+            rows = []
+            for i in batch:
+                # One odd result (e.g. a non-numeric score) costs its own row, not the writer thread
+                try:
+                    rows.append(self._row(i))
+                except Exception as e:
+                    logging.warning(f"Could not record history row for '{i[1]}': {e}")
+                    self.dropped += 1
+            if rows:
+                try:
+                    with db:
+                        db.executemany("INSERT INTO runs (ts, key, model_id, task, input_hash, input_preview,"
+                                       " top_label, top_score, latency_ms, cached, output)"
+                                       " VALUES (?,?,?,?,?,?,?,?,?,?,?)", rows)
+                    self.written += len(rows)
+                except sqlite3.Error as e:
+                    logging.warning(f"Could not write {len(rows)} history rows: {e}")
+                    self.dropped += len(rows)
+            for w in waiters:
+                w.set()
+            if stop:
+                db.close()
+                return
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything recorded so far is on disk."""
+        done = threading.Event()
+        self._q.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(None)
+        self._thread.join(timeout=10)
+        with self._read_lock:
+            self._reader.close()
+
+    # ----- reading -----
+
+    @staticmethod
+    def _where(key: Optional[str] = None, label: Optional[str] = None, text: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None) -> tuple[str, list]:
+        clauses, args = [], []
+        if key:
+            clauses.append("key = ?"); args.append(key)
+        if label:
+            clauses.append("top_label = ?"); args.append(label)
+        if text:
+            clauses.append("input_preview LIKE ?"); args.append(f"%{text}%")
+        if since is not None:
+            clauses.append("ts >= ?"); args.append(since)
+        if until is not None:
+            clauses.append("ts < ?"); args.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def count(self, **filters) -> int:
+        where, args = self._where(**filters)
+        with self._read_lock:
+            return self._reader.execute(f"SELECT COUNT(*) FROM runs{where}", args).fetchone()[0]
+
+    def query(self, offset: int = 0, limit: int = 100, **filters) -> list[dict]:
+        """One page of runs, newest first, as dicts (output decoded)."""
+        where, args = self._where(**filters)
+        with self._read_lock:
+            cur = self._reader.execute(f"SELECT {', '.join(COLUMNS)} FROM runs{where}"
+                                       " ORDER BY id DESC LIMIT ? OFFSET ?", args + [limit, offset])
+            rows = [dict(zip(COLUMNS, r)) for r in cur.fetchall()]
+        for r in rows:
+            r["output"] = json.loads(r["output"]) if r["output"] else []
+        return rows
+
+    def labels(self, key: Optional[str] = None) -> list[str]:
+        where, args = self._where(key=key)
+        with self._read_lock:
+            return [r[0] for r in self._reader.execute(
+                f"SELECT DISTINCT top_label FROM runs{where} ORDER BY top_label", args) if r[0] is not None]
+
+    def iter_rows(self, **filters) -> Iterator[dict]:
+        # Own connection and cursor so a long export neither loads everything nor holds the GUI's reader
+        where, args = self._where(**filters)
+        db = self._connect()
+        try:
+            for r in db.execute(f"SELECT {', '.join(COLUMNS)} FROM runs{where} ORDER BY id", args):
+                yield dict(zip(COLUMNS, r))
+        finally:
+            db.close()
+
+    def export(self, path: str | Path, fmt: Optional[str] = None, **filters) -> int:
+        """Stream matching runs to .jsonl or .csv (by extension unless fmt is given); returns the row count."""
+        path = Path(path)
+        fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+        n = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f) if fmt == "csv" else None
+            if writer:
+                writer.writerow(COLUMNS)
+            for row in self.iter_rows(**filters):
+                if writer:
+                    writer.writerow([row[c] for c in COLUMNS])
+                else:
+                    row["output"] = json.loads(row["output"]) if row["output"] else []
+                    f.write(json.dumps(row) + "\n")
+                n += 1
+        return n
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import hashlib, re, threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# A sentence is a run of text up to (and including) ., ! or ?, or up to a line break
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|$)", re.MULTILINE)
+
+
+def split_sentences(text: str) -> list[str]:
+    return [m.group().strip() for m in _SENTENCE_RE.finditer(text or "") if m.group().strip()]
+
+
+def positive_prob(row: dict) -> float:
+    # Map one {"label", "score"} prediction to P(positive); unknown labels count as neutral
+    label = str(row.get("label", "")).upper()
+    score = float(row.get("score", 0.5))
+    if label.startswith("POS"):
+        return score
+    if label.startswith("NEG"):
+        return 1.0 - score
+    return 0.5
+
+
+def combine(sentences: list[str], rows: list[list[dict]]) -> list[dict]:
+    """Length-weighted mean of per-sentence P(positive), as a [{"label", "score"}] result."""
+    total = sum(len(s) for s in sentences)
+    if not total:
+        return [{"label": "NEUTRAL", "score": 0.0}]
+    p = sum(len(s) * positive_prob(r[0]) for s, r in zip(sentences, rows)) / total
+    return [{"label": "POSITIVE" if p >= 0.5 else "NEGATIVE", "score": round(max(p, 1 - p), 4)}]
+
+
+class IncrementalScorer:
+    """
+    Re-score a document by only running the sentences that changed.
+
+    Each sentence's result is cached under a hash of its text, so while typing only
+    the edited sentence (usually one) reaches the model.
+    """
+
+    def __init__(self, run_batch: Callable[[list[str]], list], max_items: int = 4096) -> None:
+        self.run_batch = run_batch
+        self.max_items = max_items
+        self._cache: OrderedDict[bytes, list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(sentence: str) -> bytes:
+        return hashlib.blake2b(sentence.encode("utf-8"), digest_size=16).digest()
+
+    def score(self, text: str, cancelled: Optional[Callable[[], bool]] = None) -> Optional[dict]:
+        """
+        Returns {"document": [...], "sentences": [{"text", "label", "score"}], "rescored": n},
+        or None if cancelled() turned true before the model was called (a newer edit won).
+        """
+        sentences = split_sentences(text)
+        keys = [self._key(s) for s in sentences]
+        with self._lock:
+            rows = [self._cache.get(k) for k in keys]
+            for k, r in zip(keys, rows):
+                if r is not None:
+                    self._cache.move_to_end(k)
+        todo = [i for i, r in enumerate(rows) if r is None]
+        # De-duplicate repeated sentences so each is scored once
+        unique = list(dict.fromkeys(sentences[i] for i in todo))
+        if unique:
+            if cancelled and cancelled():
+                return None
+            fresh = dict(zip(unique, self.run_batch(unique)))
+            with self._lock:
+                for i in todo:
+                    rows[i] = fresh[sentences[i]]
+                    self._cache[keys[i]] = rows[i]
+                while len(self._cache) > self.max_items:
+                    self._cache.popitem(last=False)
+        per_sentence = [{"text": s, "label": r[0]["label"], "score": float(r[0]["score"])}
+                        for s, r in zip(sentences, rows)]
+        return {"document": combine(sentences, rows), "sentences": per_sentence, "rescored": len(unique)}
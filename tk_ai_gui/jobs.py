@@ -0,0 +1,164 @@
+from __future__ import annotations
+import itertools, queue, threading, time
+from collections import deque
+from typing import Callable, Optional
+
+# Lower number runs first within a lane
+INTERACTIVE = 0
+BATCH = 10
+
+
+class Job:
+    """One unit of background work plus its status, for the scheduler and the Jobs tab."""
+
+    def __init__(self, job_id: int, lane: str, func: Callable, on_done: Optional[Callable],
+                 on_error: Optional[Callable], priority: int, tag: Optional[str], name: str) -> None:
+        self.id = job_id
+        self.lane = lane
+        self.func = func
+        self.on_done = on_done
+        self.on_error = on_error
+        self.priority = priority
+        self.tag = tag
+        self.name = name or getattr(func, "__name__", "job")
+        self.status = "queued"  # queued → running → done | error | cancelled
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.created = time.perf_counter()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        # Long-running funcs may poll this to stop early
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def elapsed_ms(self) -> float:
+        if self.started is None:
+            return 0.0
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+
+class JobScheduler:
+    """
+    Bounded worker pool with one lane (priority queue + worker threads) per model key.
+
+    - submit() returns a Job with an id; jobs sharing a tag supersede each other,
+      so a new submit cancels the older pending/running one with the same tag
+    - INTERACTIVE jobs run before BATCH jobs in the same lane
+    - notify() is called from worker threads whenever something changes; the GUI
+      turns that into a Tk event and calls drain() on the main thread
+    """
+
+    def __init__(self, lanes: dict[str, int], notify: Optional[Callable[[], None]] = None,
+                 history: int = 200) -> None:
+        self.notify = notify or (lambda: None)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queues: dict[str, queue.PriorityQueue] = {}
+        self._workers: dict[str, int] = {}
+        self._jobs: dict[int, Job] = {}
+        self._finished: deque[Job] = deque()   # waiting for drain() on the main thread
+        self._history = history
+        self._stopping = False
+        for lane, workers in lanes.items():
+            self.add_lane(lane, workers)
+
+    def add_lane(self, lane: str, workers: int = 1) -> None:
+        q: queue.PriorityQueue = queue.PriorityQueue()
+        self._queues[lane] = q
+        self._workers[lane] = max(1, workers)
+        for i in range(self._workers[lane]):
+            threading.Thread(target=self._worker, args=(q,), name=f"jobs-{lane}-{i}", daemon=True).start()
+
+    def submit(self, lane: str, func: Callable, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, priority: int = INTERACTIVE,
+               tag: Optional[str] = None, name: str = "") -> Job:
+        job = Job(next(self._seq), lane, func, on_done, on_error, priority, tag, name)
+        with self._lock:
+            if tag is not None:
+                # A newer request with the same tag makes older ones pointless
+                for old in self._jobs.values():
+                    if old.tag == tag and old.status in ("queued", "running"):
+                        old.cancel()
+                        if old.status == "queued":
+                            old.status = "cancelled"
+            self._jobs[job.id] = job
+            self._trim()
+        self._queues[lane].put((priority, job.id, job))
+        self.notify()
+        return job
+
+    def cancel(self, job_id: int) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.status in ("queued", "running"):
+                job.cancel()
+                if job.status == "queued":
+                    job.status = "cancelled"
+        self.notify()
+
+    def _worker(self, q: queue.PriorityQueue) -> None:
+        while True:
+            _, _, job = q.get()
+            if job is None or self._stopping:
+                return
+            with self._lock:
+                if job.cancelled:
+                    continue
+                job.status = "running"
+                job.started = time.perf_counter()
+            self.notify()
+            try:
+                job.result = job.func()
+                status = "done"
+            except Exception as e:
+                job.error = e
+                status = "error"
+            with self._lock:
+                job.finished = time.perf_counter()
+                # A job superseded while running finishes silently: its result is stale
+                job.status = "cancelled" if job.cancelled else status
+                self._finished.append(job)
+            self.notify()
+
+    def drain(self) -> list[Job]:
+        """Pop finished jobs (call on the main thread) and run their callbacks."""
+        out = []
+        while True:
+            with self._lock:
+                if not self._finished:
+                    break
+                job = self._finished.popleft()
+            out.append(job)
+            if job.status == "done" and job.on_done:
+                job.on_done(job.result)
+            elif job.status == "error" and job.on_error:
+                job.on_error(job.error)
+        return out
+
+    def jobs(self) -> list[Job]:
+        """Most recent jobs first (for the Jobs tab)."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.id, reverse=True)
+
+    def active(self) -> int:
+        with self._lock:
+            return sum(j.status in ("queued", "running") for j in self._jobs.values())
+
+    def _trim(self) -> None:
+        # Caller holds self._lock; forget the oldest finished jobs beyond the history size
+        done = [j.id for j in self._jobs.values() if j.status not in ("queued", "running")]
+        for job_id in sorted(done)[:max(0, len(self._jobs) - self._history)]:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        # One sentinel per worker; it sorts after every real job
+        for lane, q in self._queues.items():
+            for _ in range(self._workers[lane]):
+                q.put((float("inf"), 0, None))
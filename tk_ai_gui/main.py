@@ -1,14 +1,25 @@
 from __future__ import annotations
 import tkinter as tk
-from .app import MainWindow
+from .utils.ui import Splash
 
 # this function is the starting point of the program
 def main():
-    # make the main Tkinter window (the base of our GUI)
+    # make the main Tkinter window (the base of our GUI), hidden until it is built
     root = tk.Tk()
+    root.withdraw()
+
+    # show a "loading" splash straight away; only tkinter has been imported so far
+    splash = Splash(root)
+    splash.show()
+
+    # the app (and everything it imports) loads while the splash is up;
+    # models, numpy, PIL and OpenCV are still only imported when first used
+    from .app import MainWindow
 
     # create our MainWindow class and connect it with the root window
     MainWindow(root)
+    splash.close()
+    root.deiconify()
 
     # keep the program running until the user closes the window
     root.mainloop()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import logging, os
+from pathlib import Path
+from typing import Optional
+
+# Inference backends a model can be built on (all CPU-friendly):
+#   torch               plain fp32 transformers pipeline (the original behaviour)
+#   torch-dynamic-int8  Linear layers quantized to int8 at load time (torch.ao dynamic quantization)
+#   onnxruntime         model exported to ONNX once, cached on disk, run with ONNX Runtime
+BACKENDS = ("torch", "torch-dynamic-int8", "onnxruntime")
+
+# Where ONNX exports are kept between runs (override with TK_AI_ONNX_DIR)
+DEFAULT_ONNX_DIR = Path.home() / ".cache" / "tk_ai_gui" / "onnx"
+
+
+def default_backend() -> str:
+    """Backend from the TK_AI_BACKEND environment variable, else "torch"."""
+    backend = os.environ.get("TK_AI_BACKEND", "").strip().lower() or "torch"
+    check_backend(backend)
+    return backend
+
+
+def check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; use one of {', '.join(BACKENDS)}")
+
+
+def build_pipeline(task: str, model_id: str, backend: str = "torch", device: int = -1,
+                   cache_dir: Optional[str | Path] = None):
+    """
+    Build a transformers pipeline for task/model_id on the given backend.
+
+    Every backend returns a regular pipeline object, so callers get the same
+    [{"label", "score"}] output whichever one is active.
+    """
+    check_backend(backend)
+    from transformers import pipeline
+
+    if backend == "torch":
+        return pipeline(task, model=model_id, device=device)
+
+    if backend == "torch-dynamic-int8":
+        # Quantized kernels are CPU-only, so the device is ignored here
+        import torch
+        pipe = pipeline(task, model=model_id, device=-1)
+        pipe.model = torch.ao.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipe
+
+    model = _load_onnx(task, model_id, cache_dir)
+    if task == "image-classification":
+        from transformers import AutoImageProcessor
+        return pipeline(task, model=model, image_processor=AutoImageProcessor.from_pretrained(model_id))
+    from transformers import AutoTokenizer
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_id))
+
+
+def onnx_path(model_id: str, cache_dir: Optional[str | Path] = None) -> Path:
+    root = Path(cache_dir or os.environ.get("TK_AI_ONNX_DIR") or DEFAULT_ONNX_DIR)
+    return root / model_id.replace("/", "__")
+
+
+def _load_onnx(task: str, model_id: str, cache_dir: Optional[str | Path]):
+    # optimum is only needed for this backend, so import it here
+    if task == "image-classification":
+        from optimum.onnxruntime import ORTModelForImageClassification as ORTModel
+    else:
+        from optimum.onnxruntime import ORTModelForSequenceClassification as ORTModel
+    path = onnx_path(model_id, cache_dir)
+    if (path / "model.onnx").exists():
+        return ORTModel.from_pretrained(path)
+    # First use: export from the PyTorch weights and keep the result for next time
+    logging.info(f"Exporting {model_id} to ONNX in {path}")
+    model = ORTModel.from_pretrained(model_id, export=True)
+    model.save_pretrained(path)
+    return model
+
+
+def accuracy_delta(reference: list[list[dict]], candidate: list[list[dict]]) -> dict:
+    """
+    Compare two backends' predictions on the same inputs.
+
+    top1_agreement is the share of inputs with the same top label; the score deltas
+    are taken on that label, so quantization drift shows up even when labels agree.
+    """
+    if len(reference) != len(candidate):
+        raise ValueError("reference and candidate must cover the same inputs")
+    n = len(reference)
+    if not n:
+        return {"n": 0, "top1_agreement": 1.0, "mean_score_delta": 0.0, "max_score_delta": 0.0}
+    agree, deltas = 0, []
+    for ref, cand in zip(reference, candidate):
+        top = ref[0]
+        agree += cand[0]["label"] == top["label"]
+        # Score the candidate gave the reference's top label (0 if it is not in its top-k)
+        other = next((float(r["score"]) for r in cand if r["label"] == top["label"]), 0.0)
+        deltas.append(abs(float(top["score"]) - other))
+    return {"n": n, "top1_agreement": round(agree / n, 4),
+            "mean_score_delta": round(sum(deltas) / n, 6), "max_score_delta": round(max(deltas), 6)}
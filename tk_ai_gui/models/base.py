@@ -4,12 +4,14 @@ from abc import ABC, abstractmethod
 class AIModelBase(ABC):
     """Abstract base class for AI model implementations using the Template Method pattern."""
     
-    def __init__(self, model_id: str, task: str) -> None:
-        """Initialize the AI model with identifier and task type."""
+    def __init__(self, model_id: str, task: str, backend: str = "torch") -> None:
+        """Initialize the AI model with identifier, task type and inference backend."""
         # Store model identifier (e.g., "bert-base-uncased")
         self._model_id = model_id
         # Store task type (e.g., "text-classification", "summarization")
         self._task = task
+        # Inference backend the pipeline runs on (see models.backends)
+        self._backend = backend
         # Private pipeline object, initialized as None (lazy loading pattern)
         self.__pipeline = None
     
@@ -23,6 +25,11 @@ class AIModelBase(ABC):
         """Get the task type."""
         return self._task
     
+    @property
+    def backend(self) -> str:
+        """Get the inference backend name."""
+        return self._backend
+
     def _set_pipeline(self, pipe) -> None: 
         """Set the pipeline object (protected method for subclasses)."""
         self.__pipeline = pipe
@@ -38,7 +45,56 @@ class AIModelBase(ABC):
     def run(self, input_data): 
         #Abstract method - subclasses must implement the model execution logic.
         ...
+
+    def run_batch(self, inputs: list, batch_size: int = 8) -> list[list[dict]]:
+        """
+        Run the model on many inputs, one pipeline call per chunk of batch_size.
+        Returns one [{"label", "score"}] list per input, in input order.
+        """
+        inputs = list(inputs)
+        out: list[list[dict]] = []
+        pipe = self._get_pipeline()
+        # Hand whole chunks to the pipeline so it can do one forward pass per batch
+        for start in range(0, len(inputs), max(1, batch_size)):
+            chunk = inputs[start:start + max(1, batch_size)]
+            res = pipe(chunk, batch_size=len(chunk))
+            out.extend(_as_rows(r) for r in res)
+        return out
     
+    @property
+    def tokenizer(self):
+        """The pipeline's tokenizer, or None (vision models, or not loaded)."""
+        return getattr(self.__pipeline, "tokenizer", None)
+
+    def run_long(self, text, strategy: str = "length_weighted", max_tokens: int | None = None,
+                 overlap: int = 32, batch_size: int = 8, workers: int = 1) -> list[dict]:
+        """
+        Score text longer than the model's input limit: tokenizer-aware overlapping
+        chunks, scored batch_size at a time, combined with the given strategy.
+        text may be a str or an open text file. See models.long_text.
+        """
+        from .long_text import default_max_tokens, long_text_tokenizer, score_long_text
+        tok = long_text_tokenizer(self)
+        return score_long_text(lambda chunk: self.run_batch(chunk, batch_size=batch_size), text,
+                               tokenizer=tok, max_tokens=max_tokens or default_max_tokens(tok),
+                               overlap=overlap, batch_size=batch_size, workers=workers, strategy=strategy)
+
+    def param_bytes(self) -> int:
+        """Bytes held by the model's weights and buffers (0 if it can't tell, e.g. ONNX Runtime)."""
+        net = getattr(self.__pipeline, "model", None)
+        if net is None or not hasattr(net, "parameters"):
+            return 0
+        tensors = list(net.parameters()) + list(getattr(net, "buffers", lambda: [])())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
     def info(self) -> str: 
         #Return a formatted string with model information.
-        return f"Model: {self._model_id} | Task: {self._task}"
\ No newline at end of file
+        return f"Model: {self._model_id} | Task: {self._task} | Backend: {self._backend}"
+
+
+def _as_rows(result) -> list[dict]:
+    # Pipelines return a bare dict per item for text tasks and a list of dicts
+    # for top-k tasks; normalise both to the [{"label", "score"}] shape.
+    if isinstance(result, dict):
+        return [result]
+    return list(result)
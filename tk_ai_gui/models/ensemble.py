@@ -0,0 +1,271 @@
+from __future__ import annotations
+import json, logging, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+from .base import AIModelBase
+from ..history import preview_input
+from ..utils.metrics import REGISTRY
+
+STRATEGIES = ("vote", "mean", "weighted")
+
+
+def _is_factory(m) -> bool:
+    # A class or a plain function builds a model; a built model has .run on the instance
+    return isinstance(m, type) or (callable(m) and not hasattr(m, "run"))
+
+
+def merge(member_rows: dict[str, list[dict]], strategy: str = "mean",
+          weights: Optional[dict[str, float]] = None, top_k: int = 5) -> list[dict]:
+    """
+    Combine several members' [{"label", "score"}] lists for one input.
+
+      vote      each member's top label gets one vote (or its weight); score = vote share
+      mean      average score per label; a label a member didn't return counts as 0
+      weighted  like mean, but members count by weight
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; use one of {', '.join(STRATEGIES)}")
+    if not member_rows:
+        return []
+    w = {m: (weights or {}).get(m, 1.0) if strategy != "mean" else 1.0 for m in member_rows}
+    total = sum(w.values()) or 1.0
+    scores: dict[str, float] = {}
+    if strategy == "vote":
+        for m, rows in member_rows.items():
+            if rows:
+                scores[rows[0]["label"]] = scores.get(rows[0]["label"], 0.0) + w[m]
+    else:
+        for m, rows in member_rows.items():
+            for r in rows:
+                scores[r["label"]] = scores.get(r["label"], 0.0) + w[m] * float(r["score"])
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+    return [{"label": label, "score": round(s / total, 6)} for label, s in ranked]
+
+
+class EnsembleModel(AIModelBase):
+    """
+    Runs the same input through several models at once and merges their answers.
+
+    Members run concurrently on a thread pool; a member built as a ModelWorker
+    (processes=True) does its inference in its own process, so members don't share
+    the GIL. last_latency_ms holds each member's time for the latest call, and
+    every member call is also recorded in the metrics registry.
+    """
+
+    def __init__(self, members: dict[str, object], strategy: str = "mean",
+                 weights: Optional[dict[str, float]] = None, top_k: int = 5,
+                 processes: bool = False) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}; use one of {', '.join(STRATEGIES)}")
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        # Members may be given as factories; build them (in worker processes if asked)
+        built = {}
+        for name, m in members.items():
+            if processes and _is_factory(m):
+                from ..workers import ModelWorker
+                built[name] = ModelWorker(name, m)
+            else:
+                built[name] = m() if _is_factory(m) else m
+        self.members = built
+        first = next(iter(built.values()))
+        super().__init__(model_id=f"ensemble({'+'.join(built)})", task=getattr(first, "task", "ensemble"),
+                         backend="ensemble")
+        self.strategy = strategy
+        self.weights = dict(weights or {})
+        self.top_k = top_k
+        self.last_latency_ms: dict[str, float] = {}
+        self._pool = ThreadPoolExecutor(max_workers=len(built), thread_name_prefix="ensemble")
+
+    def _timed(self, name: str, fn: Callable):
+        metric = f"ensemble.member.{name}"
+        REGISTRY.start(metric)
+        t0 = time.perf_counter()
+        error = False
+        try:
+            return fn()
+        except Exception:
+            error = True
+            raise
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            REGISTRY.finish(metric, ms, error=error)
+            self.last_latency_ms[name] = round(ms, 3)
+
+    def _fan_out(self, method: str, *args, **kwargs) -> dict:
+        futures = {name: self._pool.submit(self._timed, name, lambda m=m: getattr(m, method)(*args, **kwargs))
+                   for name, m in self.members.items()}
+        results, errors = {}, {}
+        for name, fut in futures.items():
+            try:
+                results[name] = fut.result()
+            except Exception as e:
+                # One broken member shouldn't take the ensemble down
+                logging.warning(f"Ensemble member '{name}' failed: {e}")
+                errors[name] = e
+        if not results:
+            raise RuntimeError(f"Every ensemble member failed: {errors}")
+        return results
+
+    def run(self, input_data):
+        results = self._fan_out("run", input_data)
+        return merge(results, self.strategy, self.weights, self.top_k)
+
+    def run_batch(self, inputs: list, batch_size: int = 8) -> list[list[dict]]:
+        inputs = list(inputs)
+        results = self._fan_out("run_batch", inputs, batch_size=batch_size)
+        return [merge({name: rows[i] for name, rows in results.items()}, self.strategy, self.weights, self.top_k)
+                for i in range(len(inputs))]
+
+    def param_bytes(self) -> int:
+        return sum(int(m.param_bytes()) for m in self.members.values() if hasattr(m, "param_bytes"))
+
+    def info(self) -> str:
+        lines = [super().info(), f"Strategy: {self.strategy}"]
+        for name, m in self.members.items():
+            ms = self.last_latency_ms.get(name)
+            lat = f"{ms:.1f} ms" if ms is not None else "not run yet"
+            lines.append(f"  {name}: {getattr(m, 'model_id', type(m).__name__)} "
+                         f"(weight {self.weights.get(name, 1.0)}, last call {lat})")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        for m in self.members.values():
+            if hasattr(type(m), "close"):
+                m.close()
+
+
+class ShadowModel(AIModelBase):
+    """
+    Serves the primary model and scores a challenger in the background.
+
+    Callers get the primary's result as soon as it is ready. The challenger runs on
+    its own thread afterwards; when its top label differs from the primary's, both
+    answers are appended to a JSONL log. If the challenger falls behind by more than
+    max_pending calls, new comparisons are dropped (counted in stats()).
+    """
+
+    def __init__(self, primary, challenger, log_path: str | Path = "outputs/shadow.jsonl",
+                 max_pending: int = 64) -> None:
+        self.primary = primary() if _is_factory(primary) else primary
+        self.challenger = challenger() if _is_factory(challenger) else challenger
+        # Own cache identity: if it shared the primary's, cached answers would skip the challenger
+        super().__init__(model_id=f"{getattr(self.primary, 'model_id', None) or 'primary'}+shadow",
+                         task=getattr(self.primary, "task", "shadow"),
+                         backend=getattr(self.primary, "backend", "torch"))
+        self.log_path = Path(log_path)
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"compared": 0, "disagreements": 0, "dropped": 0, "errors": 0}
+
+    def _shadow(self, inputs: list, primary_rows: list[list[dict]], primary_ms: float) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["dropped"] += len(inputs)
+                return
+            self._pending += 1
+        self._pool.submit(self._compare, inputs, primary_rows, primary_ms)
+
+    def _compare(self, inputs: list, primary_rows: list[list[dict]], primary_ms: float) -> None:
+        try:
+            t0 = time.perf_counter()
+            rows = self.challenger.run_batch(inputs) if len(inputs) > 1 else [self.challenger.run(inputs[0])]
+            challenger_ms = (time.perf_counter() - t0) * 1000
+            records = []
+            for x, p, c in zip(inputs, primary_rows, rows):
+                if p and c and p[0]["label"] != c[0]["label"]:
+                    records.append({"ts": time.time(), "input": preview_input(x), "primary": p[:3], "challenger": c[:3],
+                                    "primary_ms": round(primary_ms, 3), "challenger_ms": round(challenger_ms, 3)})
+            if records:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                    for rec in records:
+                        f.write(json.dumps(rec, default=str) + "\n")
+            with self._lock:
+                self._stats["compared"] += len(inputs)
+                self._stats["disagreements"] += len(records)
+        except Exception as e:
+            logging.warning(f"Shadow challenger failed: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def run(self, input_data):
+        t0 = time.perf_counter()
+        out = self.primary.run(input_data)
+        self._shadow([input_data], [out], (time.perf_counter() - t0) * 1000)
+        return out
+
+    def run_batch(self, inputs: list, batch_size: int = 8) -> list[list[dict]]:
+        inputs = list(inputs)
+        t0 = time.perf_counter()
+        out = self.primary.run_batch(inputs, batch_size=batch_size)
+        self._shadow(inputs, out, (time.perf_counter() - t0) * 1000)
+        return out
+
+    def warmup(self, input_data) -> None:
+        """Load-time smoke test: runs both models but is not a comparison, so nothing is logged."""
+        self.primary.run(input_data)
+        try:
+            self.challenger.run(input_data)
+        except Exception as e:  # a broken challenger shows up in stats(), not as a failed load
+            logging.warning(f"Shadow challenger failed its warm-up: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats, pending=self._pending)
+        s["agreement"] = round(1 - s["disagreements"] / s["compared"], 4) if s["compared"] else None
+        return s
+
+    def wait(self, timeout: float = 10.0) -> bool:
+        """Block until queued comparisons are done (for tests and clean shutdown)."""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if not self._pending:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def param_bytes(self) -> int:
+        return sum(int(m.param_bytes()) for m in (self.primary, self.challenger) if hasattr(m, "param_bytes"))
+
+    def info(self) -> str:
+        s = self.stats()
+        return (f"{self.primary.info()}\nShadow: {getattr(self.challenger, 'model_id', type(self.challenger).__name__)}"
+                f" | compared {s['compared']}, disagreements {s['disagreements']}, dropped {s['dropped']}"
+                f"\nLog: {self.log_path}")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        for m in (self.primary, self.challenger):
+            if hasattr(type(m), "close"):
+                m.close()
+
+
+class EnsembleFactory:
+    """Picklable factory for the registry: builds an EnsembleModel from member factories."""
+
+    def __init__(self, members: dict[str, Callable], **options) -> None:
+        self.members = dict(members)
+        self.options = options
+
+    def __call__(self) -> EnsembleModel:
+        return EnsembleModel(dict(self.members), **self.options)
+
+
+class ShadowFactory:
+    """Picklable factory for the registry: builds a ShadowModel from two factories."""
+
+    def __init__(self, primary: Callable, challenger: Callable, **options) -> None:
+        self.primary, self.challenger = primary, challenger
+        self.options = options
+
+    def __call__(self) -> ShadowModel:
+        return ShadowModel(self.primary, self.challenger, **self.options)
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from transformers import pipeline
 from PIL import Image
+import numpy as np
 from .base import AIModelBase
+from .backends import build_pipeline, check_backend, default_backend
 from ..mixins import SaveLoadMixin
 from ..utils.decorators import log_call, time_call
 
@@ -16,29 +17,83 @@ def _device():
         return -1
 
 
+def _as_pil(input_data):
+    # The HF pipeline wants PIL images or paths; wrap uint8 RGB arrays from the
+    # ndarray-native imaging path (by then they are already at model size)
+    if isinstance(input_data, np.ndarray):
+        return Image.fromarray(input_data)
+    return input_data
+
+
 class ImageClassifierModel(SaveLoadMixin, AIModelBase):
-    def __init__(self, model_id: str = 'google/vit-base-patch16-224') -> None:
+    def __init__(self, model_id: str = 'google/vit-base-patch16-224', backend: str | None = None) -> None:
         """
         model_id: pretrained model identifier from Hugging Face hub
+        backend: "torch", "torch-dynamic-int8" or "onnxruntime" (default: $TK_AI_BACKEND or torch)
         """
-        # Initialize base AI model with given model_id and task type
-        super().__init__(model_id=model_id, task='image-classification')
+        backend = backend or default_backend()
+        check_backend(backend)
+        # Initialize base AI model with given model_id, task type and backend
+        super().__init__(model_id=model_id, task='image-classification', backend=backend)
 
-        # Create Hugging Face pipeline for image classification
+        # Create Hugging Face pipeline for image classification on the chosen backend
         self._set_pipeline(
-            pipeline('image-classification', model=model_id, device=_device())
+            build_pipeline('image-classification', model_id, backend=backend, device=_device())
         )
 
     @log_call
     @time_call
-    def run(self, input_data: Image.Image | str):
+    def run(self, input_data: Image.Image | np.ndarray | str):
 
          # Runs the image classification model on input image.
 
-        # input_data: can be a PIL image or a file path
+        # input_data: can be a PIL image, an RGB uint8 array or a file path
         # returns: top-k predicted labels with confidence scores
 
-        return self._get_pipeline()(input_data)
+        return self._get_pipeline()(_as_pil(input_data))
+
+    @log_call
+    @time_call
+    def run_batch(self, inputs: list, batch_size: int = 8) -> list[list[dict]]:
+
+        # Runs the classifier on a list of images (PIL images or file paths).
+
+        # batch_size: images per forward pass
+        # returns: one top-k list per image, same order as inputs
+
+        return super().run_batch([_as_pil(x) for x in inputs], batch_size=batch_size)
+
+    def preprocess_config(self) -> dict:
+
+        # Size and normalisation the HF image processor would apply,
+        # so utils.imaging.preprocess_batch can produce the same tensor itself.
+
+        proc = getattr(self._get_pipeline(), "image_processor", None)
+        size = getattr(proc, "size", None) or {}
+        h = size.get("height", size.get("shortest_edge", 224))
+        w = size.get("width", size.get("shortest_edge", 224))
+        return {"size": (w, h),
+                "mean": tuple(getattr(proc, "image_mean", None) or (0.5, 0.5, 0.5)),
+                "std": tuple(getattr(proc, "image_std", None) or (0.5, 0.5, 0.5))}
+
+    @log_call
+    @time_call
+    def run_pixels(self, pixel_values: np.ndarray, top_k: int = 5) -> list[list[dict]]:
+
+        # Runs the model on an already-normalised (N,3,H,W) float32 batch
+        # (from preprocess_batch), skipping the per-image HF processor.
+
+        # returns: one top-k list per image, same shape as run_batch
+
+        import torch
+        pipe = self._get_pipeline()
+        with torch.no_grad():
+            logits = pipe.model(pixel_values=torch.from_numpy(pixel_values).to(pipe.model.device)).logits
+        probs = logits.softmax(-1)
+        scores, ids = probs.topk(min(top_k, probs.shape[-1]), dim=-1)
+        labels = pipe.model.config.id2label
+        return [[{"label": labels[int(i)], "score": float(p)} for p, i in zip(ps, is_)]
+                for ps, is_ in zip(scores.tolist(), ids.tolist())]
 
     def info(self) -> str:
         
@@ -0,0 +1,308 @@
+from __future__ import annotations
+import hashlib, json, logging, math, os, re
+from itertools import repeat
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Built-in weighted lexicon: word -> valence, positive or negative, 1 (mild) to 3 (strong).
+# Extend or replace it with a "word<TAB>weight" file (VADER's vader_lexicon.txt works as-is)
+# through Lexicon.from_file() or $TK_AI_LEXICON.
+_POSITIVE = {
+    3: """amazing awesome brilliant excellent exceptional fantastic flawless incredible magnificent marvelous
+          masterpiece outstanding perfect phenomenal spectacular splendid stellar sublime superb terrific
+          wonderful extraordinary breathtaking exquisite impeccable love loved loves loving adore adored
+          adores best""",
+    2: """good great nice lovely beautiful enjoy enjoyed enjoyable enjoying happy glad delighted delightful
+          pleased pleasant impressive impressed recommend recommended fun fabulous charming elegant superior
+          favourite favorite friendly helpful useful valuable reliable comfortable clean fresh tasty
+          delicious smooth fast efficient effective solid polished engaging exciting excited thrilled
+          satisfying satisfied grateful thankful thanks thank like liked likes kind generous gorgeous
+          stunning inspiring insightful clever smart win winning winner success successful worth
+          worthwhile appreciate appreciated appealing refreshing remarkable cool neat sweet""",
+    1: """ok okay fine decent fair adequate reasonable acceptable alright better improved improvement
+          interesting easy simple clear calm safe cheap affordable quick handy works working worked
+          correct accurate positive hope hopeful pleasing relaxing cozy cosy warm tidy steady
+          stable promising respectable sufficient competent capable welcome welcomed wow yes agree
+          agreed support supportive honest bright lively popular""",
+}
+_NEGATIVE = {
+    3: """awful terrible horrible horrendous atrocious abysmal appalling dreadful disgusting disastrous
+          disaster worst hate hated hates hating loathe despise pathetic useless worthless garbage
+          trash rubbish nightmare unbearable unacceptable furious outrageous vile scam fraud toxic
+          abomination inedible""",
+    2: """bad poor sad angry annoyed annoying annoys disappointing disappointed disappointment frustrating
+          frustrated frustration boring bored broken fail failed fails failure faulty defective rude
+          unhelpful unfriendly dirty filthy slow expensive overpriced ugly nasty gross horrid mediocre
+          inferior painful pain hurt hurts upset unhappy miserable dislike disliked dislikes regret
+          regrets waste wasted wasting problem problems issue issues bug buggy crash crashed crashes
+          error errors wrong lousy sloppy stale bland noisy smelly heartless unreliable misleading
+          complaint complain complained refund refunded lost lacking lame weak confusing confused
+          hostile scary ruined ruin ridiculous stupid dumb""",
+    1: """meh average mixed odd strange lukewarm slowish pricey difficult hard tricky tired worse
+          lacks lack missing late delay delayed delays cramped crowded limited unclear dull flat
+          awkward overrated concern concerned worried worry doubt doubtful sorry cheaply negative
+          uncomfortable unfortunately unfortunate hassle mess messy""",
+}
+
+# Flip (and damp) the words that follow, up to NEGATION_SCOPE tokens or the end of the clause
+NEGATORS = frozenset("""not no never none nobody nothing neither nor nowhere without hardly scarcely
+    cannot cant dont doesnt didnt isnt arent wasnt werent wont wouldnt shouldnt couldnt havent hasnt
+    hadnt aint don't doesn't didn't isn't aren't wasn't weren't won't wouldn't shouldn't couldn't
+    haven't hasn't hadn't ain't can't""".split())
+NEGATION_SCOPE = 3
+NEGATION_FACTOR = -0.75
+
+# Scale the next sentiment word
+INTENSIFIERS = {
+    "extremely": 1.8, "incredibly": 1.8, "exceptionally": 1.8, "absolutely": 1.7, "remarkably": 1.6,
+    "very": 1.5, "super": 1.5, "totally": 1.5, "highly": 1.5, "completely": 1.5, "utterly": 1.6,
+    "really": 1.4, "truly": 1.4, "so": 1.3, "too": 1.3, "most": 1.3, "quite": 1.2, "pretty": 1.2,
+    "fairly": 0.8, "somewhat": 0.6, "kinda": 0.6, "slightly": 0.5, "marginally": 0.5, "barely": 0.4,
+}
+
+# "but" shifts the weight of a sentence towards what comes after it
+CONTRAST = frozenset({"but", "however", "although", "though", "yet"})
+BEFORE_CONTRAST, AFTER_CONTRAST = 0.5, 1.5
+
+_SEP = "\x1f"  # joins the lines of a batch; never produced by the word pattern
+# Words (with inner apostrophes), clause breaks, and the batch line separator
+_TOKEN_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*|[.,!?;:\n]|" + _SEP)
+_BREAKS = (".", ",", "!", "?", ";", ":", "\n", _SEP)
+
+# Lines per numpy pass; bounds memory on multi-million-line batches
+CHUNK_LINES = 50_000
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word-boundary tokens plus clause breaks ("goodbye" stays one token, not "good")."""
+    return _TOKEN_RE.findall((text or "").lower().replace("’", "'"))
+
+
+def _builtin_weights() -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for sign, table in ((1, _POSITIVE), (-1, _NEGATIVE)):
+        for strength, words in table.items():
+            for w in words.split():
+                weights[w] = float(sign * strength)
+    return weights
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    import numpy as np
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -50, 50)))
+
+
+class Lexicon:
+    """
+    Compiled sentiment lexicon.
+
+    Every token maps to a small integer id once per batch (one dict lookup per
+    token); weights, intensities and negation/contrast/break flags are then read
+    from arrays indexed by id, so negation scope, intensifiers and the "but"
+    shift are all computed with numpy over the whole batch at once. Each line's
+    summed valence goes through a logistic (Platt) calibration, p = sigmoid(a*raw + b),
+    to give P(positive); calibrate() fits a and b on labelled data.
+    """
+
+    def __init__(self, weights: Optional[dict[str, float]] = None, a: float = 0.75, b: float = 0.0,
+                 neutral_band: float = 0.05) -> None:
+        self.weights = dict(_builtin_weights() if weights is None else weights)
+        self.a, self.b = a, b
+        # |P(positive) - 0.5| below this (or no lexicon words at all) is reported as NEUTRAL
+        self.neutral_band = neutral_band
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path: str | Path, extend: bool = True, **kwargs) -> "Lexicon":
+        """
+        Load "word<TAB>weight[<TAB>...]" lines (# comments allowed). Weights outside
+        -3..3 are clipped. extend=True adds them on top of the built-in terms.
+        """
+        weights = _builtin_weights() if extend else {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 2 or line.startswith("#"):
+                    continue
+                try:
+                    weights[parts[0].strip().lower()] = max(-3.0, min(3.0, float(parts[1])))
+                except ValueError:
+                    continue
+        return cls(weights, **kwargs)
+
+    @classmethod
+    def default(cls) -> "Lexicon":
+        # $TK_AI_LEXICON adds a lexicon file to the built-in one
+        path = os.environ.get("TK_AI_LEXICON")
+        if path:
+            try:
+                return cls.from_file(path)
+            except OSError as e:
+                logging.warning(f"Could not read lexicon {path}: {e}")
+        return cls()
+
+    def _compile(self) -> None:
+        import numpy as np
+        # id 0 = any word we know nothing about
+        vocab: dict[str, int] = {}
+
+        def ident(tok: str) -> int:
+            return vocab.setdefault(tok, len(vocab) + 1)
+
+        for tok in (*self.weights, *NEGATORS, *INTENSIFIERS, *CONTRAST, *_BREAKS):
+            ident(tok)
+        n = len(vocab) + 1
+        self._vocab = vocab
+        self._w = np.zeros(n, np.float64)
+        self._m = np.ones(n, np.float64)
+        self._neg = np.zeros(n, bool)
+        self._contrast = np.zeros(n, bool)
+        self._break = np.zeros(n, bool)
+        for tok, w in self.weights.items():
+            self._w[vocab[tok]] = w
+        for tok, m in INTENSIFIERS.items():
+            self._m[vocab[tok]] = m
+            self._w[vocab[tok]] = 0.0  # an intensifier carries no valence of its own
+        for tok in NEGATORS:
+            self._neg[vocab[tok]] = True
+            self._w[vocab[tok]] = 0.0
+        for tok in CONTRAST:
+            self._contrast[vocab[tok]] = True
+        for tok in _BREAKS:
+            self._break[vocab[tok]] = True
+        self._sep_id = vocab[_SEP]
+        # What was compiled, for digest(); sorted so dict order doesn't matter
+        blob = json.dumps(sorted(self.weights.items())).encode("utf-8")
+        self._weights_digest = hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+    def digest(self) -> str:
+        """Short fingerprint of everything that affects predictions (terms, weights, calibration)."""
+        calib = f"{self._weights_digest}:{self.a!r}:{self.b!r}:{self.neutral_band!r}"
+        return hashlib.blake2b(calib.encode("utf-8"), digest_size=8).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    # ----- scoring -----
+
+    def _encode(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Token ids for the whole batch, and the line each token belongs to."""
+        import numpy as np
+        blob = f" {_SEP} ".join(texts).lower().replace("’", "'")
+        ids = np.array(list(map(self._vocab.get, _TOKEN_RE.findall(blob), repeat(0))), dtype=np.int64)
+        is_sep = ids == self._sep_id
+        if int(is_sep.sum()) != len(texts) - 1:
+            # a line contained the separator itself: blank it out and try again
+            return self._encode([t.replace(_SEP, " ") for t in texts])
+        return ids, np.cumsum(is_sep)
+
+    def raw_scores(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(summed valence, number of lexicon words) per text."""
+        import numpy as np
+        texts = [t if isinstance(t, str) else ("" if t is None else str(t)) for t in texts]
+        if not texts:
+            return np.zeros(0), np.zeros(0)
+        raws, hits = [], []
+        for start in range(0, len(texts), CHUNK_LINES):
+            r, h = self._raw_chunk(texts[start:start + CHUNK_LINES])
+            raws.append(r); hits.append(h)
+        return np.concatenate(raws), np.concatenate(hits)
+
+    def _raw_chunk(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        import numpy as np
+        n = len(texts)
+        ids, line = self._encode(texts)
+        if not len(ids):
+            return np.zeros(n), np.zeros(n)
+        pos = np.arange(len(ids))
+        big = len(ids) + NEGATION_SCOPE + 1
+        w = self._w[ids]
+        brk = self._break[ids]
+
+        # Negation: a negator earlier in the same clause, at most NEGATION_SCOPE tokens back
+        last_brk = np.maximum.accumulate(np.where(brk, pos, -1))
+        last_neg = np.maximum.accumulate(np.where(self._neg[ids], pos, -1))
+        negated = (last_neg > last_brk) & (pos - last_neg <= NEGATION_SCOPE)
+
+        # Intensity from the token before (and the one before that, for "really very good")
+        m = self._m[ids]
+        prev = np.ones_like(m); prev[1:] = m[:-1]
+        prev2 = np.ones_like(m); prev2[2:] = m[:-2]
+        mult = prev * np.where(prev != 1.0, prev2, 1.0)
+
+        # Contrast: damp the clause part before "but", boost the part after it
+        con = self._contrast[ids]
+        last_con = np.maximum.accumulate(np.where(con, pos, -1))
+        next_brk = np.minimum.accumulate(np.where(brk, pos, big)[::-1])[::-1]
+        next_con = np.minimum.accumulate(np.where(con, pos, big)[::-1])[::-1]
+        shift = np.where(last_con > last_brk, AFTER_CONTRAST, np.where(next_con < next_brk, BEFORE_CONTRAST, 1.0))
+
+        contrib = w * mult * np.where(negated, NEGATION_FACTOR, 1.0) * shift
+        raw = np.bincount(line, weights=contrib, minlength=n)
+        hits = np.bincount(line, weights=(w != 0), minlength=n)
+        return raw, hits
+
+    def predict_proba(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(P(positive), number of lexicon words) per text, as arrays."""
+        raw, hits = self.raw_scores(texts)
+        return _sigmoid(self.a * raw + self.b), hits
+
+    def predict(self, texts: list[str]) -> list[list[dict]]:
+        """[{"label": POSITIVE | NEGATIVE | NEUTRAL, "score"}] per text, in input order."""
+        import numpy as np
+        p, hits = self.predict_proba(texts)
+        neutral = (hits == 0) | (np.abs(p - 0.5) < self.neutral_band)
+        conf = np.round(np.maximum(p, 1 - p), 4).tolist()
+        labels = np.where(neutral, "NEUTRAL", np.where(p >= 0.5, "POSITIVE", "NEGATIVE")).tolist()
+        return [[{"label": lab, "score": 0.5 if lab == "NEUTRAL" else c}] for lab, c in zip(labels, conf)]
+
+    def calibrate(self, texts: list[str], labels: Iterable[str], iters: int = 500, lr: float = 0.5) -> dict:
+        """
+        Fit a and b (Platt scaling) on labelled texts ("POSITIVE"/"NEGATIVE", or 1/0)
+        by gradient descent on the log loss. Returns the fitted values and accuracy.
+        """
+        import numpy as np
+        raw, _ = self.raw_scores(list(texts))
+        y = np.array([1.0 if (lab == 1 or str(lab).upper().startswith("POS")) else 0.0 for lab in labels])
+        a, b = self.a, self.b
+        scale = max(1.0, float(np.abs(raw).max())) if len(raw) else 1.0
+        x = raw / scale  # keep the step size sane whatever the raw range
+        a *= scale
+        for _ in range(iters):
+            err = _sigmoid(a * x + b) - y
+            a -= lr * float((err * x).mean())
+            b -= lr * float(err.mean())
+        self.a, self.b = a / scale, b
+        acc = float(((_sigmoid(self.a * raw + self.b) >= 0.5) == (y == 1)).mean()) if len(y) else math.nan
+        return {"a": round(self.a, 4), "b": round(self.b, 4), "accuracy": round(acc, 4), "n": int(len(y))}
+
+
+class LexiconSentiment:
+    """
+    CPU-only sentiment model on a Lexicon, with the same run/run_batch contract as
+    the transformer models. run_batch scores the whole list in a few numpy passes
+    (batch_size is accepted for compatibility but not needed).
+    """
+
+    task = "text-classification"
+
+    def __init__(self, lexicon: Optional[Lexicon] = None) -> None:
+        self.lexicon = lexicon or Lexicon.default()
+
+    @property
+    def model_id(self) -> str:
+        # Part of the prediction-cache key: an extra lexicon file or calibrate() gives a new id,
+        # so cached scores from the previous weights are never served
+        return f"lexicon:{self.lexicon.digest()}"
+
+    def run(self, text: str):
+        return self.lexicon.predict([text])[0]
+
+    def run_batch(self, texts: list, batch_size: int = 8):
+        return self.lexicon.predict(list(texts))
+
+    def info(self) -> str:
+        return f"Lexicon Sentiment ({len(self.lexicon)} terms, negation + intensifiers, CPU only)"
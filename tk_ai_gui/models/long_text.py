@@ -0,0 +1,152 @@
+from __future__ import annotations
+import io, re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, TextIO
+from ..incremental import positive_prob
+
+# Without a tokenizer, whitespace-separated words stand in for tokens
+_WORD_RE = re.compile(r"\S+")
+
+STRATEGIES = ("mean", "length_weighted", "max_confidence")
+
+
+def _blocks(source: str | TextIO, read_size: int) -> Iterator[str]:
+    """Read the text in blocks that end on whitespace, so no word is split across blocks."""
+    read = io.StringIO(source).read if isinstance(source, str) else source.read
+    carry = ""
+    while True:
+        data = read(read_size)
+        if not data:
+            break
+        data = carry + data
+        cut = max(data.rfind(" "), data.rfind("\n"), data.rfind("\t"))
+        if cut < 0 and len(data) < 4 * read_size:
+            carry = data  # one very long "word": wait for more, but never grow without bound
+            continue
+        cut = cut if cut >= 0 else len(data) - 1
+        yield data[:cut + 1]
+        carry = data[cut + 1:]
+    if carry:
+        yield carry
+
+
+def _token_spans(block: str, tokenizer) -> list[tuple[int, int]]:
+    # Character offsets of each token within the block
+    if tokenizer is None:
+        return [(m.start(), m.end()) for m in _WORD_RE.finditer(block)]
+    enc = tokenizer(block, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    return [(s, e) for s, e in enc["offset_mapping"] if e > s]
+
+
+def iter_chunks(source: str | TextIO, tokenizer=None, max_tokens: int = 256, overlap: int = 32,
+                read_size: int = 64 * 1024) -> Iterator[dict]:
+    """
+    Yield overlapping chunks of at most max_tokens tokens as {"index", "start", "end", "tokens", "text"}.
+
+    source can be a str or any object with .read() (e.g. an open file). Text is read and
+    tokenized one block at a time and only the not-yet-emitted tail is kept, so memory
+    stays bounded no matter how long the document is.
+    """
+    overlap = max(0, min(overlap, max_tokens - 1))
+    step = max_tokens - overlap
+    buf, buf_base, pos, index = "", 0, 0, 0
+    spans: list[tuple[int, int]] = []   # global char offsets of tokens not yet fully emitted
+
+    def make(window):
+        start, end = window[0][0], window[-1][1]
+        return {"index": index, "start": start, "end": end, "tokens": len(window),
+                "text": buf[start - buf_base:end - buf_base]}
+
+    for block in _blocks(source, read_size):
+        spans.extend((pos + s, pos + e) for s, e in _token_spans(block, tokenizer))
+        buf += block
+        pos += len(block)
+        while len(spans) >= max_tokens:
+            yield make(spans[:max_tokens])
+            index += 1
+            spans = spans[step:]
+            # Drop text that no pending token refers to any more
+            cut = (spans[0][0] if spans else pos) - buf_base
+            buf, buf_base = buf[cut:], buf_base + cut
+    # Tail: whatever is left beyond the overlap already covered by the previous chunk
+    if spans and (index == 0 or len(spans) > overlap):
+        yield make(spans)
+
+
+def aggregate(chunks: list[dict], strategy: str = "length_weighted") -> dict:
+    """Combine per-chunk {"label", "score", "tokens"} into one {"label", "score"}."""
+    if not chunks:
+        return {"label": "NEUTRAL", "score": 0.0}
+    if strategy == "max_confidence":
+        best = max(chunks, key=lambda c: float(c["score"]))
+        return {"label": best["label"], "score": float(best["score"])}
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; use one of {', '.join(STRATEGIES)}")
+    weights = [c["tokens"] if strategy == "length_weighted" else 1 for c in chunks]
+    p = sum(w * positive_prob(c) for w, c in zip(weights, chunks)) / sum(weights)
+    return {"label": "POSITIVE" if p >= 0.5 else "NEGATIVE", "score": round(max(p, 1 - p), 4)}
+
+
+def score_long_text(run_batch: Callable[[list[str]], list], source: str | TextIO, tokenizer=None,
+                    max_tokens: int = 256, overlap: int = 32, batch_size: int = 16, workers: int = 1,
+                    strategy: str = "length_weighted", keep_text: bool = False) -> list[dict]:
+    """
+    Score a document of any length: chunk it, score chunks in batches (optionally on
+    several threads), then aggregate.
+
+    Returns [{"label", "score", "strategy", "chunks": [...]}]: the overall result first,
+    so callers expecting the usual [{"label", "score"}] shape keep working.
+    """
+    chunks: list[dict] = []
+
+    def score(batch: list[dict]) -> list:
+        return run_batch([c["text"] for c in batch])
+
+    def batches() -> Iterator[list[dict]]:
+        batch = []
+        for c in iter_chunks(source, tokenizer, max_tokens, overlap):
+            batch.append(c)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def collect(batch, rows):
+        for c, r in zip(batch, rows):
+            if not keep_text:
+                c.pop("text")  # don't hold a multi-MB document in memory via its chunks
+            c.update(label=r[0]["label"], score=float(r[0]["score"]))
+            chunks.append(c)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = []
+        for batch in batches():
+            pending.append((batch, pool.submit(score, batch)))
+            # Bounded window: at most `workers` batches waiting, results kept in order
+            while len(pending) > max(1, workers):
+                collect(*_resolve(pending.pop(0)))
+        for item in pending:
+            collect(*_resolve(item))
+
+    overall = aggregate(chunks, strategy)
+    return [{**overall, "strategy": strategy, "chunks": chunks}]
+
+
+def _resolve(item):
+    batch, fut = item
+    return batch, fut.result()
+
+
+def default_max_tokens(tokenizer, fallback: int = 256) -> int:
+    # Room for the [CLS]/[SEP] the pipeline adds around each chunk
+    limit = getattr(tokenizer, "model_max_length", None)
+    if not limit or limit > 100_000:  # HF uses a huge sentinel when unknown
+        return fallback
+    return max(8, int(limit) - 2)
+
+
+def long_text_tokenizer(model) -> Optional[object]:
+    """The model's fast tokenizer if it has one (needed for offsets), else None."""
+    tok = getattr(model, "tokenizer", None)
+    return tok if getattr(tok, "is_fast", False) else None
@@ -1,7 +1,9 @@
 from __future__ import annotations
-from transformers import pipeline
-from PIL import Image
+import hashlib, threading
+from collections import OrderedDict
+import numpy as np
 from .base import AIModelBase
+from .backends import build_pipeline, check_backend, default_backend
 from ..mixins import SaveLoadMixin
 from ..utils.decorators import log_call, time_call
 
@@ -16,36 +18,166 @@ def _device():
         return -1
 
 
-class ImageClassifierModel(SaveLoadMixin, AIModelBase):
-    def __init__(self, model_id: str = 'google/vit-base-patch16-224') -> None:
+def bucket_by_length(lengths: list[int], batch_size: int) -> list[list[int]]:
+    """
+    Group item indices into batches of similar length: sort by length (longest
+    first, so a too-big batch fails on the first call, not the last), then cut
+    into batch_size runs. Each batch is padded only to its own longest item.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    size = max(1, batch_size)
+    return [order[i:i + size] for i in range(0, len(order), size)]
+
+
+def padding_waste(lengths: list[int], batches: list[list[int]]) -> float:
+    """Share of the tokens in padded batches that are padding (0 = none, 0.75 = three quarters)."""
+    padded = sum(max(lengths[i] for i in b) * len(b) for b in batches if b)
+    return 1 - sum(lengths) / padded if padded else 0.0
+
+
+class TokenCache:
+    """
+    LRU of input_ids per input text, so repeated texts are tokenized once.
+    Keyed by a 16-byte blake2b digest of the exact text (not the text itself),
+    so long documents cost only their (truncated) ids.
+    """
+
+    def __init__(self, max_items: int = 4096) -> None:
+        self.max_items = max_items
+        self._ids: OrderedDict[bytes, list[int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def encode(self, tokenizer, texts: list[str], max_length: int) -> list[list[int]]:
+        """input_ids for each text; all misses go through the fast tokenizer in one call."""
+        keys = [self._key(t) for t in texts]
+        with self._lock:
+            out = [self._ids.get(k) for k in keys]
+            for k, ids in zip(keys, out):
+                if ids is not None:
+                    self._ids.move_to_end(k)
+            self.hits += sum(ids is not None for ids in out)
+        # One tokenizer call for the distinct misses
+        missing = list(dict.fromkeys((k, t) for k, t, ids in zip(keys, texts, out) if ids is None))
+        if missing:
+            encoded = tokenizer([t for _, t in missing], truncation=True, max_length=max_length)["input_ids"]
+            fresh = {k: list(ids) for (k, _), ids in zip(missing, encoded)}
+            with self._lock:
+                self.misses += len(missing)
+                for k, ids in fresh.items():
+                    self._ids[k] = ids
+                while len(self._ids) > self.max_items:
+                    self._ids.popitem(last=False)
+            out = [ids if ids is not None else fresh[k] for k, ids in zip(keys, out)]
+        return out
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class TextSentimentModel(SaveLoadMixin, AIModelBase):
+    def __init__(self, model_id: str = 'distilbert-base-uncased-finetuned-sst-2-english',
+                 backend: str | None = None, token_cache_items: int = 4096) -> None:
         """
-        Initialize the image classification model.
+        Initialize the text sentiment model.
 
-        model_id: Hugging Face model identifier (default = ViT model)
+        model_id: Hugging Face model identifier (default = DistilBERT fine-tuned on SST-2)
+        backend: "torch", "torch-dynamic-int8" or "onnxruntime" (default: $TK_AI_BACKEND or torch)
+        token_cache_items: how many distinct texts keep their tokenization around
         """
-        # Call parent class initializer with model ID and task type
-        super().__init__(model_id=model_id, task='image-classification')
+        backend = backend or default_backend()
+        check_backend(backend)
+        # Call parent class initializer with model ID, task type and backend
+        super().__init__(model_id=model_id, task='text-classification', backend=backend)
 
-        # Build Hugging Face pipeline for image classification
-        # Uses GPU if available, otherwise CPU
+        # Build Hugging Face pipeline for text classification on the chosen backend.
+        # run_batch only borrows its tokenizer and model; the pipeline loop is not used.
         self._set_pipeline(
-            pipeline('image-classification', model=model_id, device=_device())
+            build_pipeline('text-classification', model_id, backend=backend, device=_device())
         )
+        self.token_cache = TokenCache(token_cache_items)
+
+    @property
+    def max_length(self) -> int:
+        # Longest input the model takes; HF uses a huge sentinel when the tokenizer doesn't know
+        limit = getattr(self.tokenizer, "model_max_length", None)
+        return int(limit) if limit and limit <= 100_000 else 512
 
     @log_call   # Decorator: logs function call
     @time_call  # Decorator: measures runtime
-    def run(self, input_data: Image.Image | str):
+    def run(self, input_data: str):
         """
-        Run the image classification model.
+        Run the sentiment model on one text.
 
-        input_data: a PIL Image or a file path string
-        returns: top-k predicted labels with confidence scores
+        input_data: the text to classify (longer than max_length tokens is truncated;
+                    use run_long to score the whole of it)
+        returns: [{"label": "POSITIVE" | "NEGATIVE", "score": confidence}]
         """
-        # Pass input data to the pipeline and return predictions
-        return self._get_pipeline()(input_data)
+        return self._classify([input_data], batch_size=1)[0]
+
+    @log_call
+    @time_call
+    def run_batch(self, inputs: list, batch_size: int = 8) -> list[list[dict]]:
+        """
+        Run the model on a list of texts, batch_size texts per forward pass.
+
+        Texts are tokenized once (cached per string), grouped into batches of
+        similar length so little of each batch is padding, and the results are
+        put back in input order. Identical texts are only scored once.
+
+        returns: one [{label, score}] list per input, in input order
+        """
+        return self._classify(list(inputs), batch_size=batch_size)
+
+    def _classify(self, texts: list[str], batch_size: int) -> list[list[dict]]:
+        if not texts:
+            return []
+        unique = list(dict.fromkeys(texts))
+        ids = self.token_cache.encode(self.tokenizer, unique, self.max_length)
+        rows: list = [None] * len(unique)
+        for batch in bucket_by_length([len(x) for x in ids], batch_size):
+            for i, r in zip(batch, self._forward([ids[i] for i in batch])):
+                rows[i] = r
+        # Scatter back to input order (duplicates share one result)
+        by_text = dict(zip(unique, rows))
+        return [list(by_text[t]) for t in texts]
+
+    def _forward(self, batch_ids: list[list[int]]) -> list[list[dict]]:
+        # Pad to the longest item in this batch only, then top label per row
+        width = max(len(x) for x in batch_ids)
+        pad_id = getattr(self.tokenizer, "pad_token_id", None) or 0
+        input_ids = np.full((len(batch_ids), width), pad_id, dtype=np.int64)
+        mask = np.zeros((len(batch_ids), width), dtype=np.int64)
+        for r, x in enumerate(batch_ids):
+            input_ids[r, :len(x)] = x
+            mask[r, :len(x)] = 1
+        logits = self._logits(input_ids, mask)
+        z = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(z) / np.exp(z).sum(axis=-1, keepdims=True)
+        labels = self._id2label()
+        best = probs.argmax(axis=-1)
+        return [[{"label": labels.get(int(b), str(int(b))), "score": float(p[b])}] for p, b in zip(probs, best)]
+
+    def _logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        import torch
+        net = self._get_pipeline().model
+        device = getattr(net, "device", "cpu")
+        with torch.inference_mode():
+            out = net(input_ids=torch.from_numpy(input_ids).to(device),
+                      attention_mask=torch.from_numpy(attention_mask).to(device))
+        return out.logits.float().cpu().numpy()
+
+    def _id2label(self) -> dict:
+        return dict(getattr(self._get_pipeline().model.config, "id2label", None) or {})
 
     def info(self) -> str:
         """
         Provide model description including category, input and output format.
         """
-        return super().info() + "\nCategory: Vision | Input: RGB image | Output: top-k labels+scores"
+        return (super().info() + "\nCategory: NLP | Input: text | Output: POSITIVE/NEGATIVE + score"
+                + f"\nBatching: length-bucketed, {len(self.token_cache)} tokenized texts cached")
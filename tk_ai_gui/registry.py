@@ -0,0 +1,215 @@
+from __future__ import annotations
+import importlib, json, logging, os
+from pathlib import Path
+from typing import Callable, Optional
+
+# Models are grouped by the input they take; the kind picks the GUI run button,
+# the job lane, and the rule-based fallback used when loading fails
+KINDS = ("text", "image")
+
+# Extra models: ~/.tk_ai_gui/models.json (or $TK_AI_MODELS_CONFIG), e.g.
+#   {"models": [{"key": "image:resnet50", "kind": "image", "label": "ResNet-50",
+#                "class": "tk_ai_gui.models.image_classifier:ImageClassifierModel",
+#                "model_id": "microsoft/resnet-50"},
+#               {"key": "image:ab", "label": "ViT + ResNet", "ensemble": ["image", "image:resnet50"],
+#                "strategy": "mean"}]}
+# Entries are read in order, so ensemble/shadow members must be listed first.
+DEFAULT_CONFIG_PATH = Path.home() / ".tk_ai_gui" / "models.json"
+
+# Installed packages can add models under this entry point group. The target is
+# either an AIModelBase subclass (registered under the entry point's name, with
+# its `kind` class attribute if it has one) or a function called with the registry.
+ENTRY_POINT_GROUP = "tk_ai_gui.models"
+
+
+class ClassFactory:
+    """
+    Builds cls(model_id=...) on call. The class is named by "module:Class" and only
+    imported when the model is first loaded; unlike a lambda it can be pickled,
+    so process-mode workers can build the model themselves.
+    """
+
+    def __init__(self, target: str | type, model_id: Optional[str] = None, **kwargs) -> None:
+        self.target = target
+        self.model_id = model_id
+        self.kwargs = kwargs
+
+    def resolve(self) -> type:
+        if isinstance(self.target, type):
+            return self.target
+        module, _, name = self.target.partition(":")
+        return getattr(importlib.import_module(module), name)
+
+    def __call__(self):
+        cls = self.resolve()
+        if self.model_id:
+            return cls(model_id=self.model_id, **self.kwargs)
+        return cls(**self.kwargs)
+
+    def __repr__(self) -> str:
+        target = self.target if isinstance(self.target, str) else f"{self.target.__module__}:{self.target.__name__}"
+        return f"ClassFactory({target!r}, model_id={self.model_id!r})"
+
+
+class ModelSpec:
+    """One registered model: how to build it and how the app should present it."""
+
+    def __init__(self, key: str, factory: Callable, kind: str = "text", label: Optional[str] = None,
+                 model_id: Optional[str] = None, fallback: bool = True) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind!r}; use one of {', '.join(KINDS)}")
+        self.key = key
+        self.factory = factory
+        self.kind = kind
+        self.label = label or key
+        self.model_id = model_id
+        # False = a load failure is an error instead of switching to the rule-based model
+        self.fallback = fallback
+
+    def __repr__(self) -> str:
+        return f"ModelSpec({self.key!r}, kind={self.kind!r}, label={self.label!r})"
+
+
+class ModelRegistry:
+    """Ordered set of ModelSpecs, filled from code, entry points and a JSON config file."""
+
+    def __init__(self) -> None:
+        self._specs: dict[str, ModelSpec] = {}
+
+    def register(self, key: str, target: str | type | Callable, kind: str = "text", model_id: Optional[str] = None,
+                 label: Optional[str] = None, fallback: bool = True, **kwargs) -> ModelSpec:
+        """
+        Register a model under key. target is an AIModelBase subclass (or its
+        "module:Class" path, imported lazily) or any zero-argument factory.
+        Registering an existing key replaces it.
+        """
+        if isinstance(target, type):
+            from .models.base import AIModelBase
+            if not issubclass(target, AIModelBase):
+                raise TypeError(f"{target.__name__} is not an AIModelBase subclass")
+        if isinstance(target, (str, type)):
+            factory = ClassFactory(target, model_id, **kwargs)
+        else:
+            factory = target
+        return self.add(ModelSpec(key, factory, kind=kind, label=label, model_id=model_id, fallback=fallback))
+
+    def add(self, spec: ModelSpec) -> ModelSpec:
+        self._specs[spec.key] = spec
+        return spec
+
+    def register_ensemble(self, key: str, members: list[str], label: Optional[str] = None, **options) -> ModelSpec:
+        """
+        Register an EnsembleModel over already-registered keys.
+        options go to EnsembleModel (strategy, weights, top_k, processes).
+        """
+        from .models.ensemble import EnsembleFactory
+        specs = [self.get(m) for m in members]
+        factory = EnsembleFactory({s.key: s.factory for s in specs}, **options)
+        return self.add(ModelSpec(key, factory, kind=specs[0].kind, label=label))
+
+    def register_shadow(self, key: str, primary: str, challenger: str, label: Optional[str] = None,
+                        **options) -> ModelSpec:
+        """Register a ShadowModel: serves `primary`, scores `challenger` in the background."""
+        from .models.ensemble import ShadowFactory
+        p, c = self.get(primary), self.get(challenger)
+        return self.add(ModelSpec(key, ShadowFactory(p.factory, c.factory, **options), kind=p.kind, label=label))
+
+    def unregister(self, key: str) -> None:
+        self._specs.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._specs
+
+    def __iter__(self):
+        return iter(list(self._specs.values()))
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def get(self, key: str) -> ModelSpec:
+        return self._specs[key]
+
+    def keys(self, kind: Optional[str] = None) -> list[str]:
+        return [s.key for s in self._specs.values() if kind is None or s.kind == kind]
+
+    def by_label(self, label: str) -> ModelSpec:
+        for spec in self._specs.values():
+            if spec.label == label:
+                return spec
+        raise KeyError(label)
+
+    def factories(self) -> dict[str, Callable]:
+        return {key: s.factory for key, s in self._specs.items()}
+
+    # ----- sources -----
+
+    def load_config(self, path: Optional[str | Path] = None) -> int:
+        """Register every entry of a models.json file; returns how many were added (bad entries are skipped)."""
+        path = Path(path or os.environ.get("TK_AI_MODELS_CONFIG") or DEFAULT_CONFIG_PATH)
+        if not path.exists():
+            return 0
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            logging.warning(f"Ignoring bad model config {path}: {e}")
+            return 0
+        entries = data.get("models", []) if isinstance(data, dict) else data
+        count = 0
+        for i, entry in enumerate(entries if isinstance(entries, list) else []):
+            try:
+                entry = dict(entry)
+                key = entry.pop("key")
+                # {"ensemble": [keys...], "strategy": ...} or {"shadow": {"primary", "challenger"}, "log_path": ...}
+                if "ensemble" in entry:
+                    self.register_ensemble(key, entry.pop("ensemble"), **entry)
+                elif "shadow" in entry:
+                    self.register_shadow(key, **entry.pop("shadow"), **entry)
+                else:
+                    self.register(key, entry.pop("class"), **entry)
+                count += 1
+            except Exception as e:  # one bad entry must not stop the app
+                logging.warning(f"Skipping model config entry {i} in {path}: {type(e).__name__}: {e}")
+        return count
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> int:
+        """Register models published by installed packages; returns how many entry points ran."""
+        from importlib.metadata import entry_points
+        count = 0
+        for ep in entry_points(group=group):
+            try:
+                obj = ep.load()
+                if isinstance(obj, type):
+                    self.register(ep.name, obj, kind=getattr(obj, "kind", "text"))
+                else:
+                    obj(self)
+                count += 1
+            except Exception as e:  # one broken plugin must not stop the app
+                logging.warning(f"Could not load model entry point '{ep.name}': {e}")
+        return count
+
+    @classmethod
+    def from_factories(cls, factories: dict[str, Callable]) -> "ModelRegistry":
+        # Plain {key: factory} dicts (tests, scripts): "image" is the only image key, and
+        # only the two built-in keys have a rule-based fallback, as before the registry
+        reg = cls()
+        for key, factory in factories.items():
+            reg.add(ModelSpec(key, factory, kind="image" if key == "image" else "text",
+                              fallback=key in ("sentiment", "image")))
+        return reg
+
+
+def builtin_registry() -> ModelRegistry:
+    reg = ModelRegistry()
+    reg.register("sentiment", "tk_ai_gui.models.text_sentiment:TextSentimentModel",
+                 kind="text", label="Text Sentiment")
+    reg.register("image", "tk_ai_gui.models.image_classifier:ImageClassifierModel",
+                 kind="image", label="Image Classification")
+    return reg
+
+
+def default_registry() -> ModelRegistry:
+    """Built-in models, then entry points, then the config file (later ones win on a key clash)."""
+    reg = builtin_registry()
+    reg.load_entry_points()
+    reg.load_config()
+    return reg
@@ -0,0 +1,216 @@
+from __future__ import annotations
+import json, logging, os
+from pathlib import Path
+from typing import Optional
+
+# Thread/process topology for inference.
+#
+# Environment variables (override the settings file):
+#   TK_AI_THREADS / TK_AI_THREADS_<KEY>                  intra-op threads (torch.set_num_threads)
+#   TK_AI_INTEROP_THREADS / TK_AI_INTEROP_THREADS_<KEY>  inter-op threads (torch.set_num_interop_threads)
+#   TK_AI_PROCESS_MODE=1                                 run each model in its own worker process
+#   TK_AI_CORES_<KEY>=0-3,6                              cores a model's worker is pinned to
+#   TK_AI_TRANSPORT=shm|pickle                           how images reach workers (default shm)
+#   TK_AI_RUNTIME_CONFIG                                 settings file (default ~/.tk_ai_gui/runtime.json)
+
+DEFAULT_CONFIG_PATH = Path.home() / ".tk_ai_gui" / "runtime.json"
+# How inputs reach worker processes (see workers.ModelWorker)
+TRANSPORTS = ("pickle", "shm")
+
+
+def parse_cores(spec: str) -> list[int]:
+    """"0-3,6" -> [0, 1, 2, 3, 6]."""
+    cores: set[int] = set()
+    for part in (spec or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cores.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(cores)
+
+
+def parse_transport(value: str) -> str:
+    """"SHM" -> "shm"; a name not in TRANSPORTS raises ValueError."""
+    name = str(value).strip().lower()
+    if name not in TRANSPORTS:
+        raise ValueError(f"unknown transport; use one of {', '.join(TRANSPORTS)}")
+    return name
+
+
+def format_cores(cores: Optional[list[int]]) -> str:
+    return ",".join(str(c) for c in cores or [])
+
+
+def split_cores(keys: list[str], cpus: Optional[list[int]] = None) -> dict[str, list[int]]:
+    """Share the available cores out between models in contiguous, non-overlapping sets."""
+    if cpus is None:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    if not keys:
+        return {}
+    per = max(1, len(cpus) // len(keys))
+    out = {}
+    for i, key in enumerate(keys):
+        # With fewer cores than models the sets wrap around and share
+        chunk = cpus[(i * per) % len(cpus):(i * per) % len(cpus) + per]
+        out[key] = chunk or cpus[:1]
+    return out
+
+
+def apply_threads(intra: Optional[int] = None, inter: Optional[int] = None) -> None:
+    """
+    Apply thread counts to this process.
+
+    OMP/MKL variables only take effect if set before torch/numpy start their pools,
+    which is why worker processes call this before building their model.
+    torch.set_num_interop_threads can only be called once per process.
+    """
+    if intra:
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(intra)
+    try:
+        import torch
+    except ImportError:
+        return
+    if intra:
+        torch.set_num_threads(intra)
+    if inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as e:  # pool already started in this process
+            logging.warning(f"Could not set inter-op threads to {inter}: {e}")
+
+
+def pin_to_cores(cores: Optional[list[int]]) -> bool:
+    # Linux only; elsewhere the OS scheduler decides
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(0, set(cores))
+    return True
+
+
+def _valid(values, convert, what: str) -> dict:
+    # {key: convert(v)} for the settings file, skipping (with a warning) values that don't parse
+    out = {}
+    for k, v in (values or {}).items():
+        if not v:
+            continue
+        try:
+            out[k] = convert(v)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Ignoring runtime {what} for {k!r} ({v!r}): {e}")
+    return out
+
+
+class RuntimeConfig:
+    """Per-model intra/inter-op thread counts, core sets, and thread vs process mode."""
+
+    def __init__(self, threads: Optional[dict[str, int]] = None, interop: Optional[dict[str, int]] = None,
+                 cores: Optional[dict[str, list[int]]] = None, process_mode: bool = False,
+                 transport: str = "shm") -> None:
+        # Missing keys mean "leave the library default"
+        self.threads = dict(threads or {})
+        self.interop = dict(interop or {})
+        self.cores = dict(cores or {})
+        self.process_mode = process_mode
+        self.transport = transport
+        # Cores chosen by auto_split(); never saved, recomputed per ModelManager
+        self._auto_cores: dict[str, list[int]] = {}
+
+    def auto_split(self, keys: list[str]) -> dict[str, list[int]]:
+        """
+        Process mode with no cores or threads configured: give each worker its own
+        share of the cores and one intra-op thread per core, so N workers don't each
+        start a pool the size of the machine.
+        """
+        self._auto_cores = {}
+        if self.process_mode and not (self.cores or self.threads):
+            self._auto_cores = split_cores(list(keys))
+        return dict(self._auto_cores)
+
+    def for_key(self, key: str) -> dict:
+        """Settings for one model: {"threads", "interop", "cores", "transport"} (None = default)."""
+        auto = self._auto_cores.get(key)
+        return {"threads": self.threads.get(key, self.threads.get("*", len(auto) if auto else None)),
+                "interop": self.interop.get(key, self.interop.get("*")),
+                "cores": self.cores.get(key, auto), "transport": self.transport}
+
+    def is_default(self) -> bool:
+        return not (self.threads or self.interop or self.cores or self.process_mode)
+
+    def apply_in_process(self, keys: list[str]) -> None:
+        """
+        Thread mode: every model shares this process's pools, so the largest
+        per-model setting wins (torch thread counts are process-wide).
+        """
+        intra = [v for v in (self.for_key(k)["threads"] for k in keys) if v]
+        inter = [v for v in (self.for_key(k)["interop"] for k in keys) if v]
+        apply_threads(max(intra) if intra else None, max(inter) if inter else None)
+
+    # ----- persistence -----
+
+    def to_dict(self) -> dict:
+        return {"threads": self.threads, "interop": self.interop,
+                "cores": {k: format_cores(v) for k, v in self.cores.items()},
+                "process_mode": self.process_mode, "transport": self.transport}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RuntimeConfig":
+        # A bad transport would only fail inside each worker (and every model would
+        # quietly become its fallback), so it is checked here and "shm" kept instead
+        transport = "shm"
+        if data.get("transport"):
+            try:
+                transport = parse_transport(data["transport"])
+            except ValueError as e:
+                logging.warning(f"Ignoring runtime transport {data['transport']!r}: {e}")
+        return cls(threads=_valid(data.get("threads"), int, "threads"),
+                   interop=_valid(data.get("interop"), int, "interop"),
+                   cores=_valid(data.get("cores"), parse_cores, "cores"),
+                   process_mode=bool(data.get("process_mode", False)),
+                   transport=transport)
+
+    def save(self, path: Optional[str | Path] = None) -> Path:
+        path = Path(path or os.environ.get("TK_AI_RUNTIME_CONFIG") or DEFAULT_CONFIG_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str | Path] = None, env: Optional[dict] = None) -> "RuntimeConfig":
+        """Settings file (if any) with environment variables layered on top."""
+        env = os.environ if env is None else env
+        path = Path(path or env.get("TK_AI_RUNTIME_CONFIG") or DEFAULT_CONFIG_PATH)
+        data: dict = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError as e:
+                logging.warning(f"Ignoring bad runtime config {path}: {e}")
+        cfg = cls.from_dict(data)
+        cfg._apply_env(env)
+        return cfg
+
+    def _apply_env(self, env) -> None:
+        for name, value in env.items():
+            if not value or not name.startswith("TK_AI_"):
+                continue
+            try:
+                self._apply_var(name, value)
+            except ValueError as e:
+                logging.warning(f"Ignoring {name}={value!r}: {e}")
+
+    def _apply_var(self, name: str, value: str) -> None:
+        if name == "TK_AI_THREADS":
+            self.threads["*"] = int(value)
+        elif name.startswith("TK_AI_THREADS_"):
+            self.threads[name[len("TK_AI_THREADS_"):].lower()] = int(value)
+        elif name == "TK_AI_INTEROP_THREADS":
+            self.interop["*"] = int(value)
+        elif name.startswith("TK_AI_INTEROP_THREADS_"):
+            self.interop[name[len("TK_AI_INTEROP_THREADS_"):].lower()] = int(value)
+        elif name.startswith("TK_AI_CORES_"):
+            self.cores[name[len("TK_AI_CORES_"):].lower()] = parse_cores(value)
+        elif name == "TK_AI_TRANSPORT":
+            self.transport = parse_transport(value)
+        elif name == "TK_AI_PROCESS_MODE":
+            self.process_mode = value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,323 @@
+"""
+Local HTTP inference server around one shared ModelManager (stdlib asyncio only).
+
+    python -m tk_ai_gui.server [--port 8765] [--max-batch 16] [--max-wait-ms 10]
+
+Endpoints
+  POST /sentiment       {"text": "..."} or {"texts": [...]}
+  POST /image           {"image_b64": "..."} or {"path": "..."}   (or lists: "images_b64", "paths")
+  POST /predict/<key>   any registered model; the body is the text or image form above,
+                        chosen by the model's kind
+  GET  /health          which models are loaded and whether they are fallbacks
+
+/sentiment and /image also take a "model" field naming another registered model of the
+same kind; without it they use the default "sentiment" / "image" models.
+
+Concurrent requests for the same model are gathered by a MicroBatcher into one
+run_batch call (up to --max-batch items or --max-wait-ms). When a model's queue is
+full the server answers 429 instead of queueing without bound.
+"""
+from __future__ import annotations
+import argparse, asyncio, base64, io, json, logging, threading, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from .controller import ModelManager
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+class QueueFull(Exception):
+    """Raised by MicroBatcher.submit when the queue is at its limit (maps to HTTP 429)."""
+
+
+class MicroBatcher:
+    """
+    Collect single items from many concurrent callers and run them as one batch.
+
+    A batch is sent once max_batch items are waiting, or max_wait_ms after the first
+    item arrived, whichever comes first. Inference runs on a single worker thread so
+    the event loop never blocks and the model is never called concurrently.
+    """
+
+    def __init__(self, run_batch: Callable[[list], list], max_batch: int = 16,
+                 max_wait_ms: float = 10.0, max_queue: int = 256) -> None:
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.items = 0
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def submit(self, item):
+        """Queue one item and wait for its [{"label", "score"}] result."""
+        return (await self.submit_many([item]))[0]
+
+    async def submit_many(self, items: list) -> list:
+        """
+        Queue several items (each may share a batch with other requests) and wait for
+        all their results. Admission is all or nothing: if they don't all fit, nothing
+        is queued and QueueFull is raised, so no model time goes to a rejected request.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+        if self._queue.qsize() + len(items) > self.max_queue:
+            raise QueueFull()
+        loop = asyncio.get_running_loop()
+        futs = [loop.create_future() for _ in items]
+        for item, fut in zip(items, futs):
+            self._queue.put_nowait((item, fut))
+        return list(await asyncio.gather(*futs))
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            # Keep gathering until the batch is full or the wait window closes
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            items = [it for it, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.run_batch, items)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            for (_, fut), rows in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(rows)
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+
+class InferenceServer:
+    def __init__(self, mm: Optional[ModelManager] = None, host: str = "127.0.0.1", port: int = 8765,
+                 max_batch: int = 16, max_wait_ms: float = 10.0, max_queue: int = 256,
+                 max_body: int = 32 * 1024 * 1024) -> None:
+        self.mm = mm or ModelManager()
+        self.host, self.port = host, port
+        self.max_body = max_body
+        self._batcher_opts = {"max_batch": max_batch, "max_wait_ms": max_wait_ms, "max_queue": max_queue}
+        self.batchers: dict[str, MicroBatcher] = {}
+        for key in self.mm.keys():
+            self._batcher(key)
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _batcher(self, key: str) -> MicroBatcher:
+        # One batcher per model key; keys registered after start-up get theirs on first use
+        b = self.batchers.get(key)
+        if b is None:
+            max_batch = self._batcher_opts["max_batch"]
+            b = self.batchers[key] = MicroBatcher(
+                lambda items: self.mm.run_batch(key, items, batch_size=max_batch), **self._batcher_opts)
+        return b
+
+    # ----- HTTP plumbing -----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, payload = await self._dispatch(reader)
+        except Exception as e:  # never let one bad request take the server down
+            logging.exception("request failed")
+            status, payload = 500, {"error": str(e)}
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> tuple[int, object]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return 400, {"error": "empty request"}
+        method, path, _ = (request_line.split(" ", 2) + ["", ""])[:3]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            return 400, {"error": "bad Content-Length"}
+        if length < 0:
+            return 400, {"error": "bad Content-Length"}
+        if length > self.max_body:
+            return 413, {"error": "body too large"}
+        raw = await reader.readexactly(length) if length else b""
+
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, self.health()
+        if path in ("/sentiment", "/image"):
+            key, kind = path[1:], ("text" if path == "/sentiment" else "image")
+        elif path.startswith("/predict/"):
+            key = urllib.parse.unquote(path[len("/predict/"):])
+            if key not in self.mm.registry:
+                return 404, {"error": f"unknown model {key!r}"}
+            kind = self.mm.registry.get(key).kind
+        else:
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            data = json.loads(raw or b"{}")
+        except ValueError:
+            return 400, {"error": "body must be JSON"}
+        if not isinstance(data, dict):
+            return 400, {"error": "body must be a JSON object"}
+        if "model" in data and not path.startswith("/predict/"):
+            key = str(data["model"])
+            if key not in self.mm.keys(kind):
+                return 404, {"error": f"unknown {kind} model {key!r}"}
+        try:
+            if kind == "text":
+                return 200, await self._text(key, data)
+            return 200, await self._image(key, data)
+        except QueueFull:
+            return 429, {"error": "queue full, retry later"}
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            # OSError: undecodable image_b64 (UnidentifiedImageError) or a missing path
+            return 400, {"error": str(e)}
+
+    # ----- endpoints -----
+
+    async def _gather(self, key: str, items: list) -> list:
+        # Each item can share a batch with other requests; the list is admitted as a whole
+        return await self._batcher(key).submit_many(items)
+
+    async def _text(self, key: str, data: dict):
+        if "texts" in data:
+            return {"results": await self._gather(key, [str(t) for t in data["texts"]])}
+        return {"result": await self._batcher(key).submit(str(data["text"]))}
+
+    async def _image(self, key: str, data: dict):
+        from .utils.imaging import load_image
+
+        def decode(blob: str):
+            from PIL import Image
+            return Image.open(io.BytesIO(base64.b64decode(blob))).convert("RGB")
+
+        loop = asyncio.get_running_loop()
+        if "images_b64" in data or "paths" in data:
+            srcs = [(decode, b) for b in data.get("images_b64", [])] + [(load_image, p) for p in data.get("paths", [])]
+            imgs = await asyncio.gather(*(loop.run_in_executor(None, fn, arg) for fn, arg in srcs))
+            return {"results": await self._gather(key, list(imgs))}
+        if "image_b64" in data:
+            img = await loop.run_in_executor(None, decode, data["image_b64"])
+        else:
+            img = await loop.run_in_executor(None, load_image, data["path"])
+        return {"result": await self._batcher(key).submit(img)}
+
+    def health(self) -> dict:
+        models = {key: {"loaded": self.mm.is_loaded(key), "fallback": self.mm.is_fallback(key),
+                        "queue": b.depth(), "batches": b.batches, "items": b.items}
+                  for key, b in list(self.batchers.items())}
+        return {"status": "ok", "models": models}
+
+    # ----- lifecycle -----
+
+    async def start(self) -> int:
+        """Bind and start accepting connections; returns the bound port (useful with port=0)."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        logging.info("Serving on http://%s:%d", self.host, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self, timeout: float = 30.0) -> int:
+        """
+        Run the server on its own event loop in a daemon thread (for embedding/tests).
+        Raises whatever start() raised (e.g. port in use), or TimeoutError.
+        """
+        ready = threading.Event()
+        loop = asyncio.new_event_loop()
+        failed: list[BaseException] = []
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                failed.append(e)
+                loop.close()
+                return
+            finally:
+                ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        if not ready.wait(timeout):
+            raise TimeoutError(f"server did not start within {timeout}s")
+        if failed:
+            self._loop = None
+            raise failed[0]
+        return self.port
+
+    def stop(self) -> None:
+        """Stop a server started with start_in_thread()."""
+        loop = self._loop
+        if loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+            for b in self.batchers.values():
+                await b.close()
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="python -m tk_ai_gui.server",
+                                description="HTTP inference server with dynamic micro-batching.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--max-batch", type=int, default=16, help="most items per model call")
+    p.add_argument("--max-wait-ms", type=float, default=10.0, help="longest wait to fill a batch")
+    p.add_argument("--max-queue", type=int, default=256, help="queued items per model before 429")
+    p.add_argument("--preload", action="store_true", help="load the registered models before serving")
+    args = p.parse_args(argv)
+    mm = ModelManager()
+    if args.preload:
+        mm.preload().join()
+    server = InferenceServer(mm, args.host, args.port, args.max_batch, args.max_wait_ms, args.max_queue)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import threading
+from multiprocessing import shared_memory
+from typing import Optional
+import numpy as np
+
+# Room for one 4K RGB frame (3840x2160x3) per slot by default
+DEFAULT_SLOT_BYTES = 3840 * 2160 * 3
+
+
+class ShmRef:
+    """
+    What actually crosses the pipe for an image: where its pixels sit in shared
+    memory, plus shape and dtype. A few dozen bytes instead of the whole buffer.
+    """
+
+    __slots__ = ("name", "offset", "shape", "dtype")
+
+    def __init__(self, name: str, offset: int, shape: tuple, dtype: str) -> None:
+        self.name, self.offset, self.shape, self.dtype = name, offset, tuple(shape), dtype
+
+    def __getstate__(self):
+        return self.name, self.offset, self.shape, self.dtype
+
+    def __setstate__(self, state):
+        self.name, self.offset, self.shape, self.dtype = state
+
+
+class SharedImageRing:
+    """
+    Fixed pool of shared-memory slots for handing decoded images to a worker process.
+
+    The parent acquire()s a slot, write()s pixels into it and sends the ShmRef;
+    the slot is release()d once the worker's result has come back, so the same
+    memory is reused for the next image and nothing is pickled.
+    """
+
+    def __init__(self, slots: int = 8, slot_bytes: int = DEFAULT_SLOT_BYTES) -> None:
+        self.slots = max(1, slots)
+        self.slot_bytes = slot_bytes
+        # One block holds every slot; pages are only backed once written
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * slot_bytes)
+        self._free = list(range(self.slots))
+        self._cond = threading.Condition()
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def fits(self, arr: np.ndarray) -> bool:
+        return arr.nbytes <= self.slot_bytes
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """Take a free slot, waiting for one to be released if all are in use."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free, timeout):
+                raise TimeoutError("no free shared-memory slot")
+            return self._free.pop()
+
+    def acquire_many(self, n: int, timeout: Optional[float] = None) -> list[int]:
+        """
+        Take n slots in one step. Callers that grabbed slots one at a time could each
+        end up holding part of what they need and wait on each other forever.
+        """
+        if n > self.slots:
+            raise ValueError(f"{n} slots requested from a ring of {self.slots}")
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._free) >= n, timeout):
+                raise TimeoutError(f"no {n} free shared-memory slots after {timeout}s")
+            keep = len(self._free) - n
+            taken = self._free[keep:]
+            del self._free[keep:]
+            return taken
+
+    def release(self, slot: int) -> None:
+        with self._cond:
+            self._free.append(slot)
+            self._cond.notify_all()  # waiters may need several slots each
+
+    def free(self) -> int:
+        with self._cond:
+            return len(self._free)
+
+    def write(self, slot: int, arr: np.ndarray) -> ShmRef:
+        """Copy arr into the slot (one copy) and return the reference to send."""
+        arr = np.asarray(arr)
+        if not self.fits(arr):
+            raise ValueError(f"{arr.nbytes} bytes does not fit a {self.slot_bytes}-byte slot")
+        offset = slot * self.slot_bytes
+        dst = np.ndarray(arr.shape, dtype=arr.dtype, buffer=self._shm.buf, offset=offset)
+        np.copyto(dst, arr)
+        del dst  # no exported views may outlive the block
+        return ShmRef(self._shm.name, offset, arr.shape, arr.dtype.str)
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+class ShmReader:
+    """Worker side: attach to ring blocks by name and view images without copying."""
+
+    def __init__(self) -> None:
+        self._blocks: dict[str, shared_memory.SharedMemory] = {}
+
+    def view(self, ref: ShmRef) -> np.ndarray:
+        # Valid until the parent releases the slot, i.e. for the duration of one call
+        shm = self._blocks.get(ref.name)
+        if shm is None:
+            shm = self._blocks[ref.name] = shared_memory.SharedMemory(name=ref.name)
+        return np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=shm.buf, offset=ref.offset)
+
+    def resolve(self, value):
+        """Replace ShmRefs (also inside lists/tuples) with array views."""
+        if isinstance(value, ShmRef):
+            return self.view(value)
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.resolve(v) for v in value)
+        return value
+
+    def close(self) -> None:
+        for shm in self._blocks.values():
+            try:
+                shm.close()
+            except BufferError:  # a view is still referenced somewhere; the OS cleans up at exit
+                pass
+        self._blocks.clear()
+
+
+def as_pixels(item) -> Optional[np.ndarray]:
+    """Array form of PIL images and ndarrays (pixel batches too); None for anything else (paths, text)."""
+    if isinstance(item, np.ndarray):
+        return item if item.dtype != object else None
+    if hasattr(item, "mode") and hasattr(item, "size") and hasattr(item, "tobytes"):  # PIL image
+        return np.asarray(item if item.mode in ("RGB", "L") else item.convert("RGB"))
+    return None
@@ -1,34 +1,70 @@
 from __future__ import annotations 
-import functools, time, logging
+import functools, itertools, time, logging
 from typing import Callable
 import tkinter as tk
 from tkinter import messagebox
+from .metrics import REGISTRY
 
 # Set up logging so that important info is printed to the console
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger("tk_ai_gui")
+
+class _Preview:
+    # Trimmed str() of a result, only built if the log record is actually emitted
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        s = str(self.value)  # turn the result into text
+        return s[:180] + ('...' if len(s) > 180 else '')
 
-# This decorator keeps track of when a function is called and what it returns
-def log_call(func: Callable) -> Callable:
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        logging.info(f"Calling {func.__name__}")  # show that the function started
-        result = func(*args, **kwargs)  # actually run the function
-        s = str(result)  # turn the result into text
-        # log the function result (trimmed if it's too long)
-        logging.info(f"{func.__name__} -> {s[:180] + ('...' if len(s)>180 else '')}")
-        return result  # send the result back
-    return wrapper
 
-# This decorator measures how long a function takes to run
+# This decorator keeps track of when a function is called and what it returns.
+# Use as @log_call, or @log_call(sample=0.1) to log only every 10th call.
+# Nothing is formatted (and str() is never called) when INFO logging is off.
+def log_call(func: Callable | None = None, *, sample: float = 1.0) -> Callable:
+    every = max(1, round(1 / sample)) if sample > 0 else 0
+
+    def decorate(func: Callable) -> Callable:
+        counter = itertools.count()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # cheap checks first: is INFO on, and is this call in the sample?
+            log = every and logger.isEnabledFor(logging.INFO) and next(counter) % every == 0
+            if log:
+                logger.info("Calling %s", func.__name__)  # show that the function started
+            result = func(*args, **kwargs)  # actually run the function
+            if log:
+                # log the function result (trimmed if it's too long), formatted lazily
+                logger.info("%s -> %s", func.__name__, _Preview(result))
+            return result  # send the result back
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+# This decorator measures how long a function takes to run and records it in the
+# metrics registry (latency histogram, call/error counts, in-flight gauge)
 def time_call(func: Callable) -> Callable:
+    name = func.__qualname__
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        REGISTRY.start(name)
         start = time.perf_counter()  # mark the starting time
+        failed = False
         try:
             return func(*args, **kwargs)  # run the function normally
+        except BaseException:
+            failed = True
+            raise
         finally:
             dt = (time.perf_counter() - start) * 1000  # calculate time in ms
-            logging.info(f"{func.__name__} took {dt:.1f} ms")  # log how long it took
+            REGISTRY.finish(name, dt, error=failed)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%s took %.1f ms", func.__name__, dt)  # log how long it took
     return wrapper
 
 # This decorator handles errors so the program doesn’t crash unexpectedly
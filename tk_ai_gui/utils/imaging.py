@@ -1,49 +1,310 @@
 from __future__ import annotations
-from PIL import Image
-import numpy as np
-
-#Implemented try except for optional cv2 import, if missing safe Pillow-only fallback.
-try:
-    import cv2  # type: ignore
-    _HAS_CV2 = True # flag is used to know if the cv2 is available for rest of the code.
-except Exception:
-    _HAS_CV2 = False # take the pilloe path later.
-
-def load_image(path: str) -> Image.Image:
-    # Load an image from a file path, using cv2 if available for better compatibility.
-    if _HAS_CV2:
-        im = cv2.imread(path, cv2.IMREAD_COLOR) # Fast read via OpenCV (BGR order)
+import threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
+# cv2, numpy and PIL are imported inside the functions that use them, so importing
+# this module (and the GUI on top of it) costs nothing until the first image is touched.
+_CV2 = None  # cv2 once imported, False if it is missing or fails to load
+
+
+def _cv2():
+    """cv2, or None for the Pillow-only path (not installed, or e.g. libGL missing on a headless box)."""
+    global _CV2
+    if _CV2 is None:
+        try:
+            import cv2  # type: ignore
+            _CV2 = cv2
+        except Exception:
+            _CV2 = False
+    return _CV2 or None
+
+# cv2 can decode JPEGs at 1/2, 1/4 or 1/8 size directly, which skips most of the work
+_REDUCED_FLAGS = ((8, "IMREAD_REDUCED_COLOR_8"), (4, "IMREAD_REDUCED_COLOR_4"), (2, "IMREAD_REDUCED_COLOR_2"))
+
+
+def _reduction(full: tuple[int, int], target: tuple[int, int]) -> int:
+    # Largest decode-time shrink factor that still keeps the image at least target-sized
+    for r, _ in _REDUCED_FLAGS:
+        if full[0] // r >= target[0] and full[1] // r >= target[1]:
+            return r
+    return 1
+
+
+def load_image(path: str, as_array: bool = False,
+               max_size: tuple[int, int] | None = None) -> Image.Image | np.ndarray:
+    """
+    Load an image from a file path as RGB.
+
+    as_array: return the decoded H×W×3 uint8 array itself instead of wrapping it in PIL
+    max_size: (w, h) the caller will shrink to anyway; lets the decoder skip resolution
+              it would throw away (cv2 IMREAD_REDUCED_* / PIL JPEG draft mode)
+    """
+    import numpy as np
+    from PIL import Image
+    cv2 = _cv2()
+    if cv2 is not None:
+        flag = cv2.IMREAD_COLOR
+        if max_size:
+            with Image.open(path) as probe:            # Reads the header only, not the pixels.
+                r = _reduction(probe.size, max_size)
+            if r > 1:
+                flag = getattr(cv2, dict(_REDUCED_FLAGS)[r])
+        im = cv2.imread(path, flag) # Fast read via OpenCV (BGR order)
         if im is None: # used for bad path or unreadable file.
             raise ValueError(f"Could not open image: {path}")
-        im = cv2.cvtColor(im, cv2.COLOR_BGR2RGB) # Convert BGR ➜ RGB so colors are correct.
-        return Image.fromarray(im) # Convert to PIL Image
+        cv2.cvtColor(im, cv2.COLOR_BGR2RGB, dst=im) # BGR ➜ RGB in place, no second buffer.
+        return im if as_array else Image.fromarray(im)
     #Fallback: use Pillow and force RGB so downstream code is consistent.
-    return Image.open(path).convert("RGB")
+    img = Image.open(path)
+    if max_size and img.format == "JPEG":
+        img.draft("RGB", max_size)                     # JPEG DCT scaling: decode near target size.
+    img = img.convert("RGB")
+    return np.asarray(img) if as_array else img
+
 
-def preprocess_image_cv2(pil_img: Image.Image, size=(224,224), blur=False, edges=False, gray=False) -> Image.Image:
+def preprocess_image_cv2(pil_img: Image.Image | np.ndarray, size=(224,224), blur=False, edges=False,
+                         gray=False, as_array: bool = False) -> Image.Image | np.ndarray:
 
     """
     Resize and optionally apply grayscale, blur, or edge detection.
-    Always returns a Pillow RGB image.
+    Accepts a Pillow image or an H×W×3 uint8 array. Returns a Pillow RGB image,
+    or the uint8 array when as_array=True. An array input is never copied at full size;
+    the first new buffer is the resized one.
     """
-    if not _HAS_CV2:
-        return pil_img.resize(size)               # No cv2: do the minimum useful step (resize).
-
-    im = np.array(pil_img)                        #  Pillow ➜ NumPy array (RGB) for OpenCV ops.
+    import numpy as np
+    from PIL import Image
+    cv2 = _cv2()
+    if cv2 is None:
+        img = Image.fromarray(pil_img) if isinstance(pil_img, np.ndarray) else pil_img
+        img = img.resize(size)                    # No cv2: do the minimum useful step (resize).
+        return np.asarray(img) if as_array else img
 
-    import cv2                                    #  Local import keeps top-level optional.
+    #  Pillow ➜ NumPy view (RGB) for OpenCV ops; arrays are used as-is.
+    im = pil_img if isinstance(pil_img, np.ndarray) else np.asarray(pil_img)
 
     im = cv2.resize(im, size, interpolation=cv2.INTER_AREA)  # High-quality shrink for model inputs.
 
     if gray:
-        im = cv2.cvtColor(im, cv2.COLOR_RGB2GRAY)            #  To 1-channel for true grayscale.
-        im = cv2.cvtColor(im, cv2.COLOR_GRAY2RGB)            #  Back to 3-channel to keep shape consistent.
+        g = cv2.cvtColor(im, cv2.COLOR_RGB2GRAY)             #  To 1-channel for true grayscale.
+        cv2.cvtColor(g, cv2.COLOR_GRAY2RGB, dst=im)          #  Back to 3-channel, reusing the buffer.
 
     if blur:
-        im = cv2.GaussianBlur(im, (3, 3), 0)                  # Light denoise/smoothing.
+        cv2.GaussianBlur(im, (3, 3), 0, dst=im)               # Light denoise/smoothing, in place.
 
     if edges:
         e = cv2.Canny(im, 100, 200)                           # Detect edges (single channel).
-        im = cv2.cvtColor(e, cv2.COLOR_GRAY2RGB)              #  Back to RGB so callers don't break.
+        cv2.cvtColor(e, cv2.COLOR_GRAY2RGB, dst=im)           #  Back to RGB so callers don't break.
+
+    return im if as_array else Image.fromarray(im)            #  Return Pillow Image for downstream use.
+
+
+# ---------------- Vectorised batch preprocessing ----------------
+
+# ViT-base (the default image model) normalises with mean = std = 0.5 per channel
+DEFAULT_MEAN = (0.5, 0.5, 0.5)
+DEFAULT_STD = (0.5, 0.5, 0.5)
+_GRAY_WEIGHTS = (0.299, 0.587, 0.114)  # same as cv2 RGB2GRAY
+
+
+def _blur3_numpy(batch: np.ndarray) -> np.ndarray:
+    """3×3 Gaussian over a whole (N,H,W,C) batch; matches cv2.GaussianBlur((3,3), 0)."""
+    # cv2 uses kernel [1,2,1]/4 for ksize 3 and reflect-101 borders (numpy's "reflect")
+    import numpy as np
+    p = np.pad(batch.astype(np.uint16), ((0, 0), (1, 1), (1, 1), (0, 0)), mode="reflect")
+    rows = p[:, :-2] + 2 * p[:, 1:-1] + p[:, 2:]                     # vertical pass
+    both = rows[:, :, :-2] + 2 * rows[:, :, 1:-1] + rows[:, :, 2:]   # horizontal pass
+    return ((both + 8) >> 4).astype(np.uint8)                         # /16 with rounding
+
+
+def _resize_into(dst: np.ndarray, im: np.ndarray) -> None:
+    # Write one resized RGB image into its slot of the batch buffer
+    import numpy as np
+    cv2 = _cv2()
+    if im.shape[:2] == dst.shape[:2]:
+        dst[...] = im[..., :3]
+    elif cv2 is not None:
+        cv2.resize(np.ascontiguousarray(im[..., :3]), (dst.shape[1], dst.shape[0]),
+                   dst=dst, interpolation=cv2.INTER_AREA)
+    else:
+        from PIL import Image
+        dst[...] = np.asarray(Image.fromarray(im[..., :3]).resize((dst.shape[1], dst.shape[0])))
+
+
+def preprocess_batch(images, size=(224, 224), blur=False, edges=False, gray=False,
+                     mean=DEFAULT_MEAN, std=DEFAULT_STD, channels_first: bool = True) -> np.ndarray:
+    """
+    Preprocess many images at once into a model-ready float32 tensor.
+
+    images: an (N,H,W,3) uint8 array or a list of H×W×3 arrays / PIL images
+    size: (w, h) model resolution
+    Returns a C-contiguous (N,3,h,w) float32 array (N,h,w,3 if channels_first=False),
+    already normalised as (x/255 - mean) / std, so the HF image processor can be skipped.
+    """
+    import numpy as np
+    cv2 = _cv2() if (blur or edges) else None
+    w, h = size
+    if isinstance(images, np.ndarray) and images.ndim == 4 and images.shape[1:3] == (h, w):
+        batch = images[..., :3]                                   # Already model-sized: no copy...
+        if blur and not gray:
+            batch = np.array(batch)                               # ...unless blur would write into it.
+    else:
+        items = list(images)
+        batch = np.empty((len(items), h, w, 3), dtype=np.uint8)  # One buffer for the whole batch.
+        for i, im in enumerate(items):
+            _resize_into(batch[i], im if isinstance(im, np.ndarray) else np.asarray(im.convert("RGB")))
+
+    if gray:
+        weights = np.array(_GRAY_WEIGHTS, dtype=np.float32)
+        g = np.rint(batch @ weights).astype(np.uint8)             # Luma for every pixel in one matmul.
+        batch = np.repeat(g[..., None], 3, axis=-1)
+
+    if blur:
+        if cv2 is not None:
+            batch = np.ascontiguousarray(batch)
+            for im in batch:
+                cv2.GaussianBlur(im, (3, 3), 0, dst=im)
+        else:
+            batch = _blur3_numpy(batch)
+
+    if edges:
+        out_e = np.empty(batch.shape[:3], dtype=np.uint8)
+        for i, im in enumerate(batch):
+            if cv2 is not None:
+                out_e[i] = cv2.Canny(np.ascontiguousarray(im), 100, 200)
+            else:
+                from PIL import Image, ImageFilter
+                out_e[i] = np.asarray(Image.fromarray(im).convert("L").filter(ImageFilter.FIND_EDGES))
+        batch = np.repeat(out_e[..., None], 3, axis=-1)
+
+    # Fused normalisation: (x/255 - mean)/std == x*scale + bias, written straight
+    # into the output tensor one channel at a time (no float copy of the whole batch)
+    scale = 1.0 / (255.0 * np.asarray(std, dtype=np.float32))
+    bias = -np.asarray(mean, dtype=np.float32) / np.asarray(std, dtype=np.float32)
+    n = batch.shape[0]
+    out = np.empty((n, 3, h, w) if channels_first else (n, h, w, 3), dtype=np.float32)
+    for c in range(3):
+        dst = out[:, c] if channels_first else out[..., c]
+        np.multiply(batch[..., c], scale[c], out=dst, dtype=np.float32)
+        dst += bias[c]
+    return out
+
+
+# ---------------- Streaming decode → preprocess → inference pipeline ----------------
+
+
+class StageTimer:
+    """Thread-safe running totals of seconds spent per pipeline stage."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seconds: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float, n: int = 1) -> None:
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + n
+
+    def summary(self) -> dict:
+        # Per stage: total ms and ms per item. Worker stages add up across threads,
+        # so their totals can exceed the wall time when they overlap.
+        with self._lock:
+            return {s: {"total_ms": round(t * 1000, 1),
+                        "per_item_ms": round(t * 1000 / max(self.counts[s], 1), 3),
+                        "items": self.counts[s]}
+                    for s, t in self.seconds.items()}
+
+
+def decode_and_preprocess(path: str, preprocess: Optional[dict] = None,
+                          timer: Optional[StageTimer] = None) -> Image.Image:
+    """Decode one file and optionally run preprocess_image_cv2 on it (runs in a worker)."""
+    t0 = time.perf_counter()
+    if preprocess is not None:
+        # Decode straight to an array, as small as the resize target allows
+        img = load_image(path, as_array=True, max_size=preprocess.get("size", (224, 224)))
+    else:
+        img = load_image(path)
+    t1 = time.perf_counter()
+    if preprocess is not None:
+        img = preprocess_image_cv2(img, **preprocess)
+    t2 = time.perf_counter()
+    if timer:
+        timer.add("decode", t1 - t0)
+        if preprocess is not None:
+            timer.add("preprocess", t2 - t1)
+    return img
+
+
+def iter_decoded(paths: Iterable[str], workers: int = 4, prefetch: int = 16,
+                 preprocess: Optional[dict] = None, timer: Optional[StageTimer] = None,
+                 skip_errors: bool = False) -> Iterator[tuple[str, Image.Image]]:
+    """
+    Yield (path, image) in input order while a thread pool decodes ahead.
+    At most `prefetch` images are in flight, so memory stays bounded on huge folders.
+    cv2 releases the GIL while decoding/resizing, so threads really run in parallel.
+    skip_errors: yield (path, exception) for files that fail to decode instead of raising.
+    """
+    it = iter(paths)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        window: deque = deque()
+
+        def fill():
+            while len(window) < max(1, prefetch):
+                p = next(it, None)
+                if p is None:
+                    return
+                window.append((p, pool.submit(decode_and_preprocess, p, preprocess, timer)))
+
+        fill()
+        while window:
+            p, fut = window.popleft()
+            t0 = time.perf_counter()
+            try:
+                img = fut.result()
+            except Exception as e:
+                if not skip_errors:
+                    raise
+                img = e
+            if timer:
+                # Time the consumer spent waiting on decode (0 when decode keeps up)
+                timer.add("wait", time.perf_counter() - t0)
+            fill()
+            yield p, img
+
+
+def classify_paths(run_batch: Callable[[list], list], paths: Iterable[str], batch_size: int = 16,
+                   workers: int = 4, prefetch: int = 32, preprocess: Optional[dict] = None,
+                   timer: Optional[StageTimer] = None,
+                   skip_errors: bool = False) -> Iterator[tuple[list[str], list]]:
+    """
+    Feed decoded images to run_batch (e.g. ImageClassifierModel.run_batch) in batches.
+    Yields (paths, results) per batch. While one batch is in inference the pool keeps
+    decoding the next ones, so decode, preprocess and inference overlap.
+    skip_errors: a file that fails to decode is left out of the model call and its
+    result is the exception, so one bad image doesn't end the run.
+    """
+    timer = timer or StageTimer()
+    batch_paths: list[str] = []
+    batch_imgs: list = []
+
+    def infer():
+        good = [im for im in batch_imgs if not isinstance(im, Exception)]
+        t0 = time.perf_counter()
+        res = iter(run_batch(good) if good else [])
+        timer.add("inference", time.perf_counter() - t0, len(good))
+        return [im if isinstance(im, Exception) else next(res) for im in batch_imgs]
 
-    return Image.fromarray(im)                                 #  Return Pillow Image for downstream use.
+    for p, img in iter_decoded(paths, workers=workers, prefetch=prefetch, preprocess=preprocess,
+                               timer=timer, skip_errors=skip_errors):
+        batch_paths.append(p); batch_imgs.append(img)
+        if len(batch_imgs) >= batch_size:
+            yield batch_paths, infer()
+            batch_paths, batch_imgs = [], []
+    if batch_imgs:
+        yield batch_paths, infer()
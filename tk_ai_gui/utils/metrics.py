@@ -0,0 +1,116 @@
+from __future__ import annotations
+import bisect, json, threading
+from typing import Optional
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cheap to update, mergeable, Prometheus-shaped)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # one extra slot for +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.sum += ms
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0..1) by interpolating inside the matching bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+
+class FunctionMetrics:
+    """Everything recorded for one decorated function."""
+
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+
+
+class MetricsRegistry:
+    """Process-wide store of per-function metrics, fed by the decorators in utils.decorators."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._funcs: dict[str, FunctionMetrics] = {}
+
+    def _get(self, name: str) -> FunctionMetrics:
+        # Caller holds self._lock
+        m = self._funcs.get(name)
+        if m is None:
+            m = self._funcs[name] = FunctionMetrics()
+        return m
+
+    def start(self, name: str) -> None:
+        with self._lock:
+            self._get(name).in_flight += 1
+
+    def finish(self, name: str, ms: float, error: bool = False) -> None:
+        with self._lock:
+            m = self._get(name)
+            m.in_flight -= 1
+            m.calls += 1
+            m.errors += int(error)
+            m.latency.observe(ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._funcs.clear()
+
+    def snapshot(self) -> dict[str, dict]:
+        """Plain-dict view: calls, errors, in-flight and latency stats per function."""
+        with self._lock:
+            return {name: {"calls": m.calls, "errors": m.errors, "in_flight": m.in_flight,
+                           "sum_ms": round(m.latency.sum, 3),
+                           "mean_ms": round(m.latency.sum / m.latency.count, 3) if m.latency.count else 0.0,
+                           "p50_ms": round(m.latency.quantile(0.50), 3),
+                           "p95_ms": round(m.latency.quantile(0.95), 3),
+                           "p99_ms": round(m.latency.quantile(0.99), 3),
+                           "buckets_ms": list(m.latency.buckets),
+                           "bucket_counts": list(m.latency.counts)}
+                    for name, m in sorted(self._funcs.items())}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "tk_ai") -> str:
+        """Prometheus text exposition format (histogram + counters + gauge)."""
+        snap = self.snapshot()
+        out = [f"# HELP {prefix}_call_latency_ms Call latency in milliseconds.",
+               f"# TYPE {prefix}_call_latency_ms histogram"]
+        for name, s in snap.items():
+            cum = 0
+            for le, c in zip(list(s["buckets_ms"]) + ["+Inf"], s["bucket_counts"]):
+                cum += c
+                out.append(f'{prefix}_call_latency_ms_bucket{{func="{name}",le="{le}"}} {cum}')
+            out.append(f'{prefix}_call_latency_ms_sum{{func="{name}"}} {s["sum_ms"]}')
+            out.append(f'{prefix}_call_latency_ms_count{{func="{name}"}} {s["calls"]}')
+        for metric, key, kind, help_ in (("calls_total", "calls", "counter", "Completed calls."),
+                                         ("call_errors_total", "errors", "counter", "Calls that raised."),
+                                         ("calls_in_flight", "in_flight", "gauge", "Calls running now.")):
+            out.append(f"# HELP {prefix}_{metric} {help_}")
+            out.append(f"# TYPE {prefix}_{metric} {kind}")
+            out.extend(f'{prefix}_{metric}{{func="{name}"}} {s[key]}' for name, s in snap.items())
+        return "\n".join(out) + "\n"
+
+
+# Shared registry used by @time_call
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import hashlib, io, logging, os, threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+from .imaging import load_image
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Default location; override with TK_AI_THUMB_DIR or pass cache_dir=
+DEFAULT_DIR = Path.home() / ".tk_ai_gui" / "thumbs"
+
+
+def make_thumbnail(path: str, size: tuple[int, int]) -> Image.Image:
+    """Decode `path` near `size` (cv2 IMREAD_REDUCED_* / JPEG draft mode) and fit it inside size."""
+    img = load_image(path, max_size=size)
+    img.thumbnail(size)
+    return img
+
+
+class ThumbnailCache:
+    """
+    Thumbnails on disk, keyed by the file's absolute path, mtime and size (plus the
+    thumbnail size), so an edited or replaced file never shows a stale preview.
+
+    Memory tier: an LRU of at most memory_items PIL images.
+    Disk tier: one small JPEG per thumbnail in cache_dir, at most max_bytes in
+    total; the least recently used files go first (use refreshes a file's mtime).
+
+    get() never decodes; request() builds misses on a thread pool, so the Tk
+    thread only ever waits for a cache lookup.
+    """
+
+    def __init__(self, cache_dir: Optional[str | Path] = None, max_bytes: int = 256 * 2**20,
+                 memory_items: int = 256, workers: int = 2) -> None:
+        self.dir = Path(cache_dir or os.environ.get("TK_AI_THUMB_DIR") or DEFAULT_DIR)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._lock = threading.Lock()
+        self._mem: OrderedDict[str, Image.Image] = OrderedDict()
+        # Disk index in LRU order (oldest first), rebuilt from file mtimes at start-up
+        files = sorted(self.dir.glob("*.jpg"), key=lambda p: p.stat().st_mtime)
+        self._disk: OrderedDict[str, int] = OrderedDict((p.stem, p.stat().st_size) for p in files)
+        self._disk_bytes = sum(self._disk.values())
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="thumbs")
+        self._pending: dict[str, Future] = {}
+        # Counters for stats(); a miss is a thumbnail built from its source, counted once
+        # in _build however the lookup got there (get() then request(), or get_or_build())
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(path: str, size: tuple[int, int]) -> str:
+        st = os.stat(path)
+        ident = f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}:{size[0]}x{size[1]}"
+        return hashlib.blake2b(ident.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.dir / f"{key}.jpg"
+
+    # ----- lookups -----
+
+    def get(self, path: str, size: tuple[int, int]) -> Optional[Image.Image]:
+        """Cached thumbnail, or None on a miss (never decodes the source image)."""
+        try:
+            key = self.key(path, size)
+        except OSError:
+            return None
+        with self._lock:
+            img = self._mem.get(key)
+            if img is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return img
+            on_disk = key in self._disk
+        if not on_disk:
+            return None
+        from PIL import Image
+        try:
+            with Image.open(self._file(key)) as f:
+                img = f.convert("RGB")
+            os.utime(self._file(key))  # mark as recently used for the next start-up
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self.disk_hits += 1
+            self._remember(key, img)
+        return img
+
+    def get_or_build(self, path: str, size: tuple[int, int]) -> Image.Image:
+        img = self.get(path, size)
+        if img is None:
+            img = self._build(path, size)
+        return img
+
+    def request(self, path: str, size: tuple[int, int],
+                callback: Optional[Callable[[str, Optional[Image.Image]], None]] = None) -> Future:
+        """
+        Build (or load) the thumbnail on the pool; callback(path, image or None) runs on
+        that thread when done, so GUI callers must hand it over to the Tk thread themselves.
+        Requests for the same thumbnail while one is in flight share it.
+        """
+        try:
+            key = self.key(path, size)
+        except OSError as e:
+            fut: Future = Future()
+            fut.set_exception(e)
+        else:
+            with self._lock:
+                fut = self._pending.get(key)
+                if fut is None:
+                    fut = self._pending[key] = self._pool.submit(self.get_or_build, path, size)
+                    fut.add_done_callback(lambda _f, k=key: self._pending.pop(k, None))
+        if callback:
+            fut.add_done_callback(lambda f: callback(path, None if f.exception() else f.result()))
+        return fut
+
+    # ----- building / storage -----
+
+    def _build(self, path: str, size: tuple[int, int]) -> Image.Image:
+        key = self.key(path, size)
+        with self._lock:
+            self.misses += 1
+        img = make_thumbnail(path, size)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+        data = buf.getvalue()
+        # Write then rename, so a crash never leaves half a thumbnail behind
+        tmp = self.dir / f"{key}.{threading.get_ident()}.tmp"
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, self._file(key))
+        except OSError as e:
+            logging.warning(f"Could not store thumbnail for {path}: {e}")
+            tmp.unlink(missing_ok=True)
+            with self._lock:
+                self._remember(key, img)
+            return img
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._remember(key, img)
+            self._evict()
+        return img
+
+    def _remember(self, key: str, img: Image.Image) -> None:
+        # Caller holds self._lock
+        self._mem[key] = img
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_items:
+            self._mem.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        # Caller holds self._lock
+        self._disk_bytes -= self._disk.pop(key, 0)
+
+    def _evict(self) -> None:
+        # Caller holds self._lock
+        while self._disk_bytes > self.max_bytes and len(self._disk) > 1:
+            key, nbytes = self._disk.popitem(last=False)
+            self._disk_bytes -= nbytes
+            self.evictions += 1
+            try:
+                self._file(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "evictions": self.evictions, "memory_items": len(self._mem),
+                    "disk_items": len(self._disk), "disk_bytes": self._disk_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            for key in list(self._disk):
+                self._file(key).unlink(missing_ok=True)
+            self._disk.clear()
+            self._disk_bytes = 0
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
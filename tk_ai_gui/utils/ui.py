@@ -1,41 +1,57 @@
 from __future__ import annotations
+import time
 import tkinter as tk
+from importlib.util import find_spec
 from tkinter import ttk
 
+# Looked up on disk only; ttkbootstrap itself is imported once the window is up
+_HAS_BOOTSTRAP = find_spec("ttkbootstrap") is not None
+BOOTSTRAP_THEMES = ["cosmo","flatly","journal","litera","minty","pulse","sandstone","solar","united","yeti","darkly","cyborg","superhero","vapor"]
+
 class ThemeManager:
     def __init__(self, root: tk.Tk):
         self.root = root
         self.style = ttk.Style(self.root)  # Style object controls widget looks
-        self._bootstrap = None  # Will hold ttkbootstrap if available
-        try:
-            # Try to use ttkbootstrap (a modern theming library)
-            import ttkbootstrap as tb  # type: ignore
-            self._bootstrap = tb
-            self.style.theme_use("cosmo") # Default bootstrap theme
-        except Exception:
-            # If ttkbootstrap not available, fall back to built-in ttk themes
-            avail = self.style.theme_names()
-            self.style.theme_use("clam" if "clam" in avail else avail[0])
-        
-        # Apply default font and styles    
+        self._bootstrap = None  # Will hold ttkbootstrap once it has been imported
+        # Start on a built-in ttk theme so the first frame doesn't wait for ttkbootstrap
+        avail = self.style.theme_names()
+        self.style.theme_use("clam" if "clam" in avail else avail[0])
+
+        self._apply_fonts()
+
+        # If ttkbootstrap (a modern theming library) is installed, switch to it when Tk is idle
+        if _HAS_BOOTSTRAP:
+            self.root.after_idle(lambda: self.set_theme(BOOTSTRAP_THEMES[0]))
+
+    def _apply_fonts(self):
+        # Apply default font and styles (per theme, so again after every switch)
         self.style.configure(".", font=("Segoe UI", 10))
         self.style.configure("Title.TLabel", font=("Segoe UI", 14, "bold"))
         self.style.configure("Section.TLabelframe.Label", font=("Segoe UI", 11, "bold"))
         self.style.configure("Accent.TButton", font=("Segoe UI", 10, "bold"))
 
+    def _load_bootstrap(self):
+        if self._bootstrap is None and _HAS_BOOTSTRAP:
+            try:
+                import ttkbootstrap as tb  # type: ignore
+                self._bootstrap = tb
+            except Exception:
+                pass
+        return self._bootstrap
+
     # Method to change theme at runtime
     def set_theme(self, name: str):
-        if self._bootstrap:
-            try: self.style.theme_use(name); return
+        if name in BOOTSTRAP_THEMES and self._load_bootstrap():
+            try: self.style.theme_use(name); self._apply_fonts(); return
             except Exception: pass
             # Use built-in ttk theme if available
-        if name in self.style.theme_names(): self.style.theme_use(name)
+        if name in self.style.theme_names(): self.style.theme_use(name); self._apply_fonts()
 
         # Get a list of available themes
     def available_themes(self) -> list[str]:
-        if self._bootstrap:
+        if _HAS_BOOTSTRAP:
             # Predefined bootstrap themes
-            return ["cosmo","flatly","journal","litera","minty","pulse","sandstone","solar","united","yeti","darkly","cyborg","superhero","vapor"]
+            return list(BOOTSTRAP_THEMES)
         # Otherwise return built-in ttk themes
         return list(self.style.theme_names())
 
@@ -84,3 +100,70 @@ class ToolTip:
         # Destroy tooltip window
     def _hide(self):
         if self._tip: self._tip.destroy(); self._tip = None
+
+
+class StallMonitor:
+    """
+    Heartbeat on the Tk event loop. Each beat is scheduled interval_ms ahead; how
+    late it actually fires is time the main thread spent busy (decoding, layout,
+    callbacks), recorded as "ui.stall" latency in the metrics registry.
+    While running it wakes the Tk thread every interval_ms, so callers start it
+    only while someone is looking at the numbers.
+    """
+
+    def __init__(self, widget: tk.Misc, interval_ms: int = 50, name: str = "ui.stall"):
+        self.widget, self.interval_ms, self.name = widget, interval_ms, name
+        self._id = None
+        self._due = 0.0
+
+    def start(self):
+        self.stop()
+        self._due = time.perf_counter() + self.interval_ms / 1000
+        self._id = self.widget.after(self.interval_ms, self._beat)
+
+    def stop(self):
+        if self._id:
+            self.widget.after_cancel(self._id)
+            self._id = None
+
+    @property
+    def running(self) -> bool:
+        return self._id is not None
+
+    def _beat(self):
+        from .metrics import REGISTRY
+        late_ms = max(0.0, (time.perf_counter() - self._due) * 1000)
+        REGISTRY.start(self.name)
+        REGISTRY.finish(self.name, late_ms)
+        self.start()
+
+
+class Splash:
+    """
+    Small borderless "loading" window shown while the main window is built.
+    Uses plain tk widgets only, so it can be on screen before any theme,
+    model or imaging code has been imported.
+    """
+
+    def __init__(self, root: tk.Tk, text: str = "Loading AI Model Studio…", size=(360, 110)):
+        self.root = root
+        self.top = tk.Toplevel(root)
+        self.top.overrideredirect(True)  # No window decorations
+        w, h = size
+        x = (self.top.winfo_screenwidth() - w) // 2
+        y = (self.top.winfo_screenheight() - h) // 3
+        self.top.geometry(f"{w}x{h}+{x}+{y}")
+        frame = tk.Frame(self.top, bd=1, relief="solid", bg="white")
+        frame.pack(fill=tk.BOTH, expand=True)
+        tk.Label(frame, text="AI Model Studio", font=("Segoe UI", 14, "bold"), bg="white").pack(pady=(18, 4))
+        self.label = tk.Label(frame, text=text, font=("Segoe UI", 10), bg="white", fg="#555555")
+        self.label.pack()
+
+    def show(self):
+        # Paint now: nothing else reaches the screen until mainloop starts
+        self.top.update()
+
+    def close(self):
+        if self.top is not None:
+            self.top.destroy()
+            self.top = None
@@ -0,0 +1,305 @@
+from __future__ import annotations
+import queue
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, filedialog
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+from ..utils.imaging import classify_paths, load_image
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageTk
+
+THUMB = 128       # thumbnail box (px)
+CAPTION_H = 34    # room for "label  0.93" under each thumbnail
+PAD = 8
+
+
+# Grid maths (no Tk): which cells exist where, and which ones are on screen
+
+def grid_columns(width: int, cell_w: int) -> int:
+    return max(1, width // max(1, cell_w))
+
+
+def cell_origin(i: int, columns: int, cell_w: int, cell_h: int) -> tuple[int, int]:
+    return (i % columns) * cell_w, (i // columns) * cell_h
+
+
+def visible_range(top: float, height: float, n: int, columns: int, cell_h: int, margin_rows: int = 1) -> range:
+    """Indices of the cells intersecting [top, top + height), plus margin_rows above and below."""
+    if n <= 0:
+        return range(0)
+    first_row = max(0, int(top // cell_h) - margin_rows)
+    last_row = int((top + height) // cell_h) + margin_rows
+    return range(min(n, first_row * columns), min(n, (last_row + 1) * columns))
+
+
+def caption(rows: Optional[list[dict]], width: int = 18) -> str:
+    # Top label and score for the text under a thumbnail
+    if not rows:
+        return ""
+    label = str(rows[0].get("label", "?"))
+    if len(label) > width:
+        label = label[:width - 1] + "…"
+    return f"{label}  {float(rows[0].get('score', 0.0)):.2f}"
+
+
+def decode_thumb(path: str, size: int = THUMB) -> Image.Image:
+    # Decode near thumbnail size (cv2 reduced decode / JPEG draft), then shrink the rest
+    img = load_image(path, max_size=(size, size))
+    img.thumbnail((size, size))
+    return img
+
+
+def classify_progressively(run_batch: Callable[[list], list], paths: Iterable[str],
+                           on_batch: Callable[[int, list], None], cancelled: Optional[Callable[[], bool]] = None,
+                           batch_size: int = 16, workers: int = 4) -> int:
+    """
+    Classify paths in batches, calling on_batch(start_index, rows) after each one
+    (results arrive in input order). A file that can't be decoded gets None in
+    rows, so the indices of the rest stay aligned. Stops between batches once
+    cancelled() is true; returns how many images were processed.
+    """
+    done = 0
+    for batch, rows in classify_paths(run_batch, paths, batch_size=batch_size, workers=workers,
+                                      prefetch=max(2 * batch_size, workers), skip_errors=True):
+        on_batch(done, [None if isinstance(r, Exception) else r for r in rows])
+        done += len(batch)
+        if cancelled and cancelled():
+            break
+    return done
+
+
+# Folder gallery: virtualized thumbnail grid with background classification
+
+class GalleryPanel:
+    """
+    Scrollable thumbnail grid for a whole folder.
+
+    Only the cells on screen (plus a row either side) exist as canvas items, and
+    only their thumbnails are decoded, on a small thread pool; cells scrolled away
+    before their turn are skipped. Decoded thumbnails and classification results
+    come back through a queue and a Tk event, so the main thread only turns
+    finished thumbnails into PhotoImages and updates captions.
+    """
+
+    def __init__(self, master, run_batch: Callable[[list], list], run_job: Callable,
+                 on_open: Optional[Callable[[str], None]] = None, max_thumbs: int = 600,
+                 decode_workers: int = 3, batch_size: int = 16, thumbs=None):
+        # run_batch(images) -> rows per image; run_job(func, on_done, name) -> Job (scheduler)
+        self.run_batch, self.run_job, self.on_open = run_batch, run_job, on_open
+        # Optional ThumbnailCache: reopening a folder reads small JPEGs instead of decoding originals
+        self.thumbs = thumbs
+        self.max_thumbs, self.batch_size = max_thumbs, batch_size
+        self.cell_w, self.cell_h = THUMB + PAD, THUMB + CAPTION_H + PAD
+        self.frame = ttk.LabelFrame(master, text="Gallery", style="Section.TLabelframe")
+
+        bar = ttk.Frame(self.frame); bar.pack(fill=tk.X, padx=8, pady=(8, 4))
+        ttk.Button(bar, text="Open Folder…", command=self.open_folder).pack(side=tk.LEFT)
+        self.classify_btn = ttk.Button(bar, text="Classify All", command=self.classify)
+        self.classify_btn.pack(side=tk.LEFT, padx=6)
+        ttk.Button(bar, text="Stop", command=self.stop).pack(side=tk.LEFT)
+        self.status = ttk.Label(bar, text="No folder open.")
+        self.status.pack(side=tk.LEFT, padx=10)
+
+        body = ttk.Frame(self.frame); body.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 10))
+        self.canvas = tk.Canvas(body, highlightthickness=0, yscrollincrement=self.cell_h // 4)
+        vsb = ttk.Scrollbar(body, orient="vertical", command=self.canvas.yview)
+        self.vsb = vsb
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.canvas.bind("<Configure>", lambda _: self._layout())
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-2 if e.delta > 0 else 2, "units"))
+        self.canvas.bind("<Button-4>", lambda _: self.canvas.yview_scroll(-2, "units"))  # X11 wheel
+        self.canvas.bind("<Button-5>", lambda _: self.canvas.yview_scroll(2, "units"))
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.frame.bind("<<GalleryUpdate>>", self._drain)
+
+        self.paths: list[str] = []
+        self.results: dict[int, list[dict]] = {}
+        self.columns = 1
+        self._gen = 0   # bumped per folder; stale thumbnails/results are dropped
+        self._items: dict[int, tuple[int, int, int]] = {}   # index -> (frame, image, caption) canvas ids
+        self._thumbs: OrderedDict[int, ImageTk.PhotoImage] = OrderedDict()  # LRU, main thread only
+        self._requested: set[int] = set()
+        self._wanted: frozenset[int] = frozenset()  # read by decode threads to skip stale work
+        self._inbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, decode_workers), thread_name_prefix="thumbs")
+        self._job = None
+        self._redraw_pending = False
+
+    # ----- folder / classification -----
+
+    def open_folder(self, folder: Optional[str] = None):
+        folder = folder or filedialog.askdirectory()
+        if not folder:
+            return
+        from ..batch import find_images
+        self.load(find_images(folder))
+
+    def load(self, paths: list[str]):
+        self.stop()
+        self._gen += 1
+        self.paths = list(paths)
+        self.results.clear()
+        self._thumbs.clear()
+        self._requested.clear()
+        self.canvas.delete("all")
+        self._items.clear()
+        self.canvas.yview_moveto(0)
+        self._layout()
+        self._set_status()
+
+    def classify(self):
+        if not self.paths or (self._job and not self._job.finished):
+            return
+        gen, paths = self._gen, list(self.paths)
+        holder = {}
+
+        def work():
+            n = classify_progressively(self.run_batch, paths,
+                                       on_batch=lambda start, rows: self._post(("results", gen, start, rows)),
+                                       cancelled=lambda: "job" in holder and holder["job"].cancelled,
+                                       batch_size=self.batch_size)
+            return {"classified": n, "total": len(paths)}
+
+        self._job = holder["job"] = self.run_job(work, lambda _res: self._set_status(), f"gallery ({len(paths)} images)")
+        self._set_status()
+
+    def stop(self):
+        if self._job:
+            self._job.cancel()
+            self._job = None
+
+    def close(self):
+        self.stop()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ----- drawing -----
+
+    def _layout(self):
+        width = max(1, self.canvas.winfo_width())
+        columns = grid_columns(width, self.cell_w)
+        rows = -(-len(self.paths) // columns)
+        self.canvas.configure(scrollregion=(0, 0, columns * self.cell_w, rows * self.cell_h))
+        if columns != self.columns:
+            # every cell moves: start over with the new column count
+            self.columns = columns
+            self.canvas.delete("all")
+            self._items.clear()
+        self._draw_visible()
+
+    def _on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        # Coalesce bursts of scroll events into one redraw when Tk is idle
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.canvas.after_idle(self._draw_visible)
+
+    def _draw_visible(self):
+        self._redraw_pending = False
+        top = self.canvas.canvasy(0)
+        visible = visible_range(top, self.canvas.winfo_height(), len(self.paths), self.columns, self.cell_h)
+        wanted = frozenset(visible)
+        self._wanted = wanted
+        for i in [i for i in self._items if i not in wanted]:
+            for item in self._items.pop(i):
+                self.canvas.delete(item)
+        for i in visible:
+            if i not in self._items:
+                self._create_cell(i)
+
+    def _create_cell(self, i: int):
+        x, y = cell_origin(i, self.columns, self.cell_w, self.cell_h)
+        cx = x + self.cell_w // 2
+        frame = self.canvas.create_rectangle(x + 2, y + 2, x + self.cell_w - 2, y + THUMB + 4, outline="#c8c8c8")
+        photo = self._thumbs.get(i)
+        image = self.canvas.create_image(cx, y + 4 + THUMB // 2, image=photo or "")
+        text = self.canvas.create_text(cx, y + THUMB + 8, anchor="n", width=self.cell_w - 4,
+                                       text=caption(self.results.get(i)), font=("Segoe UI", 9))
+        self._items[i] = (frame, image, text)
+        if photo is not None:
+            self._thumbs.move_to_end(i)
+        elif i not in self._requested:
+            self._requested.add(i)
+            self._pool.submit(self._decode, self._gen, i, self.paths[i])
+
+    def _on_double_click(self, e):
+        x, y = self.canvas.canvasx(e.x), self.canvas.canvasy(e.y)
+        i = int(y // self.cell_h) * self.columns + int(x // self.cell_w)
+        if self.on_open and 0 <= x < self.columns * self.cell_w and 0 <= i < len(self.paths):
+            self.on_open(self.paths[i])
+
+    # ----- background work -> main thread -----
+
+    def _decode(self, gen: int, i: int, path: str):
+        # Decode thread: skip cells that were scrolled away (or a folder that was replaced)
+        if gen != self._gen or i not in self._wanted:
+            self._post(("skip", gen, i, None))
+            return
+        try:
+            img = self.thumbs.get_or_build(path, (THUMB, THUMB)) if self.thumbs else decode_thumb(path)
+        except Exception:  # unreadable file: leave the cell empty
+            img = None
+        self._post(("thumb", gen, i, img))
+
+    def _post(self, msg):
+        self._inbox.put(msg)
+        try:
+            self.frame.event_generate("<<GalleryUpdate>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            pass  # window already closed
+
+    def _drain(self, _=None):
+        while True:
+            try:
+                kind, gen, i, payload = self._inbox.get_nowait()
+            except queue.Empty:
+                break
+            if gen != self._gen:
+                continue
+            if kind == "results":
+                for j, rows in enumerate(payload, start=i):
+                    if rows is None:
+                        continue  # unreadable file: no caption
+                    self.results[j] = rows
+                    if j in self._items:
+                        self.canvas.itemconfigure(self._items[j][2], text=caption(rows))
+                self._set_status()
+                continue
+            self._requested.discard(i)
+            if kind == "skip":
+                # Scrolled away and back before the decode thread got to it: the cell is
+                # showing again but _create_cell didn't resubmit, so do it now
+                if i in self._items and i not in self._thumbs:
+                    self._requested.add(i)
+                    self._pool.submit(self._decode, self._gen, i, self.paths[i])
+                continue
+            if kind == "thumb" and payload is not None:
+                from PIL import ImageTk
+                self._thumbs[i] = ImageTk.PhotoImage(payload)  # PhotoImages must be made on the Tk thread
+                if i in self._items:
+                    self.canvas.itemconfigure(self._items[i][1], image=self._thumbs[i])
+                self._trim_thumbs()
+
+    def _trim_thumbs(self):
+        # Keep at most max_thumbs PhotoImages, dropping the least recently shown off-screen ones
+        for i in list(self._thumbs):
+            if len(self._thumbs) <= self.max_thumbs:
+                break
+            if i not in self._items:
+                del self._thumbs[i]
+
+    def _set_status(self):
+        n = len(self.paths)
+        if not n:
+            text = "No images in this folder."
+        else:
+            text = f"{n:,} images"
+            if self.results:
+                text += f" · {len(self.results):,} classified"
+            if self._job and not self._job.finished:
+                text += " (classifying…)"
+        self.status.configure(text=text)
@@ -1,50 +1,142 @@
 from __future__ import annotations
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog
-from typing import Optional
-from PIL import Image, ImageTk
+from typing import TYPE_CHECKING, Optional
 from ..utils.ui import ToolTip
+from ..utils.decorators import error_handler
+from .table_model import COLUMNS, TableModel, diff
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageTk
 
 
 # Results table (labels/scores)
 
 class ResultTable(ttk.Frame):
-    def __init__(self, master):
+    """
+    Virtualized results table: the Treeview only ever holds the rows that fit on
+    screen. Scrolling, sorting and filtering move a window over the TableModel and
+    rewrite just the visible rows whose values changed, so loading 100k rows costs
+    about the same Tk work as loading 10.
+    """
+
+    def __init__(self, master, height: int = 6):
         super().__init__(master)
-        # Treeview with 2 columns: "label" and "score" (no row headings)
-        self.tree = ttk.Treeview(self, columns=("label", "score"), show="headings", height=6)
-        self.tree.heading("label", text="Label")
-        self.tree.heading("score", text="Score")
+        self.model = TableModel()
+        self.offset = 0           # first view row on screen
+        self.visible = height     # rows that fit; updated on resize
+        self._slots: list[str] = []   # Treeview items, reused for whatever rows are on screen
+        self._shown: list[tuple] = []  # values currently in those items
+
+        # Filter bar: label/text substring + minimum score
+        bar = ttk.Frame(self)
+        ttk.Label(bar, text="Filter:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        entry = ttk.Entry(bar, width=18, textvariable=self.filter_var)
+        entry.pack(side=tk.LEFT, padx=(4, 8))
+        entry.bind("<KeyRelease>", lambda _: self.apply_filter())
+        ttk.Label(bar, text="Min score:").pack(side=tk.LEFT)
+        self.min_var = tk.StringVar(value="0.00")
+        ttk.Spinbox(bar, from_=0.0, to=1.0, increment=0.05, width=6, textvariable=self.min_var,
+                    command=self.apply_filter).pack(side=tk.LEFT, padx=(4, 8))
+        self.count_label = ttk.Label(bar, text="")
+        self.count_label.pack(side=tk.RIGHT)
+
+        # Treeview with 3 columns: "label", "score" and optional "text" (no row headings).
+        # Clicking a heading sorts by it; clicking again flips the order.
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings", height=height)
+        for col in COLUMNS:
+            self.tree.heading(col, text=col.title(), command=lambda c=col: self.sort_by(c))
         self.tree.column("label", width=220, anchor="w")
         self.tree.column("score", width=80, anchor="center")
+        self.tree.column("text", width=320, anchor="w")  # e.g. the sentence in live mode
 
-        # Always pair a Treeview with a Scrollbar; use yscrollcommand (not 'yscroll')
-        vsb = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)  # FIX: was yscroll=vsb.set (has no effect)
+        # The scrollbar drives our window offset, not the Treeview's own scrolling
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
 
         # Grid placement + expand to fill
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        self.grid_rowconfigure(0, weight=1)
+        bar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 4))
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.vsb.grid(row=1, column=1, sticky="ns")
+        self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
+        self.tree.bind("<Configure>", self._fit)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda _: self.scroll(-1))  # X11 wheel
+        self.tree.bind("<Button-5>", lambda _: self.scroll(1))
+        self.tree.bind("<Prior>", lambda _: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda _: self.scroll(self.visible))
+
     def load(self, rows: list[dict]):
-        """Replace table contents with up to the top 10 rows."""
-        # Clear old rows first (prevents duplicates)
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        # Insert with defensive defaults and score formatting
-        for r in rows[:10]:
-            label = r.get("label", "?")
-            # float() cast protects against strings/None; .2f clamps presentation only
-            score = f"{float(r.get('score', 0.0)):.2f}"
-            self.tree.insert("", "end", values=(label, score))
+        """Replace table contents; only the rows on screen are touched in Tk."""
+        self.model.set_rows(rows)
+        self._draw()
+
+    def sort_by(self, column: str):
+        self.model.sort(column)
+        for col in COLUMNS:
+            arrow = (" ▼" if self.model.descending else " ▲") if col == self.model.sort_column else ""
+            self.tree.heading(col, text=col.title() + arrow)
+        self._draw()
+
+    def apply_filter(self):
+        try:
+            lo = float(self.min_var.get())
+        except ValueError:
+            lo = 0.0
+        self.model.set_filter(self.filter_var.get(), lo if lo > 0 else None)
+        self.offset = 0
+        self._draw()
+
+    def scroll(self, rows: int):
+        self.offset += rows
+        self._draw()
+
+    def _on_scroll(self, action, amount, unit=None):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.model))
+        else:
+            self.offset += int(amount) * (self.visible if unit == "pages" else 1)
+        self._draw()
+
+    def _fit(self, event):
+        # How many rows fit now: widget height minus the heading, over the row height
+        row_h = int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - row_h - 4) // row_h)
+        if visible != self.visible:
+            self.visible = visible
+            self._draw()
+
+    def _draw(self):
+        total = len(self.model)
+        self.offset = max(0, min(self.offset, total - self.visible))
+        window = self.model.window(self.offset, self.visible)
+        for pos in diff(self._shown, window):
+            if pos >= len(window):
+                self.tree.detach(self._slots[pos])
+                continue
+            if pos == len(self._slots):
+                self._slots.append(self.tree.insert("", "end", values=window[pos]))
+            else:
+                if pos >= len(self._shown):
+                    self.tree.move(self._slots[pos], "", pos)  # reattach a slot hidden earlier
+                self.tree.item(self._slots[pos], values=window[pos])
+        self._shown = window
+        if total:
+            self.vsb.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+        shown = f"{total:,}" if total == len(self.model.rows) else f"{total:,} of {len(self.model.rows):,}"
+        self.count_label.configure(text=f"{shown} rows")
 
 
 # Input section (text/image, run buttons, CV2 toggle)
 
 class InputPanel:
-    def __init__(self, master, on_run1, on_run2, on_clear, on_browse):
+    def __init__(self, master, on_run1, on_run2, on_clear, on_browse, on_text_change=None):
         # Wrap in a labeled frame for visual grouping
         self.frame = ttk.LabelFrame(master, text="User Input", style="Section.TLabelframe")
 
@@ -72,6 +164,13 @@ class InputPanel:
         ttk.Checkbutton(top, text="OpenCV preprocess", variable=self.use_cv2)\
             .pack(side=tk.LEFT, padx=(8, 0))
 
+        # Live mode: re-score the text shortly after the user stops typing
+        self.live_var = tk.BooleanVar(value=False)
+        live = ttk.Checkbutton(top, text="Live", variable=self.live_var)
+        live.pack(side=tk.LEFT, padx=(8, 0))
+        ToolTip(live, "Score sentiment as you type (only changed sentences are re-run)")
+        self._on_text_change = on_text_change
+
         # Main text area for sentiment input (with built-in scrollbar)
         self.text_area = scrolledtext.ScrolledText(self.frame, height=7, wrap=tk.WORD)
         self.text_area.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 6))
@@ -79,7 +178,7 @@ class InputPanel:
         # Live char/word counter; updated on key release
         self._counter = ttk.Label(self.frame, text="0 chars • 0 words", anchor="e")
         self._counter.pack(fill=tk.X, padx=8, pady=(0, 6))
-        self.text_area.bind("<KeyRelease>", self._update_counter)
+        self.text_area.bind("<KeyRelease>", self._on_key)
 
         # Action buttons: callbacks are injected (keeps UI decoupled from models)
         btns = ttk.Frame(self.frame); btns.pack(fill=tk.X, padx=8, pady=(0, 10))
@@ -102,6 +201,12 @@ class InputPanel:
         finally:
             self._menu.grab_release()
 
+    def _on_key(self, e):
+        """Keystroke handler: update the counter, then tell the controller (kept cheap)."""
+        self._update_counter(e)
+        if self._on_text_change and self.live_var.get():
+            self._on_text_change()
+
     def _update_counter(self, _):
         """Compute live char/word counts; inexpensive for typical input sizes."""
         txt = self.text_area.get("1.0", "end").strip()
@@ -113,6 +218,8 @@ class InputPanel:
 # Output section (table + raw JSON view + copy/save)
 
 class OutputPanel:
+    RAW_CHUNK_ROWS = 200
+
     def __init__(self, master):
         self.frame = ttk.LabelFrame(master, text="Results", style="Section.TLabelframe")
 
@@ -129,6 +236,10 @@ class OutputPanel:
         raw_box.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
         self.output_text = scrolledtext.ScrolledText(raw_box, height=8, wrap=tk.WORD)
         self.output_text.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+        # JSON is formatted RAW_CHUNK_ROWS rows at a time, more as the user scrolls down
+        self._raw_next = 0
+        self._raw_pending = False
+        self.output_text.configure(yscrollcommand=self._on_raw_scroll)
 
         # Footer actions
         footer = ttk.Frame(self.frame); footer.pack(fill=tk.X, padx=8, pady=(0, 10))
@@ -137,13 +248,12 @@ class OutputPanel:
         self.copy_btn.pack(side=tk.LEFT); self.save_btn.pack(side=tk.LEFT, padx=6)
 
     def copy(self):
-        """Copy raw JSON text to the OS clipboard."""
-        txt = self.output_text.get("1.0", "end")
+        """Copy the full raw JSON (not just the part loaded into the view) to the OS clipboard."""
         self.frame.clipboard_clear()
-        self.frame.clipboard_append(txt)
+        self.frame.clipboard_append(self.table.model.raw_json())
 
     def save(self):
-        """Save raw JSON text to disk (UTF-8)."""
+        """Save the full raw JSON to disk (UTF-8)."""
         path = filedialog.asksaveasfilename(
             defaultextension=".json",
             filetypes=[("JSON", "*.json"), ("All files", "*.*")],
@@ -152,14 +262,38 @@ class OutputPanel:
         if not path:
             return
         with open(path, "w", encoding="utf-8") as f:
-            f.write(self.output_text.get("1.0", "end"))
+            f.write(self.table.model.raw_json())
 
     def render(self, rows: list[dict]):
         """Populate the table and raw view from a list of {label, score} dicts."""
         self.table.load(rows)
-        import json
         self.output_text.delete("1.0", tk.END)
-        self.output_text.insert("1.0", json.dumps(rows, indent=2))
+        self._raw_next = 0
+        self._append_raw()
+
+    def clear(self):
+        self.table.load([])
+        self.output_text.delete("1.0", tk.END)
+        self._raw_next = 0
+
+    def _append_raw(self):
+        # Format the next RAW_CHUNK_ROWS rows of JSON and add them at the end of the view
+        model = self.table.model
+        stop = self._raw_next + self.RAW_CHUNK_ROWS
+        self.output_text.insert(tk.END, model.raw_chunk(self._raw_next, stop))
+        self._raw_next = min(stop, len(model.rows))
+
+    def _on_raw_scroll(self, first, last):
+        self.output_text.vbar.set(first, last)
+        # Near the bottom with rows still unformatted: load the next chunk once Tk is idle
+        if float(last) > 0.9 and self._raw_next < len(self.table.model.rows) and not self._raw_pending:
+            self._raw_pending = True
+            self.output_text.after_idle(self._raw_more)
+
+    def _raw_more(self):
+        self._raw_pending = False
+        if self._raw_next < len(self.table.model.rows):
+            self._append_raw()
 
 
 
@@ -187,6 +321,239 @@ class InfoPanel:
 
 
 
+# Metrics section (per-function latency/call counters from utils.metrics)
+
+class MetricsPanel:
+    COLUMNS = ("func", "calls", "errors", "in_flight", "mean_ms", "p50_ms", "p95_ms", "p99_ms")
+
+    def __init__(self, master, registry=None, refresh_ms: int = 2000):
+        from ..utils.metrics import REGISTRY
+        self.registry = registry or REGISTRY
+        self.refresh_ms = refresh_ms
+        self._after_id = None
+        self.frame = ttk.LabelFrame(master, text="Metrics", style="Section.TLabelframe")
+
+        # One row per instrumented function
+        self.tree = ttk.Treeview(self.frame, columns=self.COLUMNS, show="headings", height=10)
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col.replace("_", " "))
+            self.tree.column(col, width=260 if col == "func" else 70, anchor="w" if col == "func" else "e")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=(8, 6))
+
+        # Footer: manual refresh + exports
+        footer = ttk.Frame(self.frame); footer.pack(fill=tk.X, padx=8, pady=(0, 10))
+        ttk.Button(footer, text="Refresh", command=self.refresh).pack(side=tk.LEFT)
+        ttk.Button(footer, text="Export JSON…", command=lambda: self.export("json")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(footer, text="Export Prometheus…", command=lambda: self.export("prom")).pack(side=tk.LEFT)
+
+    def refresh(self):
+        """Redraw the table from a registry snapshot."""
+        self.tree.delete(*self.tree.get_children())
+        for name, s in self.registry.snapshot().items():
+            self.tree.insert("", "end", values=(name, *(s[c] for c in self.COLUMNS[1:])))
+
+    def start_auto_refresh(self):
+        """Refresh periodically (call while the tab is visible)."""
+        self.stop_auto_refresh()
+        self.refresh()
+        self._after_id = self.frame.after(self.refresh_ms, self.start_auto_refresh)
+
+    def stop_auto_refresh(self):
+        if self._after_id:
+            self.frame.after_cancel(self._after_id)
+            self._after_id = None
+
+    def export(self, fmt: str):
+        """Save a snapshot as JSON or Prometheus text."""
+        ext = ".json" if fmt == "json" else ".prom"
+        path = filedialog.asksaveasfilename(
+            defaultextension=ext, initialfile=f"metrics{ext}",
+            filetypes=[("JSON", "*.json") if fmt == "json" else ("Prometheus text", "*.prom"),
+                       ("All files", "*.*")])
+        if not path:
+            return
+        text = self.registry.to_json() if fmt == "json" else self.registry.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+
+# Jobs section (queue of background jobs with per-job status)
+
+class JobsPanel:
+    COLUMNS = ("id", "lane", "name", "priority", "status", "ms")
+
+    def __init__(self, master, on_cancel):
+        self.frame = ttk.LabelFrame(master, text="Jobs", style="Section.TLabelframe")
+        self.tree = ttk.Treeview(self.frame, columns=self.COLUMNS, show="headings", height=10)
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col.title())
+            self.tree.column(col, width=160 if col == "name" else 70, anchor="w" if col == "name" else "center")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=(8, 6))
+
+        # Cancel acts on the selected rows (queued jobs are dropped, running ones discarded)
+        footer = ttk.Frame(self.frame); footer.pack(fill=tk.X, padx=8, pady=(0, 10))
+        ttk.Button(footer, text="Cancel Selected",
+                   command=lambda: [on_cancel(int(i)) for i in self.tree.selection()]).pack(side=tk.LEFT)
+
+    def refresh(self, jobs):
+        """Show jobs (newest first); rows are keyed by job id so selection survives refreshes."""
+        seen = set()
+        for j in reversed(jobs):  # oldest first, so each new row lands on top
+            iid = str(j.id)
+            seen.add(iid)
+            values = (j.id, j.lane, j.name, j.priority, j.status, f"{j.elapsed_ms():.0f}")
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values)
+            else:
+                self.tree.insert("", 0, iid=iid, values=values)
+        for iid in self.tree.get_children():
+            if iid not in seen:
+                self.tree.delete(iid)
+
+
+# Run history: one page of past predictions at a time, with filters and export
+
+class HistoryPanel:
+    COLUMNS = ("id", "time", "model", "label", "score", "ms", "input")
+
+    def __init__(self, master, store, keys, run_async=None, page_size: int = 100):
+        self.store, self.page_size, self.page = store, page_size, 0
+        # run_async(func, on_done) runs exports off the Tk thread when given
+        self.run_async = run_async
+        self.frame = ttk.LabelFrame(master, text="History", style="Section.TLabelframe")
+
+        # Filters: model key, top label, text in the input preview
+        bar = ttk.Frame(self.frame); bar.pack(fill=tk.X, padx=8, pady=(8, 4))
+        ttk.Label(bar, text="Model:").pack(side=tk.LEFT)
+        self.key_var = tk.StringVar(value="All")
+        ttk.Combobox(bar, state="readonly", width=16, textvariable=self.key_var,
+                     values=["All"] + list(keys)).pack(side=tk.LEFT, padx=(4, 8))
+        ttk.Label(bar, text="Label:").pack(side=tk.LEFT)
+        self.label_var = tk.StringVar()
+        ttk.Entry(bar, width=14, textvariable=self.label_var).pack(side=tk.LEFT, padx=(4, 8))
+        ttk.Label(bar, text="Input contains:").pack(side=tk.LEFT)
+        self.text_var = tk.StringVar()
+        entry = ttk.Entry(bar, width=18, textvariable=self.text_var)
+        entry.pack(side=tk.LEFT, padx=(4, 8))
+        entry.bind("<Return>", lambda _: self.apply_filters())
+        ttk.Button(bar, text="Apply", command=self.apply_filters).pack(side=tk.LEFT)
+
+        self.tree = ttk.Treeview(self.frame, columns=self.COLUMNS, show="headings", height=12)
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col.title())
+            self.tree.column(col, width=260 if col == "input" else 90 if col in ("time", "model", "label") else 60,
+                             anchor="w" if col in ("input", "model", "label") else "center")
+        vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=vsb.set)
+        self.tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=8)
+
+        # Paging + export
+        footer = ttk.Frame(self.frame); footer.pack(fill=tk.X, padx=8, pady=(4, 10))
+        ttk.Button(footer, text="◀ Newer", command=lambda: self.go(-1)).pack(side=tk.LEFT)
+        ttk.Button(footer, text="Older ▶", command=lambda: self.go(1)).pack(side=tk.LEFT, padx=6)
+        self.page_label = ttk.Label(footer, text="")
+        self.page_label.pack(side=tk.LEFT, padx=6)
+        ttk.Button(footer, text="Export…", command=self.export).pack(side=tk.RIGHT)
+
+    def filters(self) -> dict:
+        key = self.key_var.get()
+        return {"key": None if key == "All" else key, "label": self.label_var.get().strip() or None,
+                "text": self.text_var.get().strip() or None}
+
+    def apply_filters(self):
+        self.page = 0
+        self.refresh()
+
+    def go(self, step: int):
+        self.page = max(0, self.page + step)
+        self.refresh()
+
+    def refresh(self):
+        """Load the current page (only page_size rows ever reach the Treeview)."""
+        f = self.filters()
+        total = self.store.count(**f)
+        pages = max(1, -(-total // self.page_size))
+        self.page = min(self.page, pages - 1)
+        rows = self.store.query(offset=self.page * self.page_size, limit=self.page_size, **f)
+        self.tree.delete(*self.tree.get_children())
+        for r in rows:
+            score = "" if r["top_score"] is None else f"{r['top_score']:.2f}"
+            when = time.strftime("%m-%d %H:%M:%S", time.localtime(r["ts"]))
+            ms = f"{r['latency_ms']:.0f}" + (" (c)" if r["cached"] else "")
+            self.tree.insert("", "end", values=(r["id"], when, r["key"], r["top_label"], score, ms, r["input_preview"]))
+        self.page_label.configure(text=f"Page {self.page + 1} of {pages} ({total} runs)")
+
+    def export(self):
+        path = filedialog.asksaveasfilename(defaultextension=".jsonl", initialfile="history.jsonl",
+                                            filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv")])
+        if not path:
+            return
+        f = self.filters()
+        work = lambda: self.store.export(path, **f)
+        done = lambda n: self.page_label.configure(text=f"Exported {n} runs to {path}")
+        if self.run_async:
+            self.run_async(work, done)
+        else:
+            done(work())
+
+
+# Runtime settings: threads per model and process mode (saved to the runtime config file)
+
+class SettingsDialog:
+    def __init__(self, master, config, keys, on_save):
+        from ..runtime import format_cores, parse_cores
+        self._parse_cores = parse_cores
+        self.config, self.keys, self.on_save = config, list(keys), on_save
+        self.top = tk.Toplevel(master)
+        self.top.title("Runtime Settings")
+        self.top.transient(master)
+        body = ttk.Frame(self.top, padding=10); body.pack(fill=tk.BOTH, expand=True)
+
+        # One row per model: intra-op threads, inter-op threads, core set (process mode only)
+        for col, text in enumerate(("Model", "Threads", "Inter-op", "Cores (e.g. 0-3)")):
+            ttk.Label(body, text=text).grid(row=0, column=col, sticky="w", padx=4)
+        self.vars = {}
+        for row, key in enumerate(self.keys, start=1):
+            cfg = config.for_key(key)
+            threads = tk.StringVar(value=str(config.threads.get(key) or ""))
+            interop = tk.StringVar(value=str(config.interop.get(key) or ""))
+            cores = tk.StringVar(value=format_cores(cfg["cores"]))
+            ttk.Label(body, text=key).grid(row=row, column=0, sticky="w", padx=4)
+            ttk.Spinbox(body, from_=0, to=256, width=6, textvariable=threads).grid(row=row, column=1, padx=4)
+            ttk.Spinbox(body, from_=0, to=64, width=6, textvariable=interop).grid(row=row, column=2, padx=4)
+            ttk.Entry(body, width=14, textvariable=cores).grid(row=row, column=3, padx=4)
+            self.vars[key] = (threads, interop, cores)
+
+        self.process_var = tk.BooleanVar(value=config.process_mode)
+        cb = ttk.Checkbutton(body, text="Run each model in its own process", variable=self.process_var)
+        cb.grid(row=len(self.keys) + 1, column=0, columnspan=4, sticky="w", pady=(8, 0))
+        ToolTip(cb, "Pins each model to its core set so they don't fight over threads")
+        ttk.Label(body, text="Blank = library default. Changes apply after a restart.").grid(
+            row=len(self.keys) + 2, column=0, columnspan=4, sticky="w", pady=(6, 0))
+
+        footer = ttk.Frame(body); footer.grid(row=len(self.keys) + 3, column=0, columnspan=4, sticky="e", pady=(10, 0))
+        ttk.Button(footer, text="Cancel", command=self.top.destroy).pack(side=tk.RIGHT)
+        ttk.Button(footer, text="Save", command=self._save).pack(side=tk.RIGHT, padx=(0, 6))
+
+    @error_handler
+    def _save(self):
+        for key, (threads, interop, cores) in self.vars.items():
+            for store, var in ((self.config.threads, threads), (self.config.interop, interop)):
+                v = var.get().strip()
+                if v and int(v) > 0:
+                    store[key] = int(v)
+                else:
+                    store.pop(key, None)
+            if cores.get().strip():
+                self.config.cores[key] = self._parse_cores(cores.get())
+            else:
+                self.config.cores.pop(key, None)
+        self.config.process_mode = bool(self.process_var.get())
+        self.on_save(self.config)
+        self.top.destroy()
+
+
 # Simple image state holder (path + PIL image + Tk thumbnail)
 
 class ImageState:
@@ -205,9 +572,20 @@ class OutputPreview:
         self.label = ttk.Label(self.frame, text="(no image)")
         self.label.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
+    SIZE = (420, 300)
+
     def show_image(self, pil_img):
         """Show a scaled-down preview; keep self.thumb alive to avoid blank labels."""
         img = pil_img.copy()
-        img.thumbnail((420, 300))  # Preserves aspect ratio within bounds
-        self.thumb = ImageTk.PhotoImage(img)
+        img.thumbnail(self.SIZE)  # Preserves aspect ratio within bounds
+        self.show_thumbnail(img)
+
+    def show_thumbnail(self, thumb):
+        """Show an image that is already preview-sized (e.g. from the ThumbnailCache)."""
+        from PIL import ImageTk  # first preview, not start-up, pays for PIL
+        self.thumb = ImageTk.PhotoImage(thumb)
         self.label.configure(image=self.thumb, text="")
+
+    def show_message(self, text: str):
+        self.thumb = None
+        self.label.configure(image="", text=text)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import json
+from typing import Optional
+
+# Columns shown by ResultTable, in order
+COLUMNS = ("label", "score", "text")
+
+
+def format_row(r: dict) -> tuple:
+    # Display values for one result; float() protects against strings/None, .2f is presentation only
+    try:
+        score = f"{float(r.get('score', 0.0)):.2f}"
+    except (TypeError, ValueError):
+        score = "?"
+    return (r.get("label", "?"), score, r.get("text", ""))
+
+
+def _score(r: dict) -> float:
+    try:
+        return float(r.get("score", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def diff(old: list[tuple], new: list[tuple]) -> list[int]:
+    """Positions whose display values changed between two windows (including ones that appeared or went away)."""
+    changed = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+    return changed + list(range(min(len(old), len(new)), max(len(old), len(new))))
+
+
+class TableModel:
+    """
+    Rows behind a ResultTable, with no Tk in it.
+
+    Sorting and filtering only rearrange a list of row indices (the view), and
+    window() formats just the slice that is on screen, so a 100k-row result costs
+    one pass to load and a few dozen formatted rows per scroll step.
+    """
+
+    def __init__(self, rows: Optional[list[dict]] = None) -> None:
+        self.sort_column: Optional[str] = None
+        self.descending = False
+        self.label_filter = ""
+        self.min_score: Optional[float] = None
+        self.set_rows(rows or [])
+
+    def set_rows(self, rows: list[dict]) -> None:
+        self.rows = list(rows)
+        self._view: Optional[list[int]] = None
+        # Raw JSON text is built per row on demand and kept until the rows change
+        self._json: dict[int, str] = {}
+
+    # ----- view (sort + filter) -----
+
+    def sort(self, column: Optional[str], descending: Optional[bool] = None) -> None:
+        """Sort by column (None = original order); sorting the same column again flips the order."""
+        if column is not None and column not in COLUMNS:
+            raise ValueError(f"Unknown column {column!r}")
+        if descending is None:
+            descending = (not self.descending) if column == self.sort_column else column == "score"
+        self.sort_column, self.descending = column, descending
+        self._view = None
+
+    def set_filter(self, label: str = "", min_score: Optional[float] = None) -> None:
+        """Keep rows whose label or text contains `label` (case-insensitive) and whose score is >= min_score."""
+        self.label_filter, self.min_score = label.strip().lower(), min_score
+        self._view = None
+
+    @property
+    def view(self) -> list[int]:
+        if self._view is None:
+            rows, idx = self.rows, range(len(self.rows))
+            if self.label_filter:
+                needle = self.label_filter
+                idx = [i for i in idx if needle in str(rows[i].get("label", "")).lower()
+                       or needle in str(rows[i].get("text", "")).lower()]
+            if self.min_score is not None:
+                lo = self.min_score
+                idx = [i for i in idx if _score(rows[i]) >= lo]
+            if self.sort_column == "score":
+                idx = sorted(idx, key=lambda i: _score(rows[i]), reverse=self.descending)
+            elif self.sort_column is not None:
+                col = self.sort_column
+                idx = sorted(idx, key=lambda i: str(rows[i].get(col, "")).lower(), reverse=self.descending)
+            self._view = list(idx)
+        return self._view
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def window(self, start: int, count: int) -> list[tuple]:
+        """Display values for view rows [start, start + count)."""
+        rows = self.rows
+        return [format_row(rows[i]) for i in self.view[max(0, start):max(0, start) + count]]
+
+    def row(self, position: int) -> dict:
+        return self.rows[self.view[position]]
+
+    # ----- raw JSON, in pieces -----
+
+    def _row_json(self, i: int) -> str:
+        text = self._json.get(i)
+        if text is None:
+            # Same layout as json.dumps(rows, indent=2): each element indented one level
+            text = "  " + json.dumps(self.rows[i], indent=2, default=str).replace("\n", "\n  ")
+            self._json[i] = text
+        return text
+
+    def raw_chunk(self, start: int, stop: int) -> str:
+        """
+        JSON text for rows [start, stop) of the unsorted rows. Concatenating the chunks
+        0..n in order gives exactly json.dumps(rows, indent=2), so the raw view can
+        append more as the user scrolls instead of formatting everything up front.
+        """
+        n = len(self.rows)
+        stop = min(stop, n)
+        if not n:
+            return "[]" if start == 0 else ""
+        parts = ["[\n"] if start == 0 else []
+        for i in range(start, stop):
+            parts.append((",\n" if i else "") + self._row_json(i))
+        if stop == n and start < n:
+            parts.append("\n]")
+        return "".join(parts)
+
+    def raw_json(self) -> str:
+        # Full text for copy/save
+        return json.dumps(self.rows, indent=2, default=str)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import logging, multiprocessing as mp, threading
+from typing import Callable, Optional
+from .runtime import TRANSPORTS, apply_threads, pin_to_cores
+from .shm import SharedImageRing, ShmReader, as_pixels
+
+# Methods a worker exposes; anything else on the model stays private to the child
+_METHODS = ("run", "run_batch", "run_pixels", "run_long", "warmup", "preprocess_config", "param_bytes", "info")
+
+# Transports (runtime.TRANSPORTS): "pickle" sends inputs through the pipe as-is;
+# "shm" moves image pixels through a SharedImageRing and sends only the slot references
+
+
+class WorkerError(RuntimeError):
+    """An exception raised inside a model worker process (message and type preserved)."""
+
+
+def _serve(conn, factory: Callable, threads: Optional[int], interop: Optional[int],
+           cores: Optional[list[int]]) -> None:
+    # Child process entry point: pin, size the thread pools, then build the model.
+    # Order matters: thread counts must be set before torch creates its pools.
+    pinned = pin_to_cores(cores)
+    apply_threads(threads, interop)
+    try:
+        model = factory()
+    except Exception as e:
+        conn.send(("err", f"{type(e).__name__}: {e}"))
+        return
+    from .controller import _FALLBACKS
+    conn.send(("ok", {"model_id": getattr(model, "model_id", None), "task": getattr(model, "task", None),
+                      "backend": getattr(model, "backend", "torch"), "class": type(model).__name__,
+                      "is_fallback": isinstance(model, tuple(_FALLBACKS.values())),
+                      "methods": [m for m in _METHODS if hasattr(model, m)], "pinned": pinned}))
+    reader = ShmReader()
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                return
+            if msg is None:
+                return
+            method, args, kwargs = msg
+            try:
+                result = getattr(model, method)(*reader.resolve(args), **kwargs)
+            except Exception as e:
+                conn.send(("err", f"{type(e).__name__}: {e}"))
+                continue
+            finally:
+                args = None  # drop shared-memory views before the parent reuses the slots
+            conn.send(("ok", result))
+    finally:
+        reader.close()
+
+
+class ModelWorker:
+    """
+    A model running in its own process, used through the same methods as the model.
+
+    Calls are sent over a Pipe (pickled) and answered in order; a lock keeps
+    concurrent callers in the parent from interleaving on the pipe. The constructor
+    waits for the model to load and raises if it fails, so ModelManager's usual
+    per-key fallback still applies.
+    """
+
+    def __init__(self, key: str, factory: Callable, threads: Optional[int] = None,
+                 interop: Optional[int] = None, cores: Optional[list[int]] = None,
+                 transport: str = "pickle", ring_slots: int = 8, slot_timeout: float = 60.0) -> None:
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport {transport!r}; use one of {', '.join(TRANSPORTS)}")
+        self.key = key
+        self.cores = cores
+        self.transport = transport
+        self._ring: Optional[SharedImageRing] = None
+        # Smallest ring; it grows to fit the largest batch_size actually sent
+        self._ring_slots = max(1, ring_slots)
+        # Rings replaced by a bigger one; callers may still hold slots, so they close with the worker
+        self._retired: list[SharedImageRing] = []
+        self._ring_lock = threading.Lock()
+        # How long a call waits for free ring slots before giving up (WorkerError)
+        self.slot_timeout = slot_timeout
+        # spawn, not fork: the parent has Tk and worker threads that must not be copied
+        ctx = mp.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(target=_serve, args=(child, factory, threads, interop, cores),
+                                 name=f"model-{key}", daemon=True)
+        self._proc.start()
+        child.close()
+        self._lock = threading.Lock()
+        status, payload = self._recv()
+        if status != "ok":
+            self._proc.join(timeout=5)
+            raise WorkerError(f"worker for '{key}' failed to load: {payload}")
+        self.model_id = payload["model_id"]
+        self.task = payload["task"]
+        self.backend = payload["backend"]
+        self.is_fallback = payload["is_fallback"]
+        self._class = payload["class"]
+        self._methods = set(payload["methods"])
+
+    def _recv(self):
+        try:
+            return self._conn.recv()
+        except EOFError:
+            return "err", f"process exited with code {self._proc.exitcode}"
+
+    def call(self, method: str, *args, **kwargs):
+        if method not in self._methods:
+            raise AttributeError(f"{self._class} has no method {method!r}")
+        if self.transport == "shm" and args:
+            if method == "run_batch":
+                return self._run_batch_shm(list(args[0]), *args[1:], **kwargs)
+            if method in ("run", "run_pixels"):
+                return self._call_shm(method, [args[0]], args[1:], kwargs, single=True)
+        return self._send(method, args, kwargs)
+
+    def _send(self, method: str, args: tuple, kwargs: dict):
+        with self._lock:
+            self._conn.send((method, args, kwargs))
+            status, payload = self._recv()
+        if status != "ok":
+            raise WorkerError(payload)
+        return payload
+
+    def _get_ring(self, slots: int = 1) -> SharedImageRing:
+        # Created on first image so text-only workers never allocate shared memory,
+        # and replaced by a larger one when a piece needs more slots than it has
+        with self._ring_lock:
+            if self._ring is None or self._ring.slots < slots:
+                if self._ring is not None:
+                    self._retired.append(self._ring)
+                self._ring = SharedImageRing(max(self._ring_slots, slots))
+            return self._ring
+
+    def _call_shm(self, method: str, items: list, rest: tuple, kwargs: dict, single: bool = False):
+        # Images go into ring slots; anything else (paths, text, oversized arrays) is pickled as before
+        pixels = [as_pixels(item) for item in items]
+        if all(arr is None for arr in pixels):
+            return self._send(method, (items[0] if single else items, *rest), kwargs)
+        ring = self._get_ring()
+        wanted = [i for i, arr in enumerate(pixels) if arr is not None and ring.fits(arr)]
+        if len(wanted) > ring.slots:
+            ring = self._get_ring(len(wanted))
+        packed = list(items)
+        try:
+            # All slots for this piece at once, so concurrent callers can't starve each other
+            slots = ring.acquire_many(len(wanted), timeout=self.slot_timeout)
+        except TimeoutError as e:
+            raise WorkerError(f"worker for '{self.key}': {e}") from e
+        try:
+            for i, slot in zip(wanted, slots):
+                packed[i] = ring.write(slot, pixels[i])
+            first = packed[0] if single else packed
+            return self._send(method, (first, *rest), kwargs)
+        finally:
+            # The result is back (or the call failed), so the slots can be reused
+            for slot in slots:
+                ring.release(slot)
+
+    def _run_batch_shm(self, items: list, *rest, **kwargs):
+        # Sent in batch_size pieces, the same split the model makes for its forward
+        # passes, so every pass still gets a full batch; the ring grows to fit one piece
+        out = []
+        step = max(1, int(kwargs.get("batch_size", rest[0] if rest else 8)))
+        for start in range(0, len(items), step):
+            out.extend(self._call_shm("run_batch", items[start:start + step], rest, kwargs))
+        return out
+
+    def __getattr__(self, name: str):
+        # Only reached for names not set in __init__: proxy the model's public methods
+        if name in _METHODS and name in self.__dict__.get("_methods", ()):
+            return lambda *a, **kw: self.call(name, *a, **kw)
+        raise AttributeError(name)
+
+    def alive(self) -> bool:
+        return self._proc.is_alive()
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self._proc.join(timeout)
+        if self._proc.is_alive():
+            logging.warning(f"model worker '{self.key}' did not exit, terminating")
+            self._proc.terminate()
+        self._conn.close()
+        for ring in [self._ring, *self._retired]:
+            if ring is not None:
+                ring.close()
+        self._ring, self._retired = None, []